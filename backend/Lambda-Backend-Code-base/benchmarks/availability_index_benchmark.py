@@ -0,0 +1,129 @@
+"""
+Compares the date range availability check against the StorageAvailability bitmaps.
+
+Runs on an in-memory SQLite copy of StorageSpaces / Rentals, so the absolute numbers
+only indicate the trend on SQL Server:
+
+    python availability_index_benchmark.py --storages 2000 --rentals 100000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "holdhive_db_transactions", "src"))
+
+import availability_index  # noqa: E402
+
+
+SCHEMA = """
+    CREATE TABLE StorageSpaces (storage_id INTEGER PRIMARY KEY, availability TEXT, price_per_month REAL);
+    CREATE TABLE Rentals (rental_id INTEGER PRIMARY KEY, storage_id INT, start_date TEXT, end_date TEXT);
+    CREATE TABLE StorageAvailability (storage_id INTEGER PRIMARY KEY, horizon_start TEXT, booked_days BLOB);
+"""
+
+# Same predicate as storage_actions.CHECK_AVAILABLE_STORAGE_WHERE (same parameter order)
+SQL_CHECK = """
+    SELECT s.storage_id, s.price_per_month
+    FROM StorageSpaces s
+    WHERE s.availability = 'available'
+      AND NOT EXISTS (
+        SELECT 1 FROM Rentals rt
+        WHERE rt.storage_id = s.storage_id AND (
+            (rt.start_date < ? AND rt.end_date > ?) OR
+            (rt.start_date <= ? AND rt.end_date >= ?) OR
+            (rt.start_date >= ? AND rt.start_date <= ?)
+        )
+      );
+"""
+
+# SQLite has no OPENJSON; json_each is the equivalent
+INDEX_CHECK = """
+    SELECT s.storage_id, s.price_per_month
+    FROM StorageSpaces s
+    WHERE s.availability = 'available'
+      AND s.storage_id NOT IN (SELECT CAST(value AS INT) FROM json_each(?));
+"""
+
+
+def seed(conn, storages, rentals, horizon_start):
+    rng = random.Random(42)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO StorageSpaces VALUES (?, ?, ?)",
+        [(i, "available" if rng.random() < 0.9 else "unavailable", rng.randint(20, 400)) for i in range(1, storages + 1)]
+    )
+    rows = []
+    for rental_id in range(1, rentals + 1):
+        start = horizon_start + timedelta(days=rng.randint(-60, 700))
+        rows.append((rental_id, rng.randint(1, storages), start.isoformat(),
+                     (start + timedelta(days=rng.randint(1, 30))).isoformat()))
+    conn.executemany("INSERT INTO Rentals VALUES (?, ?, ?, ?)", rows)
+
+    bitmaps = {}
+    for _, storage_id, start, end in rows:
+        bitmaps[storage_id] = bitmaps.get(storage_id, 0) | availability_index.day_range_mask(
+            date.fromisoformat(start), date.fromisoformat(end), horizon_start
+        )
+    conn.executemany(
+        "INSERT INTO StorageAvailability VALUES (?, ?, ?)",
+        [(storage_id, horizon_start.isoformat(), availability_index.to_bytes(bitmap)) for storage_id, bitmap in bitmaps.items()]
+    )
+
+
+def check_with_sql(conn, start, end):
+    s, e = start.isoformat(), end.isoformat()
+    return conn.execute(SQL_CHECK, (e, s, e, s, s, e)).fetchall()
+
+
+def check_with_index(conn, start, end):
+    cursor = conn.execute("SELECT storage_id, horizon_start, booked_days FROM StorageAvailability")
+    columns = [column[0] for column in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    booked = availability_index.booked_storage_ids(rows, start, end)
+    return conn.execute(INDEX_CHECK, (json.dumps(sorted(booked)),)).fetchall()
+
+
+def timed(label, fn, conn, ranges):
+    started = time.perf_counter()
+    results = [sorted(fn(conn, start, end)) for start, end in ranges]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{label:<32} {elapsed_ms / len(ranges):8.2f} ms/query")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--storages", type=int, default=2000)
+    parser.add_argument("--rentals", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    horizon_start = availability_index.current_horizon_start()
+    conn = sqlite3.connect(":memory:")
+    seed(conn, args.storages, args.rentals, horizon_start)
+
+    rng = random.Random(7)
+    today = date.today()
+    ranges = []
+    for _ in range(args.queries):
+        start = today + timedelta(days=rng.randint(0, 600))
+        ranges.append((start, start + timedelta(days=rng.randint(1, 60))))
+
+    print(f"{args.storages} storages, {args.rentals} rentals, {args.queries} date ranges")
+    baseline = timed("NOT EXISTS (no index)", check_with_sql, conn, ranges)
+    conn.execute("CREATE INDEX IX_Rentals_storage_id_end_date ON Rentals (storage_id, end_date, start_date)")
+    indexed = timed("NOT EXISTS (storage_id, end_date)", check_with_sql, conn, ranges)
+    bitmap = timed("StorageAvailability bitmaps", check_with_index, conn, ranges)
+
+    if not baseline == indexed == bitmap:
+        sys.exit("Result mismatch between the SQL and bitmap checks")
+    print("Results match")
+
+
+if __name__ == "__main__":
+    main()
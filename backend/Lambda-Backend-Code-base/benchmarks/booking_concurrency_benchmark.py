@@ -0,0 +1,130 @@
+"""
+Fires parallel bookings at one storage and checks that every slot gets exactly one rental.
+
+Runs through the local harness against a seeded local database, the workers sharing the DB
+Lambda's connection pool like concurrent requests in one warm container:
+
+    atomic            - POST /rental-service create_rental: rental service -> DB Lambda ->
+                        rental_actions.create_rental -> BOOK_RENTAL_QUERY. Each booking must
+                        come back 200 (won) or 409 (slot taken). The local stand-in turns the
+                        statement's UPDLOCK / HOLDLOCK hints into BEGIN IMMEDIATE.
+    check-then-insert - the previous create_rental on the same pool: overlap SELECT, then
+                        rental_actions.CREATE_RENTAL_QUERY in a second round trip, without
+                        locks between them.
+
+    python booking_concurrency_benchmark.py --bookings 400 --slots 20 --workers 32
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from local_harness import LocalHarness
+
+OVERLAP_QUERY = """
+    SELECT COUNT(*) AS overlapping
+    FROM Rentals
+    WHERE storage_id = ? AND start_date <= ? AND end_date >= ?;
+"""
+
+
+def round_trip(latency_ms):
+    # Network latency between the Lambda and the database
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+
+
+def book_atomic(harness, booking, latency_ms):
+    storage_id, renter_id, start, end = booking
+    round_trip(latency_ms)
+    response = harness.request("rental", "POST", "/rental-service", body={
+        "action": "create_rental", "storage_id": storage_id, "renter_id": renter_id,
+        "start_date": start, "end_date": end, "total_price": 100.0, "payment_status": "pending"
+    })
+    if response["statusCode"] not in (200, 409):
+        raise RuntimeError(f"create_rental returned {response['statusCode']}: {response['body']}")
+    return response["statusCode"] == 200
+
+
+def book_check_then_insert(harness, booking, latency_ms):
+    # Imported once the harness has put the DB code on sys.path
+    from db_client import transaction
+    from rental_actions import CREATE_RENTAL_QUERY
+    storage_id, renter_id, start, end = booking
+    with transaction() as tx:
+        round_trip(latency_ms)
+        if tx.execute(OVERLAP_QUERY, (storage_id, end, start))[0]["overlapping"]:
+            return False
+        round_trip(latency_ms)
+        tx.execute(CREATE_RENTAL_QUERY, (storage_id, renter_id, start, end, 100.0, "pending"))
+    return True
+
+
+def run(harness, book, bookings, workers, latency_ms):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda booking: book(harness, booking, latency_ms), bookings))
+    elapsed = time.perf_counter() - started
+
+    storage_id, _, first, _ = min(bookings, key=lambda booking: booking[2])
+    connection = sqlite3.connect(harness.database)
+    try:
+        per_slot = connection.execute(
+            "SELECT start_date, COUNT(*) FROM Rentals WHERE storage_id = ? AND start_date >= ? GROUP BY start_date",
+            (storage_id, first)
+        ).fetchall()
+    finally:
+        connection.close()
+    return results, dict(per_slot), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=400)
+    parser.add_argument("--slots", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # A pooled connection per worker, so the bookings really run side by side
+    harness = LocalHarness(environment={"DB_POOL_SIZE": args.workers})
+    try:
+        generated = harness.seed(users=50, storages=2, rentals=0, reviews=0)
+        # Non-overlapping week long slots past the generated bookings; every booking asks for one
+        first = date.today() + timedelta(days=900)
+        slots = [(first + timedelta(days=7 * i), first + timedelta(days=7 * i + 6)) for i in range(args.slots)]
+        rng = random.Random(42)
+
+        print(f"{args.bookings} bookings over {args.slots} slots of one storage, {args.workers} workers, "
+              f"{args.latency_ms} ms per round trip")
+        failed = False
+        # One storage per variant, so they start from the same empty calendar
+        variants = (("atomic", book_atomic), ("check-then-insert", book_check_then_insert))
+        for (label, book), storage_id in zip(variants, generated["storage_ids"]):
+            bookings = []
+            for _ in range(args.bookings):
+                start, end = rng.choice(slots)
+                bookings.append((storage_id, rng.choice(generated["user_ids"]), start.isoformat(), end.isoformat()))
+            requested = {booking[2] for booking in bookings}
+
+            results, per_slot, elapsed = run(harness, book, bookings, args.workers, args.latency_ms)
+            double_booked = sorted(slot for slot, count in per_slot.items() if count > 1)
+            booked = {str(slot)[:10] for slot in per_slot}
+            correct = booked == requested and not double_booked and sum(results) == len(requested)
+            print(f"{label:<18} {len(bookings) / elapsed:8.0f} bookings/s  "
+                  f"{sum(results):4d} won  {len(double_booked):3d} slots double booked  "
+                  f"{'OK' if correct else 'FAILED'}")
+            if label == "atomic" and not correct:
+                failed = True
+    finally:
+        harness.close()
+
+    if failed:
+        sys.exit("create_rental did not produce exactly one winner per slot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Measures the cold start of each Lambda: module import, first invoke and invokes after a warm-up event.
+
+Every sample is a fresh Python process (a new container) running one Lambda through the local
+harness against a seeded local database:
+
+    cold    - import the handler, first request, a second request
+    warmed  - import the handler, a {"warmup": true} event, then the first request
+
+Reports the median over --runs processes per Lambda. --history appends the run to a JSON lines
+file and prints the change against its previous entry, to track cold starts over time;
+--importtime lists the modules that cost the most to import (python -X importtime).
+The harness replaces boto3 and the ODBC driver, so their load times are not part of the figures.
+
+    python cold_start_benchmark.py --runs 5 --history cold_start_history.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DB_CODE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "holdhive_db_transactions", "src")
+
+TARGETS = ("db", "profile", "rental", "reviews", "storage")
+METRICS = ("import_ms", "first_invoke_ms", "second_invoke_ms", "warmup_ms", "first_after_warmup_ms", "peak_rss_mb")
+
+
+def seeded_ids(database):
+    """
+    Returns the first two (storage_id, user_id) pairs of the seeded database.
+    """
+    connection = sqlite3.connect(database)
+    try:
+        storages = [row[0] for row in connection.execute("SELECT storage_id FROM StorageSpaces ORDER BY storage_id LIMIT 2")]
+        users = [row[0] for row in connection.execute("SELECT user_id FROM Users ORDER BY user_id LIMIT 2")]
+    finally:
+        connection.close()
+    return list(zip(storages, users))
+
+
+def requests(target, storage_id, user_id):
+    """
+    Returns a read request of the target Lambda for the given rows.
+    """
+    storage_id = str(storage_id)
+    if target == "profile":
+        return ("GET", "/profile", {"action": "get_user_profile", "user_id": user_id})
+    if target == "rental":
+        return ("GET", "/rental-service/list-rental-by-storage-id", {"storage_id": storage_id})
+    if target == "reviews":
+        return ("GET", "/review-service/list-reviews-by-storage-id", {"storage_id": storage_id})
+    return ("GET", "/storage-location/list-storage-location-by-id", {"storage_id": storage_id})
+
+
+def child(target, scenario, database):
+    # One sample, in a fresh process; the result is the last line of stdout
+    from local_harness import LocalHarness
+    harness = LocalHarness(database=database, services=() if target == "db" else (target,))
+    handler = harness.db_lambda.lambda_handler if target == "db" else harness.handlers[target]
+    result = {"import_ms": harness.import_ms[target]}
+    # Different rows for the two requests, so the second does not hit the read cache
+    ids = seeded_ids(database)
+
+    def send(number):
+        storage_id, user_id = ids[number]
+        started = time.perf_counter()
+        if target == "db":
+            response = handler({"action": "fetch_storage_by_id", "data": {"storage_id": storage_id}}, None)
+        else:
+            method, path, query = requests(target, storage_id, user_id)
+            response = harness.request(target, method, path, query=query)
+        if response["statusCode"] != 200:
+            raise SystemExit(f"{target} returned {response['statusCode']}: {response['body']}")
+        return (time.perf_counter() - started) * 1000
+
+    try:
+        if scenario == "warmed":
+            started = time.perf_counter()
+            handler({"warmup": True}, None)
+            result["warmup_ms"] = (time.perf_counter() - started) * 1000
+            result["first_after_warmup_ms"] = send(0)
+        else:
+            result["first_invoke_ms"] = send(0)
+            result["second_invoke_ms"] = send(1)
+    finally:
+        harness.close()
+    import resource
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    print(json.dumps(result))
+
+
+def sample(target, scenario, database, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [
+        os.path.abspath(__file__), "--child", target, scenario, database
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        raise SystemExit(f"{target} ({scenario}) failed:\n{completed.stdout}{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+
+def slowest_imports(stderr, count, target):
+    """
+    Parses -X importtime output into the modules with the largest self time, leaving out the
+    harness and, for a service, the DB Lambda modules the harness loads next to it.
+    """
+    db_modules = {name[:-3] for name in os.listdir(DB_CODE_PATH) if name.endswith(".py")}
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        name = name.strip()
+        if name.startswith("local_harness") or (target != "db" and name in db_modules):
+            continue
+        imports.append((int(self_us), name))
+    return [f"{name} {self_us / 1000:.1f} ms" for self_us, name in sorted(imports, reverse=True)[:count]]
+
+
+def seed_database(path, args):
+    # Seeded in another process, so this one never imports the Lambda code
+    code = (
+        "from local_harness import LocalHarness; "
+        f"h = LocalHarness(database={path!r}); h.seed({args.users}, {args.storages}, {args.rentals}, {args.reviews}); h.close()"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        child(*sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Processes per Lambda and scenario")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma separated: " + ", ".join(TARGETS))
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--storages", type=int, default=500)
+    parser.add_argument("--rentals", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="List the N slowest imports per Lambda")
+    parser.add_argument("--history", help="JSON lines file to append this run to")
+    args = parser.parse_args()
+    targets = [target.strip() for target in args.targets.split(",") if target.strip()]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        sys.exit(f"Unknown targets: {', '.join(sorted(unknown))}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="holdhive-cold-") as directory:
+        database = os.path.join(directory, "holdhive.db")
+        seed_database(database, args)
+        print(f"{args.runs} processes per Lambda and scenario")
+        print(f"{'lambda':<10} " + " ".join(f"{metric:>22}" for metric in METRICS))
+        for target in targets:
+            samples = []
+            for _ in range(args.runs):
+                samples.append(sample(target, "cold", database)[0])
+                samples.append(sample(target, "warmed", database)[0])
+            results[target] = {
+                metric: round(statistics.median(s[metric] for s in samples if metric in s), 3) for metric in METRICS
+            }
+            print(f"{target:<10} " + " ".join(f"{results[target][metric]:>22.2f}" for metric in METRICS))
+            if args.importtime:
+                _, stderr = sample(target, "cold", database, importtime=True)
+                for line in slowest_imports(stderr, args.importtime, target):
+                    print(f"{'':<10} {line}")
+
+    if args.history:
+        previous = None
+        if os.path.exists(args.history):
+            with open(args.history) as history_file:
+                lines = [line for line in history_file if line.strip()]
+            previous = json.loads(lines[-1]) if lines else None
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "runs": args.runs,
+            "results": results,
+        }
+        with open(args.history, "a") as history_file:
+            history_file.write(json.dumps(entry) + "\n")
+        if previous:
+            print(f"\nChange against {previous.get('commit')} ({previous['timestamp']})")
+            for target, metrics in results.items():
+                before = previous["results"].get(target)
+                if before:
+                    changes = [f"{metric} {_change(metrics[metric], before.get(metric))}" for metric in METRICS]
+                    print(f"{target:<10} " + "  ".join(changes))
+
+
+def _change(value, before):
+    return f"{(value - before) / before * 100:+.0f}%" if before else "n/a"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+Drives the service Lambdas with API Gateway events for every route of the API and reports latency per route.
+
+The routes, their parameters and the request mix come from the swagger document. Each run
+replays pre-generated events through the local harness (service Lambda -> DB Lambda ->
+local database) in fresh processes, starting from a copy of one seeded database, so routes
+that write do not change what the next route sees and the peak RSS belongs to that route:
+
+    routes - every route alone, --requests events each
+    mix    - all routes together, weighted by ROUTE_WEIGHTS, --requests events per route on average
+
+Concurrency is --concurrency threads in one process (--executor thread, like concurrent
+requests sharing a warm container's connection pool) or that many processes with one thread
+each (--executor process, like separate containers). Reports p50 / p95 / p99 latency,
+throughput, DB Lambda calls, SQL batches and response body bytes per request and peak RSS;
+--revalidate makes GET requests send the ETag of the previous identical request in
+If-None-Match, like repeat visitors. --output writes JSON and --compare prints the change
+against an earlier --output file:
+
+    python load_benchmark.py --requests 200 --concurrency 8 --output before.json
+    python load_benchmark.py --requests 200 --concurrency 8 --output after.json --compare before.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+
+from local_harness import LocalHarness, synthetic_data
+
+SWAGGER_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "API_Documentation", "holdhive.com-prod-swagger.json")
+
+# Path prefix -> harness service
+SERVICE_PREFIXES = {
+    "/profile": "profile",
+    "/rental-service": "rental",
+    "/review-service": "reviews",
+    "/storage-location": "storage",
+}
+
+# Requests of a route for every 100 requests of the mix; read heavy, like browse -> book traffic.
+# Routes not listed get DEFAULT_WEIGHTS by method.
+DEFAULT_WEIGHTS = {"GET": 4, "POST": 1}
+ROUTE_WEIGHTS = {
+    "GET /storage-location/search": 20,
+    "GET /storage-location/list-storage-location-by-id": 15,
+    "GET /storage-location/check-availablity-date-storage-id": 8,
+    "GET /storage-location/list-storage-location-available-date-range": 6,
+    "GET /review-service/list-reviews-by-storage-id": 8,
+    "GET /storage-location/list-storage-location": 2,
+    "GET /profile/list-all-users": 0.5,
+    "POST /rental-service/create-rental": 3,
+    "POST /review-service/create-review": 2,
+    "POST /rental-service/bulk-create-rentals": 0.2,
+    "POST /review-service/bulk-import-reviews": 0.2,
+    "POST /storage-location/bulk-add-storage-locations": 0.2,
+    "POST /profile/remove-user": 0.2,
+}
+
+# Share of requests that send an optional query parameter
+OPTIONAL_PARAMETER_SHARE = 0.3
+# Optional parameters never sent: cursors only exist after a first page
+SKIPPED_PARAMETERS = {"cursor"}
+
+# Valid fields projections per service
+FIELDS = {
+    "rental": "rental_id,start_date,end_date,total_price",
+    "reviews": "review_id,rating,comment,created_at",
+    "storage": "storage_id,title,price_per_month",
+}
+BULK_SIZE = 10
+PERCENTILES = (50, 95, 99)
+
+
+class SeedData:
+    """
+    Ids of the seeded database that the events refer to.
+    """
+
+    def __init__(self, path):
+        connection = sqlite3.connect(path)
+        try:
+            self.users = [row[0] for row in connection.execute("SELECT user_id FROM Users ORDER BY user_id")]
+            self.owners = sorted({row[0] for row in connection.execute("SELECT owner_id FROM StorageSpaces")})
+            self.storages = [row[0] for row in connection.execute("SELECT storage_id FROM StorageSpaces ORDER BY storage_id")]
+            self.rentals = [row[0] for row in connection.execute("SELECT rental_id FROM Rentals ORDER BY rental_id")]
+            self.reviews = [row[0] for row in connection.execute("SELECT review_id FROM Reviews ORDER BY review_id")]
+            # Rows the delete routes may remove: storages nothing refers to, users that own no
+            # storage and have no current or future rental
+            self.free_storages = [row[0] for row in connection.execute(
+                "SELECT storage_id FROM StorageSpaces s WHERE NOT EXISTS (SELECT 1 FROM Rentals r WHERE r.storage_id = s.storage_id) "
+                "AND NOT EXISTS (SELECT 1 FROM Reviews v WHERE v.storage_id = s.storage_id) ORDER BY storage_id"
+            )]
+            self.free_users = [row[0] for row in connection.execute(
+                "SELECT user_id FROM Users u WHERE NOT EXISTS (SELECT 1 FROM StorageSpaces s WHERE s.owner_id = u.user_id) "
+                "AND NOT EXISTS (SELECT 1 FROM Rentals r WHERE r.renter_id = u.user_id AND r.end_date >= date('now')) "
+                "ORDER BY user_id"
+            )]
+        finally:
+            connection.close()
+        # The other routes leave the rows the delete routes remove alone
+        free = set(self.free_storages) | set(self.free_users)
+        self.storages = [storage_id for storage_id in self.storages if storage_id not in free] or self.storages
+        self.users = [user_id for user_id in self.users if user_id not in free] or self.users
+
+
+class EventFactory:
+    """
+    Builds the (service, method, path, query, body, headers) events of a route.
+    """
+
+    def __init__(self, seed_data, rng):
+        self.data = seed_data
+        self.rng = rng
+        self.today = date.today()
+        # Bookings created by the run use their own slots, far after the seeded rentals
+        self.next_slot = 0
+        self.used = {}
+
+    def window(self):
+        start = self.today + timedelta(days=self.rng.randint(1, 60))
+        return start.isoformat(), (start + timedelta(days=self.rng.randint(7, 30))).isoformat()
+
+    def booking_slot(self):
+        slot = self.next_slot
+        self.next_slot += 1
+        storages = self.data.storages
+        start = self.today + timedelta(days=1000 + 7 * (slot // len(storages)))
+        return storages[slot % len(storages)], start.isoformat(), (start + timedelta(days=5)).isoformat()
+
+    def distinct(self, kind, population):
+        # Each row is deleted once per run; cycles when a run deletes more rows than were seeded
+        used = self.used.setdefault(kind, [])
+        if not used:
+            used.extend(self.rng.sample(population, len(population)))
+        return used.pop()
+
+    def parameter(self, route, name, service):
+        rng, data = self.rng, self.data
+        if name in ("start_date", "end_date"):
+            return None  # Set together by query()
+        values = {
+            "storage_id": lambda: str(rng.choice(data.storages)),
+            "user_id": lambda: rng.choice(data.owners if route.endswith("by-owner-id") else data.users),
+            "owner_id": lambda: rng.choice(data.owners),
+            "renter_id": lambda: rng.choice(data.users),
+            "rental_id": lambda: str(rng.choice(data.rentals)),
+            "review_id": lambda: str(rng.choice(data.reviews)),
+            "storage_ids": lambda: ",".join(str(s) for s in rng.sample(data.storages, min(5, len(data.storages)))),
+            "action": lambda: "get_user_profile",
+            "fields": lambda: FIELDS[service],
+            "page_size": lambda: str(rng.choice((10, 20, 50))),
+            "min_price": lambda: str(rng.choice((20, 50, 100))),
+            "max_price": lambda: str(rng.choice((150, 250, 400))),
+            "min_size": lambda: str(rng.choice((2, 5, 10))),
+            "max_size": lambda: str(rng.choice((20, 40, 60))),
+            "storage_type": lambda: rng.choice(("Garage", "Shed", "Room", "Container")),
+            "insurance_option": lambda: rng.choice(("true", "false")),
+            "eircode_prefix": lambda: rng.choice(("D02", "T12", "H91")),
+            "min_rating": lambda: str(rng.choice((3, 4))),
+            "sort": lambda: rng.choice(("price", "price_desc", "rating", "newest")),
+            "since": lambda: (date.today() - timedelta(days=rng.choice((1, 7, 30)))).isoformat(),
+        }
+        if name not in values:
+            raise ValueError(f"No value for the {name} parameter of {route}")
+        return values[name]()
+
+    def query(self, route, parameters, service):
+        query = {}
+        for parameter in parameters:
+            name = parameter["name"]
+            if name in SKIPPED_PARAMETERS:
+                continue
+            if not parameter.get("required") and self.rng.random() >= OPTIONAL_PARAMETER_SHARE:
+                continue
+            value = self.parameter(route, name, service)
+            if value is not None:
+                query[name] = value
+        if any(parameter["name"] == "start_date" for parameter in parameters):
+            query["start_date"], query["end_date"] = self.window()
+        return query or None
+
+    def body(self, action):
+        rng, data = self.rng, self.data
+        if action == "create_rental":
+            storage_id, start, end = self.booking_slot()
+            return {"action": action, "storage_id": storage_id, "renter_id": rng.choice(data.users),
+                    "start_date": start, "end_date": end, "total_price": 60.0, "payment_status": "pending"}
+        if action == "bulk_create_rentals":
+            rentals = []
+            for _ in range(BULK_SIZE):
+                storage_id, start, end = self.booking_slot()
+                rentals.append({"storage_id": storage_id, "renter_id": rng.choice(data.users), "start_date": start,
+                                "end_date": end, "total_price": 60.0, "payment_status": "pending"})
+            return {"action": action, "rentals": rentals}
+        if action == "delete_rental":
+            return {"action": action, "rental_id": self.distinct("rental", data.rentals)}
+        if action == "create_review":
+            return {"action": action, "storage_id": rng.choice(data.storages), "user_id": rng.choice(data.users),
+                    "rating": rng.randint(1, 5), "comment": "Load test review"}
+        if action == "bulk_import_reviews":
+            return {"action": action, "reviews": [
+                {"storage_id": rng.choice(data.storages), "user_id": rng.choice(data.users), "rating": rng.randint(1, 5),
+                 "comment": "Imported"} for _ in range(BULK_SIZE)
+            ]}
+        if action == "update_review":
+            return {"action": action, "review_id": rng.choice(data.reviews), "rating": rng.randint(1, 5), "comment": "Updated"}
+        if action == "delete_review":
+            return {"action": action, "review_id": self.distinct("review", data.reviews)}
+        if action == "add_storage_location":
+            return dict(self.storage_location(), action=action)
+        if action == "bulk_add_storage_locations":
+            return {"action": action, "storage_locations": [self.storage_location() for _ in range(BULK_SIZE)]}
+        if action == "update_storage_location":
+            return {"action": action, "storage_id": rng.choice(data.storages),
+                    "update_data": {"price_per_month": round(rng.uniform(20, 400), 2)}}
+        if action == "delete_storage_location":
+            return {"action": action, "storage_id": self.distinct("storage", data.free_storages)}
+        if action == "create_account":
+            number = rng.randint(10 ** 8, 10 ** 9)
+            return {"action": action, "data": {"user_id": f"load-{number}", "email": f"load{number}@example.com", "role_name": "user"}}
+        if action == "update_profile":
+            return {"action": action, "data": {"user_id": rng.choice(data.users), "profile_data": {"name": "Load Test", "role_name": "user"}}}
+        if action == "update_user_role":
+            number = rng.choice(data.users).rsplit("-", 1)[-1].lstrip("0")
+            return {"action": action, "data": {"user_email_id": f"user{number}@example.com"}}
+        if action == "remove_user":
+            return {"action": action, "data": {"user_id": self.distinct("user", data.free_users)}}
+        raise ValueError(f"No request body for the {action} action")
+
+    def storage_location(self):
+        return {"user_id": self.rng.choice(self.data.owners), "title": "Load test garage", "description": "Load test",
+                "storage_type": "Garage", "size": 12.5, "location": "1 Test Road, Dublin", "eircode": "D02 LOAD",
+                "price_per_month": round(self.rng.uniform(20, 400), 2), "images_url": "[]", "insurance_option": 0}
+
+    def event(self, route):
+        if route.method == "GET":
+            return (route.service, "GET", route.path, self.query(route.key, route.parameters, route.service), None, None)
+        body = self.body(route.action)
+        headers = None
+        if route.idempotent:
+            headers = {"Idempotency-Key": f"load-{self.rng.getrandbits(64):016x}"}
+        return (route.service, "POST", route.path, None, body, headers)
+
+
+class Route:
+    def __init__(self, method, path, operation, definitions):
+        self.method = method
+        self.path = path
+        self.key = f"{method} {path}"
+        self.service = next(service for prefix, service in SERVICE_PREFIXES.items() if path.startswith(prefix))
+        self.parameters = [p for p in operation.get("parameters", []) if p.get("in") == "query"]
+        self.idempotent = any(p.get("in") == "header" and p.get("name") == "Idempotency-Key" for p in operation.get("parameters", []))
+        self.action = None
+        for parameter in operation.get("parameters", []):
+            if parameter.get("in") == "body":
+                schema = definitions[parameter["schema"]["$ref"].rsplit("/", 1)[-1]]
+                self.action = schema["properties"]["action"]["enum"][0]
+        self.weight = ROUTE_WEIGHTS.get(self.key, DEFAULT_WEIGHTS[method])
+
+
+def load_routes(path=SWAGGER_PATH):
+    """
+    Returns the GET and POST routes of the swagger document (OPTIONS are CORS preflights).
+    """
+    with open(path) as swagger_file:
+        swagger = json.load(swagger_file)
+    routes = []
+    for route_path, operations in swagger["paths"].items():
+        for method, operation in operations.items():
+            if method.upper() in DEFAULT_WEIGHTS:
+                routes.append(Route(method.upper(), route_path, operation, swagger["definitions"]))
+    return routes
+
+
+def _worker(database, transport, environment, events, warmup, threads, revalidate=False):
+    # Runs in a fresh process: its harness, caches and peak RSS belong to this run
+    harness = LocalHarness(database=database, transport=transport, environment=environment)
+    # Last ETag per GET request, for --revalidate
+    etags = {}
+
+    def send(event):
+        service, method, path, query, body, headers = event
+        request_key = (service, path, tuple(sorted((query or {}).items())))
+        if revalidate and method == "GET" and request_key in etags:
+            headers = dict(headers or {}, **{"If-None-Match": etags[request_key]})
+        invocations, batches = harness.round_trips()
+        started = time.perf_counter()
+        response = harness.request(service, method, path, query=query, body=body, headers=headers)
+        elapsed = (time.perf_counter() - started) * 1000
+        after = harness.round_trips()
+        etag = (response.get("headers") or {}).get("ETag")
+        if etag:
+            etags[request_key] = etag
+        return (f"{method} {path}", response["statusCode"], elapsed, after[0] - invocations, after[1] - batches,
+                len(response.get("body") or ""))
+
+    try:
+        for event in events[:warmup]:
+            send(event)
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(send, events[warmup:]))
+        finished = time.time()
+    finally:
+        harness.close()
+    # KB on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"results": results, "started": started, "finished": finished, "peak_rss_mb": peak_rss}
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def summarize(results, elapsed, peak_rss_mb):
+    latencies = [result[2] for result in results]
+    errors = {}
+    for result in results:
+        if result[1] >= 400:
+            errors[str(result[1])] = errors.get(str(result[1]), 0) + 1
+    summary = {
+        "requests": len(results),
+        "errors": errors,
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed else None,
+        "latency_ms": {f"p{p}": round(percentile(latencies, p), 3) for p in PERCENTILES} if latencies else {},
+        "db_invocations_per_request": round(sum(r[3] for r in results) / len(results), 2) if results else None,
+        "sql_batches_per_request": round(sum(r[4] for r in results) / len(results), 2) if results else None,
+        "body_bytes_per_request": round(sum(r[5] for r in results) / len(results)) if results else None,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+    if latencies:
+        summary["latency_ms"]["mean"] = round(sum(latencies) / len(latencies), 3)
+        summary["latency_ms"]["max"] = round(max(latencies), 3)
+    return summary
+
+
+def run(seeded, events, args):
+    """
+    Replays events (pre-generated, in order) against a copy of the seeded database.
+
+    Returns:
+        tuple: (results, elapsed seconds, peak RSS in MB of the largest worker)
+    """
+    processes, threads = (args.concurrency, 1) if args.executor == "process" else (1, args.concurrency)
+    with tempfile.TemporaryDirectory(prefix="holdhive-load-") as directory:
+        database = os.path.join(directory, "holdhive.db")
+        shutil.copyfile(seeded, database)
+        # Round robin, so every process gets its warm-up events and a share of the rest
+        batches = [events[index::processes] for index in range(processes)]
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            futures = [
+                pool.submit(_worker, database, args.transport, args.env, batch, args.warmup, threads, args.revalidate)
+                for batch in batches
+            ]
+            outcomes = [future.result() for future in futures]
+    results = [result for outcome in outcomes for result in outcome["results"]]
+    elapsed = max(o["finished"] for o in outcomes) - min(o["started"] for o in outcomes)
+    return results, elapsed, max(o["peak_rss_mb"] for o in outcomes)
+
+
+def route_events(route, factory, count):
+    return [factory.event(route) for _ in range(count)]
+
+
+def mix_events(routes, factory, count):
+    chosen = factory.rng.choices(routes, weights=[route.weight for route in routes], k=count)
+    return [factory.event(route) for route in chosen]
+
+
+def seed_database(path, args, spare):
+    harness = LocalHarness(database=path, transport=args.transport, environment=args.env)
+    try:
+        harness.seed(args.users, args.storages, args.rentals, args.reviews, args.seed)
+        # Users and storages without rentals or reviews, for the delete routes
+        synthetic_data.generate(path, users=2 * spare, storages=spare, rentals=0, reviews=0, seed=args.seed + 1)
+    finally:
+        harness.close()
+    connection = sqlite3.connect(path)
+    try:
+        # Fold the WAL into the file, which is copied for every run
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        connection.close()
+
+
+def print_row(label, summary):
+    latency = summary["latency_ms"]
+    errors = sum(summary["errors"].values())
+    print(f"{label:<70} {summary['requests']:6d} {summary['throughput_rps'] or 0:9.1f} "
+          f"{latency.get('p50', 0):8.2f} {latency.get('p95', 0):8.2f} {latency.get('p99', 0):8.2f} "
+          f"{summary['db_invocations_per_request'] or 0:6.2f} {summary['sql_batches_per_request'] or 0:7.2f} "
+          f"{summary['body_bytes_per_request'] or 0:9d} {summary['peak_rss_mb']:7.1f} {errors:6d}")
+
+
+def print_header(title):
+    print(f"\n{title}")
+    print(f"{'route':<70} {'reqs':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'db/req':>6} {'sql/req':>7} {'bytes/req':>9} {'RSS MB':>7} {'errors':>6}")
+
+
+def compare(report, previous):
+    """
+    Prints p95 latency and throughput against an earlier report.
+    """
+    print(f"\nChange against {previous['config'].get('commit') or 'the previous report'}")
+    print(f"{'route':<78} {'p95 ms':>17} {'req/s':>17}")
+    rows = [(f"routes: {key}", summary, previous["routes"].get(key)) for key, summary in report["routes"].items()]
+    if "mix" in report and "mix" in previous:
+        rows.append(("mix: total", report["mix"]["total"], previous["mix"]["total"]))
+    for label, summary, before in rows:
+        if not before or not before["latency_ms"] or not summary["latency_ms"]:
+            continue
+        p95, p95_before = summary["latency_ms"]["p95"], before["latency_ms"]["p95"]
+        rps, rps_before = summary["throughput_rps"] or 0, before["throughput_rps"] or 0
+        print(f"{label:<78} {p95:8.2f} {_change(p95, p95_before):>8} {rps:8.1f} {_change(rps, rps_before):>8}")
+
+
+def _change(value, before):
+    return f"{(value - before) / before * 100:+.0f}%" if before else "n/a"
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=("routes", "mix", "both"), default="both")
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per worker process")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--transport", choices=("lambda", "in_process"), default="lambda")
+    parser.add_argument("--routes", help="Only routes whose path contains this text")
+    parser.add_argument("--revalidate", action="store_true", help="Send If-None-Match with the last ETag of each GET")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--storages", type=int, default=500)
+    parser.add_argument("--rentals", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Lambda environment variable, e.g. CACHE_ENABLED=false")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--compare", help="Earlier JSON report to compare with")
+    args = parser.parse_args()
+    args.env = dict(item.split("=", 1) for item in args.env)
+
+    routes = [route for route in load_routes() if not args.routes or args.routes in route.path]
+    if not routes:
+        sys.exit("No route matches --routes")
+    workers = args.concurrency if args.executor == "process" else 1
+    report = {
+        "config": dict(vars(args), commit=_commit(), python=platform.python_version(), platform=platform.platform()),
+        "routes": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="holdhive-seed-") as directory:
+        seeded = os.path.join(directory, "seeded.db")
+        started = time.perf_counter()
+        seed_database(seeded, args, args.requests + args.warmup * workers)
+        seed_data = SeedData(seeded)
+        print(f"Seeded {len(seed_data.users)} users, {len(seed_data.storages)} storages, {len(seed_data.rentals)} rentals, "
+              f"{len(seed_data.reviews)} reviews in {time.perf_counter() - started:.1f} s; "
+              f"{args.concurrency} {args.executor}s, {args.transport} transport")
+
+        if args.mode in ("routes", "both"):
+            print_header("Each route alone")
+            for route in routes:
+                factory = EventFactory(seed_data, random.Random(args.seed))
+                events = route_events(route, factory, args.requests + args.warmup * workers)
+                results, elapsed, peak_rss = run(seeded, events, args)
+                report["routes"][route.key] = summarize(results, elapsed, peak_rss)
+                print_row(route.key, report["routes"][route.key])
+
+        if args.mode in ("mix", "both"):
+            factory = EventFactory(seed_data, random.Random(args.seed))
+            events = mix_events(routes, factory, args.requests * len(routes) + args.warmup * workers)
+            results, elapsed, peak_rss = run(seeded, events, args)
+            by_route = {}
+            for result in results:
+                by_route.setdefault(result[0], []).append(result)
+            report["mix"] = {
+                "total": summarize(results, elapsed, peak_rss),
+                "routes": {key: summarize(route_results, elapsed, peak_rss) for key, route_results in sorted(by_route.items())},
+            }
+            print_header("Weighted mix (req/s is the route's share of the mix throughput)")
+            for key, summary in report["mix"]["routes"].items():
+                print_row(key, summary)
+            print_row("total", report["mix"]["total"])
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.compare:
+        with open(args.compare) as previous_file:
+            compare(report, json.load(previous_file))
+
+    failed = sum(sum(summary["errors"].values()) for summary in report["routes"].values())
+    failed += sum(report.get("mix", {}).get("total", {}).get("errors", {}).values())
+    if failed:
+        sys.exit(f"{failed} requests failed")
+
+
+if __name__ == "__main__":
+    main()
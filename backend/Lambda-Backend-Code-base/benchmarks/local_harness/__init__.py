@@ -0,0 +1,8 @@
+from local_harness.harness import CountingTransport, LambdaContext, LocalHarness, LocalLambdaClient
+
+__all__ = [
+    "CountingTransport",
+    "LambdaContext",
+    "LocalHarness",
+    "LocalLambdaClient",
+]
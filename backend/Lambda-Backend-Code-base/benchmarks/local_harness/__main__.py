@@ -0,0 +1,211 @@
+"""
+Seeds a local database and runs one request per route of the four services through the harness.
+
+Every request goes service Lambda -> holdhive_data_access -> DB Lambda -> local database, so a
+statement the stand-in cannot run, or a route that breaks, shows up as an unexpected status:
+
+    cd backend/Lambda-Backend-Code-base/benchmarks
+    python -m local_harness --users 200 --storages 500 --rentals 5000 --reviews 2000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from local_harness import LocalHarness
+
+
+class SmokeRun:
+    def __init__(self, harness):
+        self.harness = harness
+        self.failures = 0
+
+    def step(self, label, service, method, path, query=None, body=None, headers=None, expect=200, check=None):
+        # check, when given, is a predicate the decoded body must also satisfy
+        started = time.perf_counter()
+        response = self.harness.request(service, method, path, query=query, body=body, headers=headers)
+        elapsed = (time.perf_counter() - started) * 1000
+        decoded = json.loads(response["body"]) if response["body"] else None
+        ok = response["statusCode"] == expect
+        detail = "" if ok else f"  expected {expect}: {response['body'][:200]}"
+        if ok and check is not None and not check(decoded):
+            ok, detail = False, f"  unexpected body: {response['body'][:200]}"
+        self.failures += not ok
+        print(f"{'ok ' if ok else 'ERR'} {response['statusCode']:>3} {elapsed:8.1f} ms  {service:<8} {label}{detail}")
+        return decoded
+
+
+def run(harness, generated):
+    smoke = SmokeRun(harness)
+    storage_id = generated["storage_ids"][0]
+    owner_id = generated["owner_ids"][0]
+    user_id = generated["user_ids"][-1]
+    today = date.today()
+    # Past the generated bookings, which end within a year and a half
+    start, end = (today + timedelta(days=900)).isoformat(), (today + timedelta(days=906)).isoformat()
+
+    # Storage locations
+    smoke.step("list storage locations", "storage", "GET", "/storage-location/list-storage-location", query={})
+    smoke.step("storage by id (fields)", "storage", "GET", "/storage-location/list-storage-location-by-id",
+               query={"storage_id": str(storage_id), "fields": "storage_id,title,price_per_month"})
+    smoke.step("storages by owner", "storage", "GET", "/storage-location/list-storage-location-by-owner-id",
+               query={"user_id": owner_id})
+    smoke.step("available in date range", "storage", "GET", "/storage-location/list-storage-location-available-date-range",
+               query={"start_date": today.isoformat(), "end_date": (today + timedelta(days=14)).isoformat()})
+    smoke.step("quote one storage", "storage", "GET", "/storage-location/check-availablity-date-storage-id",
+               query={"storage_id": str(storage_id), "start_date": start, "end_date": end})
+    smoke.step("quote one storage, reversed dates", "storage", "GET", "/storage-location/check-availablity-date-storage-id",
+               query={"storage_id": str(storage_id), "start_date": end, "end_date": start}, expect=400)
+    smoke.step("quote storages", "storage", "GET", "/storage-location/quote-storages",
+               query={"storage_ids": ",".join(str(s) for s in generated["storage_ids"][:10]), "start_date": start, "end_date": end})
+    page = smoke.step("search, by rating", "storage", "GET", "/storage-location/search",
+                      query={"sort": "rating", "min_price": "50", "page_size": "10"})
+    if page and page.get("next_cursor"):
+        smoke.step("search, next page", "storage", "GET", "/storage-location/search",
+                   query={"sort": "rating", "min_price": "50", "page_size": "10", "cursor": page["next_cursor"]})
+    smoke.step("search, eircode prefix", "storage", "GET", "/storage-location/search",
+               query={"eircode_prefix": "D02", "sort": "newest"})
+    smoke.step("search, unknown sort", "storage", "GET", "/storage-location/search", query={"sort": "size"}, expect=400)
+    changes = smoke.step("storage changes, snapshot", "storage", "GET", "/storage-location/list-storage-changes-since",
+                         query={"page_size": "50", "fields": "storage_id,title"})
+    smoke.step("storage changes, bad since", "storage", "GET", "/storage-location/list-storage-changes-since",
+               query={"since": "yesterday"}, expect=400)
+    smoke.step("add storage location", "storage", "POST", "/storage-location", body={
+        "action": "add_storage_location", "user_id": owner_id, "title": "Smoke test shed", "description": "Harness row",
+        "storage_type": "Shed", "size": 4.5, "location": "1 Test Road, Dublin", "eircode": "D02 TEST",
+        "price_per_month": 45.0, "images_url": "[]", "insurance_option": 0
+    })
+    smoke.step("bulk add storage locations", "storage", "POST", "/storage-location", body={
+        "action": "bulk_add_storage_locations", "storage_locations": [
+            {"user_id": owner_id, "title": f"Smoke locker {i}", "location": "Cork", "price_per_month": 30 + i}
+            for i in range(3)
+        ]
+    })
+    added = harness.db("fetch_storage_by_owner_id", {"owner_id": owner_id, "fields": "storage_id,title"})["body"]
+    added_id = max(row["storage_id"] for row in added)
+    smoke.step("update storage location", "storage", "POST", "/storage-location", body={
+        "action": "update_storage_location", "storage_id": added_id, "update_data": {"price_per_month": 55.0}
+    })
+    smoke.step("delete storage location", "storage", "POST", "/storage-location", body={
+        "action": "delete_storage_location", "storage_id": added_id
+    })
+    if changes:
+        changes = smoke.step("storage changes since the snapshot", "storage", "GET", "/storage-location/list-storage-changes-since",
+                             query={"cursor": changes["next_cursor"]},
+                             check=lambda body: added_id in [row["storage_id"] for row in body["deleted"]])
+    tombstone = next((row for row in (changes or {}).get("deleted", []) if row["storage_id"] == added_id), None)
+    if tombstone:
+        # A feed started after the deletion never reports it, on the first page or later ones
+        since = (datetime.fromisoformat(tombstone["deleted_at"]) + timedelta(milliseconds=10)).isoformat()
+        later = smoke.step("storage changes since, after a deletion", "storage", "GET",
+                           "/storage-location/list-storage-changes-since", query={"since": since},
+                           check=lambda body: body["deleted"] == [])
+        if later:
+            smoke.step("storage changes since, next call", "storage", "GET", "/storage-location/list-storage-changes-since",
+                       query={"cursor": later["next_cursor"]}, check=lambda body: body["deleted"] == [])
+
+    # Rentals
+    page = smoke.step("list rentals", "rental", "GET", "/rental-service/list-all-rentals", query={"page_size": "20"})
+    if page and page.get("next_cursor"):
+        smoke.step("list rentals, next page", "rental", "GET", "/rental-service/list-all-rentals",
+                   query={"page_size": "20", "cursor": page["next_cursor"]})
+    smoke.step("rentals by storage", "rental", "GET", "/rental-service/list-rental-by-storage-id",
+               query={"storage_id": str(storage_id)})
+    smoke.step("rentals by renter", "rental", "GET", "/rental-service/list-rental-by-renter-id", query={"renter_id": user_id})
+    smoke.step("rentals by owner", "rental", "GET", "/rental-service/list-rental-by-owner-id",
+               query={"owner_id": owner_id, "fields": "rental_id,storage_title"})
+    booking = {
+        "action": "create_rental", "storage_id": storage_id, "renter_id": user_id, "start_date": start, "end_date": end,
+        "total_price": 70.0, "payment_status": "pending"
+    }
+    created = smoke.step("create rental", "rental", "POST", "/rental-service", body=booking,
+                         headers={"Idempotency-Key": "smoke-rental-1"})
+    smoke.step("create rental, retried", "rental", "POST", "/rental-service", body=booking,
+               headers={"Idempotency-Key": "smoke-rental-1"})
+    smoke.step("create rental, overlapping", "rental", "POST", "/rental-service", body=booking, expect=409)
+    rental_id = created["data"]["rental_id"] if created else None
+    smoke.step("rental by id", "rental", "GET", "/rental-service/list-rental-by-rental-id", query={"rental_id": str(rental_id)})
+    later = (today + timedelta(days=1000)).isoformat(), (today + timedelta(days=1003)).isoformat()
+    smoke.step("bulk create rentals", "rental", "POST", "/rental-service", body={
+        "action": "bulk_create_rentals", "rentals": [
+            dict(booking, storage_id=storage_id_, start_date=later[0], end_date=later[1])
+            for storage_id_ in generated["storage_ids"][1:4]
+        ]
+    })
+    smoke.step("delete rental", "rental", "POST", "/rental-service", body={"action": "delete_rental", "rental_id": rental_id})
+
+    # Reviews
+    page = smoke.step("list reviews", "reviews", "GET", "/review-service/list-reviews", query={"page_size": "20"})
+    if page and page.get("next_cursor"):
+        smoke.step("list reviews, next page", "reviews", "GET", "/review-service/list-reviews",
+                   query={"page_size": "20", "cursor": page["next_cursor"]})
+    smoke.step("reviews by storage", "reviews", "GET", "/review-service/list-reviews-by-storage-id",
+               query={"storage_id": str(storage_id)})
+    smoke.step("reviews by owner", "reviews", "GET", "/review-service/list-reviews-by-owner-id", query={"owner_id": owner_id})
+    smoke.step("reviews by user", "reviews", "GET", "/review-service/list-reviews-by-user-id", query={"user_id": user_id})
+    review = {"action": "create_review", "storage_id": storage_id, "user_id": user_id, "rating": 4, "comment": "Smoke test"}
+    created = smoke.step("create review", "reviews", "POST", "/review-service", body=review,
+                         headers={"Idempotency-Key": "smoke-review-1"})
+    smoke.step("create review, retried", "reviews", "POST", "/review-service", body=review,
+               headers={"Idempotency-Key": "smoke-review-1"})
+    smoke.step("create review, reused key", "reviews", "POST", "/review-service", body=dict(review, rating=5),
+               headers={"Idempotency-Key": "smoke-review-1"}, expect=422)
+    smoke.step("create review, bad rating", "reviews", "POST", "/review-service", body=dict(review, rating=9), expect=400)
+    review_id = created["data"]["review_id"] if created else None
+    smoke.step("review by id", "reviews", "GET", "/review-service/list-reviews-by-review-id", query={"review_id": str(review_id)})
+    smoke.step("update review", "reviews", "POST", "/review-service", body={
+        "action": "update_review", "review_id": review_id, "rating": 2, "comment": "Changed my mind"
+    })
+    smoke.step("bulk import reviews", "reviews", "POST", "/review-service", body={
+        "action": "bulk_import_reviews", "reviews": [
+            {"storage_id": storage_id_, "user_id": user_id, "rating": 5, "comment": "Imported"}
+            for storage_id_ in generated["storage_ids"][1:4]
+        ]
+    })
+    smoke.step("delete review", "reviews", "POST", "/review-service", body={"action": "delete_review", "review_id": review_id})
+
+    # Profiles
+    smoke.step("create account", "profile", "POST", "/profile", body={
+        "action": "create_account", "data": {"user_id": "smoke-user", "email": "smoke@example.com", "role_name": "user"}
+    })
+    smoke.step("update profile", "profile", "POST", "/profile", body={
+        "action": "update_profile", "data": {"user_id": "smoke-user", "profile_data": {"name": "Smoke Test", "role_name": "user"}}
+    })
+    smoke.step("get user profile", "profile", "GET", "/profile", query={"action": "get_user_profile", "user_id": "smoke-user"})
+    smoke.step("update user role", "profile", "POST", "/profile", body={
+        "action": "update_user_role", "data": {"user_email_id": "smoke@example.com"}
+    })
+    smoke.step("list all users", "profile", "GET", "/profile/list-all-users")
+    smoke.step("remove user", "profile", "POST", "/profile", body={"action": "remove_user", "data": {"user_id": "smoke-user"}})
+    return smoke.failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--storages", type=int, default=500)
+    parser.add_argument("--rentals", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", help="SQLite file to create (default: a temporary file)")
+    parser.add_argument("--transport", choices=("lambda", "in_process"), default="lambda")
+    args = parser.parse_args()
+
+    # No settle lag, so the change feed steps see the writes made just before them
+    harness = LocalHarness(database=args.database, transport=args.transport,
+                           environment={"STORAGE_SYNC_SETTLE_SECONDS": "0"})
+    try:
+        started = time.perf_counter()
+        generated = harness.seed(args.users, args.storages, args.rentals, args.reviews, args.seed)
+        print(f"Seeded {generated['users']} users, {generated['storages']} storages, {generated['rentals']} rentals, "
+              f"{generated['reviews']} reviews in {time.perf_counter() - started:.1f} s ({args.transport} transport)")
+        failures = run(harness, generated)
+    finally:
+        harness.close()
+    if failures:
+        sys.exit(f"{failures} requests returned an unexpected status or body")
+
+
+if __name__ == "__main__":
+    main()
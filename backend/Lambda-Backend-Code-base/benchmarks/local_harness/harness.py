@@ -0,0 +1,251 @@
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from . import pyodbc_standin, schema, synthetic_data
+
+# Runs holdhive_db_transactions and the four service Lambdas in one process against the
+# local database. The services reach the DB Lambda through holdhive_data_access as in AWS:
+# with the default "lambda" transport a LocalLambdaClient stands in for boto3's Lambda client
+# (the event and the response go through JSON as with a real invoke); "in_process" uses the
+# InProcessTransport instead.
+#
+# The DB code keeps its state in module globals (pool, caches), so there is one harness per process.
+
+CODE_BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DB_CODE_PATH = os.path.join(CODE_BASE, "holdhive_db_transactions", "src")
+DATA_ACCESS_PATH = os.path.join(CODE_BASE, "holdhive_data_access", "layer", "python")
+
+DB_FUNCTION_NAME = "holdhive_db_transactions"
+
+# service -> directory of its Lambda
+SERVICES = {
+    "profile": "holdhive_profile_services",
+    "rental": "holdhive_rental_services",
+    "reviews": "holdhive_reviews_services",
+    "storage": "holdhive_storage_locations",
+}
+
+# Lambda settings of the harness; variables already set in the environment win
+DEFAULT_ENVIRONMENT = {
+    "DB_HOST": "localhost",
+    "DB_NAME": "holdhive",
+    "DB_USER": "local",
+    "DB_PASS": "local",
+    "DB_LAMBDA_NAME": DB_FUNCTION_NAME,
+    "METRICS_ENABLED": "false",
+    "LOG_SAMPLE_RATE": "0",
+}
+
+
+class LambdaContext:
+    """
+    The parts of the Lambda context object the handlers may use.
+    """
+
+    def __init__(self, function_name, memory_limit_in_mb=512, timeout_ms=30000):
+        self.function_name = function_name
+        self.memory_limit_in_mb = memory_limit_in_mb
+        self.aws_request_id = str(uuid.uuid4())
+        self.invoked_function_arn = f"arn:aws:lambda:local:000000000000:function:{function_name}"
+        self._timeout_ms = timeout_ms
+
+    def get_remaining_time_in_millis(self):
+        return self._timeout_ms
+
+
+class LocalLambdaClient:
+    """
+    Stand-in for boto3.client('lambda'): invoke() runs a registered handler in-process and
+    returns its response as a JSON payload stream, like the real invoke.
+    """
+
+    def __init__(self):
+        self.functions = {}
+        self.invocations = 0
+
+    def register(self, function_name, handler):
+        self.functions[function_name] = handler
+
+    def invoke(self, FunctionName, InvocationType="RequestResponse", Payload=b"{}", **kwargs):
+        handler = self.functions[FunctionName]
+        self.invocations += 1
+        result = handler(json.loads(Payload), LambdaContext(FunctionName))
+        if InvocationType == "Event":
+            return {"StatusCode": 202, "Payload": io.BytesIO(b"")}
+        # The Lambda runtime fails the same way on a response that is not JSON serializable
+        return {"StatusCode": 200, "Payload": io.BytesIO(json.dumps(result).encode("utf-8"))}
+
+
+class CountingTransport:
+    """
+    Wraps a holdhive_data_access transport and counts the DB Lambda calls of each thread.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self._counters = threading.local()
+
+    @property
+    def invocations(self):
+        return getattr(self._counters, "invocations", 0)
+
+    def warm_up(self):
+        self.transport.warm_up()
+
+    def invoke(self, action, data):
+        self._counters.invocations = self.invocations + 1
+        return self.transport.invoke(action, data)
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class LocalHarness:
+    """
+    The DB Lambda and the service Lambdas wired together over a local database.
+
+    Args:
+        database (str, optional): SQLite file; created from the schema script when missing.
+            Defaults to a new file in a temporary directory, removed by close().
+        transport (str): "lambda" (invoke through LocalLambdaClient) or "in_process".
+        environment (dict, optional): Extra Lambda environment variables (e.g. CACHE_ENABLED).
+        services (iterable, optional): Service Lambdas to load. Defaults to all of SERVICES.
+            They are imported before the DB Lambda, so with one service (or none) in a fresh
+            process import_ms holds cold import times.
+
+    Usage:
+        harness = LocalHarness()
+        harness.seed(users=100, storages=200, rentals=1000, reviews=500)
+        response = harness.request("rental", "GET", "/rental-service/list-all-rentals", query={"page_size": "20"})
+    """
+
+    def __init__(self, database=None, transport="lambda", environment=None, services=None):
+        if "db_client" in sys.modules and sys.modules.get("pyodbc") is not pyodbc_standin:
+            raise RuntimeError("The DB code was already imported with another pyodbc; use a fresh process")
+        self._directory = None
+        if database is None:
+            self._directory = tempfile.mkdtemp(prefix="holdhive-")
+            database = os.path.join(self._directory, "holdhive.db")
+        self.database = database
+        if not os.path.exists(database):
+            schema.create_database(database)
+
+        # Read at import time by the Lambda code, so set before loading it
+        for name, value in DEFAULT_ENVIRONMENT.items():
+            os.environ.setdefault(name, value)
+        os.environ.update({name: str(value) for name, value in (environment or {}).items()})
+        pyodbc_standin.DATABASE_PATH = database
+        sys.modules["pyodbc"] = pyodbc_standin
+        for path in (DATA_ACCESS_PATH, DB_CODE_PATH):
+            if path not in sys.path:
+                sys.path.insert(0, path)
+
+        # Milliseconds spent importing each Lambda module ("db" and the services)
+        self.import_ms = {}
+        # Loaded by path: every service calls its module lambda_function
+        self.handlers = {}
+        for service, directory in SERVICES.items():
+            if services is None or service in services:
+                module = self._import(service, f"{directory}_lambda", os.path.join(CODE_BASE, directory, "src", "lambda_function.py"))
+                self.handlers[service] = module.lambda_handler
+        self.db_lambda = self._import("db", "holdhive_db_transactions_lambda", os.path.join(DB_CODE_PATH, "lambda_function.py"))
+
+        import holdhive_data_access
+        self.lambda_client = LocalLambdaClient()
+        self.lambda_client.register(DB_FUNCTION_NAME, self.db_lambda.lambda_handler)
+        if transport == "lambda":
+            self._transport = CountingTransport(holdhive_data_access.LambdaTransport(DB_FUNCTION_NAME, client=self.lambda_client))
+        elif transport == "in_process":
+            self._transport = CountingTransport(holdhive_data_access.InProcessTransport(code_path=DB_CODE_PATH))
+        else:
+            raise ValueError(f"Unsupported transport: {transport}")
+        holdhive_data_access.set_transport(self._transport)
+        self.transport = transport
+
+    def _import(self, key, name, path):
+        started = time.perf_counter()
+        module = _load_module(name, path)
+        self.import_ms[key] = (time.perf_counter() - started) * 1000
+        return module
+
+    def seed(self, users=200, storages=500, rentals=5000, reviews=2000, seed=42):
+        """
+        Adds synthetic rows (see synthetic_data.generate) and rebuilds the availability index.
+
+        Returns:
+            dict: Row counts and the generated ids.
+        """
+        generated = synthetic_data.generate(self.database, users, storages, rentals, reviews, seed)
+        self.db("rebuild_availability_index")
+        return generated
+
+    def db(self, action, data=None):
+        """
+        Invokes the DB Lambda directly and returns its {"statusCode", "body"} response.
+        """
+        event = json.loads(json.dumps({"action": action, "data": data or {}}))
+        return self.db_lambda.lambda_handler(event, LambdaContext(DB_FUNCTION_NAME))
+
+    def request(self, service, method, path, query=None, body=None, headers=None):
+        """
+        Sends an API Gateway proxy event to a service Lambda.
+
+        Args:
+            service (str): "profile", "rental", "reviews" or "storage".
+            method (str): HTTP method.
+            path (str): Resource path, e.g. "/review-service/list-reviews".
+            query (dict, optional): Query string parameters.
+            body (dict, optional): JSON body.
+            headers (dict, optional): Request headers.
+
+        Returns:
+            dict: The Lambda response; body is the JSON text the client would receive.
+        """
+        event = {
+            "httpMethod": method,
+            "path": path,
+            "headers": headers or {},
+            "queryStringParameters": query,
+            "body": json.dumps(body) if body is not None else None,
+            "requestContext": {"requestId": str(uuid.uuid4())},
+        }
+        if method == "POST" and body is None:
+            event["body"] = "{}"
+        return self.handlers[service](event, LambdaContext(SERVICES[service]))
+
+    def round_trips(self):
+        """
+        Returns the DB Lambda calls and SQL batches made by the calling thread so far; the
+        difference across a request gives its round trips.
+
+        Returns:
+            tuple: (db_invocations, sql_batches)
+        """
+        return self._transport.invocations, pyodbc_standin.batches_sent()
+
+    def reset_caches(self):
+        """
+        Empties the DB Lambda's read cache and idempotency cache, as on a cold start.
+        """
+        import idempotency
+        import read_cache
+        read_cache.configure()
+        idempotency._responses.clear()
+
+    def close(self):
+        import db_client
+        db_client._pool.close_all()
+        if self._directory:
+            shutil.rmtree(self._directory, ignore_errors=True)
@@ -0,0 +1,260 @@
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+from . import tsql
+
+# Stand-in for the pyodbc module over a SQLite database file, installed as sys.modules["pyodbc"]
+# by the local harness. db_client keeps its pool, transactions and error handling; every
+# connect() opens the file configured in DATABASE_PATH and the statements go through tsql.
+#
+# Values come back the way pyodbc returns them for SQL Server columns: DATE / DATETIME as
+# date / datetime, DECIMAL as Decimal (for columns read directly, not for expressions).
+
+DATABASE_PATH = None
+BUSY_TIMEOUT_SECONDS = 30
+
+# Strings compared with DATETIME columns; SQL Server converts them, SQLite compares text,
+# so they are bound in the one format GETDATE() (tsql.NOW_SQL) and the seed data store
+ISO_DATETIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+# Batches sent to the database by each thread, i.e. its round trips
+_counters = threading.local()
+
+
+class Error(Exception):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+class NotSupportedError(DatabaseError):
+    pass
+
+
+def _convert_date(value):
+    text = value.decode()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return text
+
+def _convert_datetime(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+def _convert_decimal(value):
+    try:
+        return Decimal(value.decode())
+    except ArithmeticError:
+        return value.decode()
+
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("DATETIME2", _convert_datetime)
+sqlite3.register_converter("DECIMAL", _convert_decimal)
+
+
+def batches_sent():
+    """
+    Returns the number of batches the calling thread has executed so far.
+    """
+    return getattr(_counters, "batches", 0)
+
+def bind_value(value):
+    """
+    Converts a parameter the way the ODBC driver would see it.
+    """
+    if isinstance(value, datetime):
+        return _datetime_text(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, str) and ISO_DATETIME_PATTERN.match(value):
+        try:
+            return _datetime_text(datetime.fromisoformat(value))
+        except ValueError:
+            return value.replace("T", " ", 1)
+    return value
+
+def _datetime_text(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:23]
+
+def tsql_like(pattern, value):
+    """
+    LIKE with SQL Server semantics: case-insensitive, % and _ wildcards, [...] character sets.
+    """
+    if pattern is None or value is None:
+        return None
+    return _like_regex(pattern).match(str(value)) is not None
+
+def _like_regex(pattern):
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "%":
+            regex.append(".*")
+        elif char == "_":
+            regex.append(".")
+        elif char == "[":
+            close = pattern.find("]", i + 2)
+            if close == -1:
+                regex.append(re.escape(char))
+            else:
+                members = pattern[i + 1:close]
+                negate = members.startswith("^")
+                members = re.escape(members[1:] if negate else members).replace("\\-", "-")
+                regex.append(f"[{'^' if negate else ''}{members}]")
+                i = close
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return re.compile("".join(regex) + r"\Z", re.IGNORECASE | re.DOTALL)
+
+
+def _database_error(error):
+    message = str(error)
+    if isinstance(error, tsql.UnsupportedStatement):
+        return NotSupportedError("HYC00", message)
+    if isinstance(error, sqlite3.IntegrityError):
+        return IntegrityError("23000", message)
+    if isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message):
+        # Lock timeout / deadlock victim, not a broken connection
+        return DatabaseError("40001", message)
+    return ProgrammingError("42000", message)
+
+
+class Cursor:
+    """
+    pyodbc.Cursor over the results of one batch at a time.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.fast_executemany = False
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        _counters.batches = batches_sent() + 1
+        try:
+            state = tsql.run_batch(self.connection.sqlite, sql, [bind_value(value) for value in params])
+        except (sqlite3.Error, tsql.UnsupportedStatement) as e:
+            raise _database_error(e) from e
+        self.description = state.description
+        self.rowcount = state.rowcount
+        self._rows = state.rows
+        if self.connection.autocommit:
+            self.connection.commit()
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        count = 0
+        sent = batches_sent()
+        for params in seq_of_params:
+            self.execute(sql, params)
+            count += max(self.rowcount, 0)
+        # One round trip, as with fast_executemany
+        _counters.batches = sent + 1
+        self.description = None
+        self.rowcount = count
+        self._rows = []
+
+    def fetchone(self):
+        if self.description is None:
+            raise ProgrammingError("24000", "No results. Previous SQL was not a query.")
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=1):
+        if self.description is None:
+            raise ProgrammingError("24000", "No results. Previous SQL was not a query.")
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        if self.description is None:
+            raise ProgrammingError("24000", "No results. Previous SQL was not a query.")
+        rows, self._rows = self._rows, []
+        return rows
+
+    def nextset(self):
+        return False
+
+    def close(self):
+        self._rows = []
+
+
+class Connection:
+    """
+    pyodbc.Connection: statements run in a transaction until commit() / rollback().
+    """
+
+    def __init__(self, path, timeout=BUSY_TIMEOUT_SECONDS):
+        self.sqlite = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+        )
+        self.sqlite.execute("PRAGMA foreign_keys = ON")
+        self.sqlite.create_function("like", 2, tsql_like, deterministic=True)
+        self.autocommit = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        if self.sqlite.in_transaction:
+            self._end("COMMIT")
+
+    def rollback(self):
+        if self.sqlite.in_transaction:
+            self._end("ROLLBACK")
+
+    def _end(self, statement):
+        try:
+            self.sqlite.execute(statement)
+        except sqlite3.Error as e:
+            raise _database_error(e) from e
+
+    def close(self):
+        self.rollback()
+        self.sqlite.close()
+
+
+def connect(connection_string="", autocommit=False, timeout=BUSY_TIMEOUT_SECONDS, **kwargs):
+    """
+    Opens a connection to DATABASE_PATH; the connection string is ignored.
+    """
+    if DATABASE_PATH is None:
+        raise OperationalError("08001", "The local harness has not configured a database")
+    connection = Connection(DATABASE_PATH, timeout)
+    connection.autocommit = autocommit
+    return connection
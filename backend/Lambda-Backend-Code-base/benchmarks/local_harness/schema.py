@@ -0,0 +1,106 @@
+import os
+import re
+import sqlite3
+
+from . import tsql
+
+# Builds the local database from backend/SQL_Schema_Code.sql. The script is a worksheet:
+# besides the DDL it holds sample rows and ad hoc queries. Only the CREATE TABLE / ALTER TABLE
+# ADD / CREATE INDEX statements and the Roles reference rows are applied, in file order,
+# translated to SQLite (IDENTITY seeds, computed columns, INCLUDE columns).
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "SQL_Schema_Code.sql")
+
+# The script is not UTF-8
+SCHEMA_ENCODING = "latin-1"
+
+SCHEMA_STATEMENT_PATTERN = re.compile(
+    r"\b(?:CREATE\s+TABLE|ALTER\s+TABLE|CREATE\s+(?:UNIQUE\s+)?(?:NONCLUSTERED\s+|CLUSTERED\s+)?INDEX|INSERT\s+INTO\s+Roles\b)",
+    re.IGNORECASE
+)
+
+
+def schema_statements(path=SCHEMA_PATH):
+    """
+    Returns the DDL and reference data statements of the schema script, in order.
+    """
+    with open(path, encoding=SCHEMA_ENCODING) as schema_file:
+        script = tsql.strip_comments(schema_file.read())
+    masked = tsql.mask(script)
+    statements = []
+    begin = 0
+    for index, char in enumerate(masked + ";"):
+        if char != ";":
+            continue
+        # Statements are not always terminated; start at the first schema keyword of the chunk
+        match = SCHEMA_STATEMENT_PATTERN.search(masked, begin, index)
+        if match:
+            statements.append(script[match.start():index].strip())
+        begin = index + 1
+    return statements
+
+def create_database(path, schema_path=SCHEMA_PATH):
+    """
+    Creates the SQLite database at path from the schema script.
+    """
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = WAL")
+        for statement in schema_statements(schema_path):
+            apply_statement(connection, statement)
+    finally:
+        connection.close()
+
+def apply_statement(connection, statement):
+    keyword = " ".join(statement.split()[:2]).upper()
+    if keyword == "CREATE TABLE":
+        _create_table(connection, statement)
+    elif keyword == "ALTER TABLE":
+        _alter_table(connection, statement)
+    elif keyword.startswith("INSERT"):
+        connection.execute(tsql.translate_expressions(statement))
+    else:
+        _create_index(connection, statement)
+
+def _create_table(connection, statement):
+    masked = tsql.mask(statement)
+    open_index = masked.index("(")
+    name = statement[len("CREATE TABLE"):open_index].strip()
+    body = statement[open_index + 1:tsql.closing_paren(masked, open_index)]
+    definitions = []
+    identity_seed = None
+    for definition in tsql.split_top(tsql.mask(body), body):
+        identity = re.match(r"(\w+)\s+INT\s+IDENTITY\s*\(\s*(\d+)\s*,\s*1\s*\)\s*PRIMARY\s+KEY", definition, re.IGNORECASE)
+        computed = re.match(r"(\w+)\s+AS\s+(\(.*\))(?:\s+PERSISTED)?$", definition, re.IGNORECASE | re.DOTALL)
+        if identity:
+            definition = f"{identity.group(1)} INTEGER PRIMARY KEY AUTOINCREMENT"
+            identity_seed = int(identity.group(2))
+        elif computed:
+            definition = f"{computed.group(1)} GENERATED ALWAYS AS {computed.group(2)} VIRTUAL"
+        definitions.append(_column_definition(definition))
+    connection.execute(f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(definitions)})")
+    if identity_seed is not None:
+        # First identity value, as with IDENTITY(seed, 1)
+        connection.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (name, identity_seed - 1))
+
+def _column_definition(definition):
+    definition = re.sub(r"\bDEFAULT\s+(?:GETDATE|SYSUTCDATETIME|SYSDATETIME)\s*\(\s*\)", "DEFAULT CURRENT_TIMESTAMP",
+                        definition, flags=re.IGNORECASE)
+    return tsql.translate_ddl_types(definition)
+
+def _alter_table(connection, statement):
+    match = re.match(r"ALTER\s+TABLE\s+(\w+)\s+ADD\s+(.*)$", statement, re.IGNORECASE | re.DOTALL)
+    if match is None:
+        raise tsql.UnsupportedStatement(f"Schema statement: {statement[:80]}")
+    table, definitions = match.groups()
+    existing = {row[1].lower() for row in connection.execute(f"PRAGMA table_info({table})")}
+    for definition in tsql.split_top(tsql.mask(definitions), definitions):
+        # The script re-adds columns that CREATE TABLE already has
+        if definition.split()[0].lower() not in existing:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN {_column_definition(definition)}")
+
+def _create_index(connection, statement):
+    statement = re.sub(r"\bINCLUDE\s*\([^)]*\)", "", statement, flags=re.IGNORECASE)
+    statement = re.sub(r"\b(?:NONCLUSTERED|CLUSTERED)\s+", "", statement, flags=re.IGNORECASE)
+    statement = re.sub(r"\bINDEX\s+", "INDEX IF NOT EXISTS ", statement, count=1, flags=re.IGNORECASE)
+    connection.execute(statement)
@@ -0,0 +1,175 @@
+import json
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+
+# Synthetic users, storage locations, rentals and reviews for the local database, written
+# straight to SQLite (not through the actions) so large scales load in seconds. The rows
+# respect what the actions rely on: rentals of a storage never overlap, a user reviews a
+# storage at most once and StorageReviewStats matches the reviews.
+
+TOWNS = (
+    ("Dublin", "D02"), ("Cork", "T12"), ("Galway", "H91"), ("Limerick", "V94"), ("Kilkenny", "R95"),
+    ("Waterford", "X91"), ("Sligo", "F91"), ("Athlone", "N37"), ("Drogheda", "A92"), ("Tralee", "V92"),
+)
+STORAGE_TYPES = ("Garage", "Basement", "Shed", "Room", "Warehouse", "Container", "Attic")
+PAYMENT_STATUSES = ("paid", "pending", "failed")
+RATING_WEIGHTS = (0.05, 0.08, 0.17, 0.35, 0.35)
+COMMENTS = (
+    "Great space, would rent again.", "Dry and secure, easy access.", "Smaller than described.",
+    "Owner was very helpful.", "Good value for the price.", "A bit hard to find but fine.",
+)
+LATEST_REVIEW_IDS_LIMIT = 50
+ROLE_IDS = {"admin": 1001, "owner": 1002, "renter": 1003, "user": 1004}
+
+# Share of users that own storage locations
+OWNER_SHARE = 0.3
+
+
+def _timestamp(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")[:23]
+
+def generate(path, users=200, storages=500, rentals=5000, reviews=2000, seed=42, today=None):
+    """
+    Adds synthetic rows to the database at path.
+
+    Args:
+        path (str): SQLite database created by schema.create_database.
+        users, storages, rentals, reviews (int): Number of rows of each kind.
+        seed (int): Random seed; the same arguments produce the same rows.
+        today (date, optional): Reference date; rentals span a year before and after it.
+
+    Returns:
+        dict: Row counts and the generated ids (user_ids, owner_ids, storage_ids).
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    now = datetime.combine(today, datetime.min.time())
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("BEGIN")
+        user_ids = _users(connection, rng, users, now)
+        owner_ids = user_ids[:max(1, int(len(user_ids) * OWNER_SHARE))]
+        storage_ids, prices = _storages(connection, rng, storages, owner_ids, now)
+        rental_count = _rentals(connection, rng, rentals, storage_ids, prices, user_ids, today)
+        review_count = _reviews(connection, rng, reviews, storage_ids, user_ids, now)
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+    return {
+        "users": len(user_ids),
+        "storages": len(storage_ids),
+        "rentals": rental_count,
+        "reviews": review_count,
+        "user_ids": user_ids,
+        "owner_ids": owner_ids,
+        "storage_ids": storage_ids,
+    }
+
+def _users(connection, rng, count, now):
+    start = connection.execute("SELECT COUNT(*) FROM Users").fetchone()[0]
+    rows = []
+    for number in range(start + 1, start + count + 1):
+        town, routing_key = rng.choice(TOWNS)
+        created_at = _timestamp(now - timedelta(days=rng.randint(30, 900), seconds=rng.randint(0, 86399)))
+        rows.append((
+            f"user-{number:07d}", f"User {number}", f"user{number}@example.com", f"08{number:08d}",
+            f"https://example.com/profile/{number}.jpg", ROLE_IDS["user"], f"{number} Main Street, {town}",
+            f"{routing_key} {rng.randint(1000, 9999)}", created_at, created_at
+        ))
+    connection.executemany(
+        "INSERT INTO Users (user_id, name, email, phone, profile_image_url, role_id, address, eircode, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    return [row[0] for row in rows]
+
+def _storages(connection, rng, count, owner_ids, now):
+    storage_ids = []
+    prices = {}
+    for _ in range(count):
+        town, routing_key = rng.choice(TOWNS)
+        storage_type = rng.choice(STORAGE_TYPES)
+        size = round(rng.uniform(2, 60), 2)
+        price = round(rng.uniform(20, 400), 2)
+        created_at = _timestamp(now - timedelta(days=rng.randint(0, 700), seconds=rng.randint(0, 86399)))
+        cursor = connection.execute(
+            "INSERT INTO StorageSpaces (owner_id, title, description, storage_type, size, location, eircode, "
+            "price_per_month, availability, images_url, insurance_option, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                rng.choice(owner_ids), f"{storage_type} in {town}",
+                f"{size} square metre {storage_type.lower()} available for storage in {town}.",
+                storage_type, size, f"{rng.randint(1, 300)} {town} Road, {town}", f"{routing_key} {rng.randint(1000, 9999)}",
+                price, "available" if rng.random() < 0.9 else "rented",
+                json.dumps([f"https://example.com/storage/{rng.randint(1, 10 ** 6)}.jpg"]),
+                int(rng.random() < 0.4), created_at, created_at
+            )
+        )
+        storage_ids.append(cursor.lastrowid)
+        prices[cursor.lastrowid] = price
+    return storage_ids, prices
+
+def _rentals(connection, rng, count, storage_ids, prices, user_ids, today):
+    if not storage_ids:
+        return 0
+    # Back to back bookings per storage, starting a year ago, so none of them overlap
+    next_free = {storage_id: today - timedelta(days=365) for storage_id in storage_ids}
+    rows = []
+    for _ in range(count):
+        storage_id = rng.choice(storage_ids)
+        start = next_free[storage_id] + timedelta(days=rng.randint(0, 20))
+        end = start + timedelta(days=rng.randint(7, 90))
+        next_free[storage_id] = end + timedelta(days=1)
+        days = (end - start).days + 1
+        created_at = _timestamp(datetime.combine(start, datetime.min.time()) - timedelta(days=rng.randint(1, 30)))
+        rows.append((
+            storage_id, rng.choice(user_ids), start.isoformat(), end.isoformat(),
+            round(prices[storage_id] / 30 * days, 2), rng.choice(PAYMENT_STATUSES), created_at, created_at
+        ))
+    connection.executemany(
+        "INSERT INTO Rentals (storage_id, renter_id, start_date, end_date, total_price, payment_status, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+    return len(rows)
+
+def _reviews(connection, rng, count, storage_ids, user_ids, now):
+    if not storage_ids or not user_ids:
+        return 0
+    count = min(count, len(storage_ids) * len(user_ids))
+    pairs = set()
+    rows = []
+    while len(rows) < count:
+        pair = (rng.choice(storage_ids), rng.choice(user_ids))
+        if pair in pairs:
+            continue
+        pairs.add(pair)
+        rating = rng.choices((1, 2, 3, 4, 5), RATING_WEIGHTS)[0]
+        created_at = _timestamp(now - timedelta(days=rng.randint(0, 700), seconds=rng.randint(0, 86399)))
+        rows.append(pair + (rating, rng.choice(COMMENTS), created_at))
+    connection.executemany(
+        "INSERT INTO Reviews (storage_id, user_id, rating, comment, created_at) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    _review_stats(connection, {storage_id for storage_id, _ in pairs})
+    return len(rows)
+
+def _review_stats(connection, storage_ids):
+    # Same summary the review actions maintain (see review_stats.py)
+    reviews = {}
+    for review_id, storage_id, rating, created_at in connection.execute(
+        "SELECT review_id, storage_id, rating, created_at FROM Reviews"
+    ):
+        if storage_id in storage_ids:
+            reviews.setdefault(storage_id, []).append((created_at, review_id, rating))
+    rows = []
+    for storage_id, storage_reviews in reviews.items():
+        storage_reviews.sort(reverse=True)
+        ratings = [rating for _, _, rating in storage_reviews]
+        latest = ",".join(str(review_id) for _, review_id, _ in storage_reviews[:LATEST_REVIEW_IDS_LIMIT])
+        rows.append([storage_id, len(ratings), sum(ratings)] + [ratings.count(r) for r in (1, 2, 3, 4, 5)] + [latest])
+    connection.executemany(
+        "INSERT OR REPLACE INTO StorageReviewStats (storage_id, review_count, rating_sum, rating_1_count, rating_2_count, "
+        "rating_3_count, rating_4_count, rating_5_count, latest_review_ids) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
@@ -0,0 +1,747 @@
+import re
+from functools import lru_cache
+
+# T-SQL batches of the holdhive_db_transactions actions, run on SQLite.
+#
+# Statements are rewritten where SQLite has an equivalent (TOP -> LIMIT, OPENJSON -> json_each,
+# STRING_AGG -> group_concat, OUTPUT -> RETURNING, locking hints dropped), and what SQLite has
+# no statement for (DECLARE, SET @var, IF ... BEGIN ... END, MERGE, OUTPUT ... INTO a table
+# variable) is carried out here, one statement at a time. This covers the T-SQL the DB actions
+# use, not T-SQL in general: anything else is passed through and fails in SQLite, or raises
+# UnsupportedStatement, rather than silently running something different.
+
+# GETDATE() and friends; stored as text, so it must sort like the values the actions bind
+NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+LOCK_HINTS = ("NOLOCK", "UPDLOCK", "HOLDLOCK", "ROWLOCK", "XLOCK", "READPAST", "TABLOCK", "TABLOCKX", "PAGLOCK",
+              "SERIALIZABLE", "READCOMMITTED", "REPEATABLEREAD")
+LOCK_HINT_PATTERN = re.compile(
+    rf"\s+WITH\s*\(\s*(?:{'|'.join(LOCK_HINTS)})(?:\s*,\s*\w+)*\s*\)", re.IGNORECASE
+)
+
+DATEADD_UNITS = {
+    "SECOND": "seconds", "SS": "seconds", "S": "seconds",
+    "MINUTE": "minutes", "MI": "minutes", "N": "minutes",
+    "HOUR": "hours", "HH": "hours",
+    "DAY": "days", "DD": "days", "D": "days",
+    "MONTH": "months", "MM": "months", "M": "months",
+    "YEAR": "years", "YY": "years", "YYYY": "years",
+}
+
+WRITE_KEYWORDS = ("INSERT", "UPDATE", "DELETE", "MERGE")
+
+
+class UnsupportedStatement(Exception):
+    """
+    Raised for T-SQL the stand-in does not know how to run.
+    """
+
+
+# Text scanning. Searches run on a masked copy of the statement (string literals blanked,
+# same length), so keywords and parentheses inside literals are never matched.
+
+def strip_comments(sql):
+    out = []
+    i = 0
+    while i < len(sql):
+        if sql[i] == "'":
+            end = _string_end(sql, i)
+            out.append(sql[i:end])
+            i = end
+        elif sql.startswith("--", i):
+            newline = sql.find("\n", i)
+            i = len(sql) if newline == -1 else newline
+        elif sql.startswith("/*", i):
+            close = sql.find("*/", i + 2)
+            i = len(sql) if close == -1 else close + 2
+            out.append(" ")
+        else:
+            out.append(sql[i])
+            i += 1
+    return "".join(out)
+
+def _string_end(sql, start):
+    i = start + 1
+    while i < len(sql):
+        if sql[i] == "'":
+            if sql.startswith("''", i):
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return len(sql)
+
+def mask(sql):
+    out = []
+    i = 0
+    while i < len(sql):
+        if sql[i] == "'":
+            end = _string_end(sql, i)
+            out.append("'" + "_" * (end - i - 2) + "'" if end - i >= 2 else sql[i:end])
+            i = end
+        else:
+            out.append(sql[i])
+            i += 1
+    return "".join(out)
+
+def depths(masked):
+    """
+    Parenthesis depth at every character; an opening parenthesis belongs to the outer level.
+    """
+    result = []
+    depth = 0
+    for char in masked:
+        if char == ")":
+            depth -= 1
+        result.append(depth)
+        if char == "(":
+            depth += 1
+    return result
+
+def closing_paren(masked, open_index):
+    depth = 0
+    for i in range(open_index, len(masked)):
+        if masked[i] == "(":
+            depth += 1
+        elif masked[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise UnsupportedStatement(f"Unbalanced parentheses: {masked[open_index:open_index + 60]}")
+
+def find_top(masked, pattern, start=0, level=0, flags=re.IGNORECASE):
+    """
+    First match of pattern at the given parenthesis depth, or None.
+    """
+    levels = depths(masked)
+    for match in re.finditer(pattern, masked[start:], flags):
+        position = start + match.start()
+        if levels[position] == level:
+            return _Shifted(match, start)
+    return None
+
+def split_top(masked, sql, separator=","):
+    parts = []
+    levels = depths(masked)
+    begin = 0
+    for i, char in enumerate(masked):
+        if char == separator and levels[i] == 0:
+            parts.append(sql[begin:i])
+            begin = i + 1
+    parts.append(sql[begin:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+class _Shifted:
+    # re.Match with positions relative to the whole text
+    def __init__(self, match, offset):
+        self.match = match
+        self.offset = offset
+
+    def start(self, group=0):
+        return self.match.start(group) + self.offset
+
+    def end(self, group=0):
+        return self.match.end(group) + self.offset
+
+    def group(self, group=0):
+        return self.match.group(group)
+
+
+# Expression level rewrites
+
+def number_params(sql):
+    """
+    Turns the positional ? markers into :p1, :p2, ... so clauses can be moved around
+    (TOP -> LIMIT) without changing which value they bind.
+    """
+    masked = mask(sql)
+    out = []
+    count = 0
+    for char, original in zip(masked, sql):
+        if char == "?":
+            count += 1
+            out.append(f":p{count}")
+        else:
+            out.append(original)
+    return "".join(out), count
+
+def _rewrite_calls(sql, name, rewrite):
+    # Replaces every name(args) call; rewrite gets the raw argument text and translates
+    # nested calls itself, so the search continues after the replacement
+    pattern = re.compile(rf"\b{name}\s*\(", re.IGNORECASE)
+    position = 0
+    while True:
+        masked = mask(sql)
+        match = pattern.search(masked, position)
+        if match is None:
+            return sql
+        open_index = match.end() - 1
+        close = closing_paren(masked, open_index)
+        replacement = rewrite(sql[open_index + 1:close])
+        sql = sql[:match.start()] + replacement + sql[close + 1:]
+        position = match.start() + len(replacement)
+
+def _cast(arguments):
+    masked = mask(arguments)
+    split = None
+    for match in re.finditer(r"\s+AS\s+", masked, re.IGNORECASE):
+        if depths(masked)[match.start()] == 0:
+            split = match
+    if split is None:
+        raise UnsupportedStatement(f"CAST without AS: {arguments}")
+    value = translate_expressions(arguments[:split.start()])
+    type_name = arguments[split.end():].strip().upper()
+    base = re.match(r"\w+", type_name).group(0)
+    if base in ("DATE",):
+        return f"date({value})"
+    if base in ("DATETIME", "DATETIME2", "SMALLDATETIME"):
+        return f"strftime('%Y-%m-%d %H:%M:%f', {value})"
+    if base in ("VARBINARY", "BINARY", "IMAGE"):
+        return f"({value})"
+    if base in ("INT", "INTEGER", "BIGINT", "SMALLINT", "TINYINT", "BIT"):
+        return f"CAST({value} AS INTEGER)"
+    if base in ("DECIMAL", "NUMERIC", "FLOAT", "REAL", "MONEY"):
+        return f"CAST({value} AS REAL)"
+    return f"CAST({value} AS TEXT)"
+
+def _dateadd(arguments):
+    parts = split_top(mask(arguments), arguments)
+    if len(parts) != 3 or parts[0].upper() not in DATEADD_UNITS:
+        raise UnsupportedStatement(f"DATEADD({arguments})")
+    amount, value = translate_expressions(parts[1]), translate_expressions(parts[2])
+    return f"strftime('%Y-%m-%d %H:%M:%f', {value}, printf('%+d {DATEADD_UNITS[parts[0].upper()]}', {amount}))"
+
+def _string_agg(sql):
+    # STRING_AGG(x, sep) WITHIN GROUP (ORDER BY ...) -> group_concat(x, sep). SQLite before 3.44
+    # has no ordered aggregates; the repo's aggregates read an already ordered subquery.
+    pattern = re.compile(r"\bSTRING_AGG\s*\(", re.IGNORECASE)
+    while True:
+        masked = mask(sql)
+        match = pattern.search(masked)
+        if match is None:
+            return sql
+        close = closing_paren(masked, match.end() - 1)
+        arguments = sql[match.end():close]
+        end = close + 1
+        within = re.match(r"\s*WITHIN\s+GROUP\s*\(", masked[end:], re.IGNORECASE)
+        if within:
+            end = closing_paren(masked, end + within.end() - 1) + 1
+        sql = sql[:match.start()] + f"group_concat({arguments})" + sql[end:]
+
+def _openjson(sql):
+    # OPENJSON(x) -> json_each(x); OPENJSON(x) WITH (name TYPE, ...) -> a json_extract subquery
+    pattern = re.compile(r"\bOPENJSON\s*\(", re.IGNORECASE)
+    while True:
+        masked = mask(sql)
+        match = pattern.search(masked)
+        if match is None:
+            return sql
+        close = closing_paren(masked, match.end() - 1)
+        source = sql[match.end():close]
+        end = close + 1
+        with_clause = re.match(r"\s*WITH\s*\(", masked[end:], re.IGNORECASE)
+        if not with_clause:
+            sql = sql[:match.start()] + f"json_each({source})" + sql[end:]
+            continue
+        open_index = end + with_clause.end() - 1
+        with_close = closing_paren(masked, open_index)
+        columns = []
+        for definition in split_top(mask(sql[open_index + 1:with_close]), sql[open_index + 1:with_close]):
+            name, type_name = definition.split(None, 1)
+            columns.append(_cast(f"json_extract(value, '$.{name}') AS {type_name}") + f" AS {name}")
+        sql = sql[:match.start()] + f"(SELECT {', '.join(columns)} FROM json_each({source}))" + sql[with_close + 1:]
+
+def _top(sql):
+    # SELECT TOP (n) ... -> SELECT ... LIMIT n, at the end of the enclosing parentheses or statement
+    pattern = re.compile(r"\bTOP\b\s*(\(\s*)?", re.IGNORECASE)
+    while True:
+        masked = mask(sql)
+        match = pattern.search(masked)
+        if match is None:
+            return sql
+        if match.group(1):
+            close = closing_paren(masked, match.end() - len(match.group(1)))
+            limit = sql[match.end():close].strip()
+            end = close + 1
+        else:
+            number = re.match(r"\d+|:p\d+", sql[match.end():])
+            if number is None:
+                raise UnsupportedStatement(f"TOP without a limit: {sql[match.start():match.start() + 40]}")
+            limit = number.group(0)
+            end = match.end() + number.end()
+        level = depths(masked)[match.start()]
+        scope_end = len(sql)
+        if level > 0:
+            levels = depths(masked)
+            scope_end = next(i for i in range(end, len(masked)) if masked[i] == ")" and levels[i] == level - 1)
+        sql = sql[:match.start()] + sql[end:scope_end].rstrip() + f" LIMIT {limit}" + sql[scope_end:]
+
+def translate_expressions(sql):
+    """
+    Rewrites the T-SQL functions and clauses that have a SQLite equivalent.
+    """
+    sql = LOCK_HINT_PATTERN.sub("", sql)
+    sql = re.sub(r"\b(?:GETDATE|SYSUTCDATETIME|SYSDATETIME|GETUTCDATE)\s*\(\s*\)", NOW_SQL, sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\[(\w+)\]", r'"\1"', sql)
+    sql = _openjson(sql)
+    sql = _string_agg(sql)
+    sql = _rewrite_calls(sql, "DATEADD", _dateadd)
+    sql = _rewrite_calls(sql, "CAST", _cast)
+    sql = re.sub(r"\bISNULL\s*\(", "ifnull(", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bLEN\s*\(", "length(", sql, flags=re.IGNORECASE)
+    return _top(sql)
+
+
+# Statements
+
+class Statement:
+    """
+    One compiled statement of a batch. run() executes it on the batch state.
+    """
+    writes = False
+
+    def run(self, state):
+        raise NotImplementedError
+
+
+class Skip(Statement):
+    def run(self, state):
+        pass
+
+
+class Plain(Statement):
+    def __init__(self, sql):
+        self.sql = sql
+        self.writes = first_keyword(sql) in WRITE_KEYWORDS
+
+    def run(self, state):
+        state.execute(self.sql)
+
+
+class DeclareTable(Statement):
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = columns
+
+    def run(self, state):
+        state.connection.execute(f"DROP TABLE IF EXISTS temp.{self.name}")
+        state.connection.execute(f"CREATE TEMP TABLE {self.name} ({self.columns})")
+        state.temp_tables.append(self.name)
+
+
+class SetVariable(Statement):
+    def __init__(self, name, expression):
+        self.name = name
+        self.expression = expression
+
+    def run(self, state):
+        value = None
+        if self.expression is not None:
+            value = state.connection.execute(f"SELECT {self.expression}", state.params).fetchone()[0]
+        state.params[f"v_{self.name}"] = value
+
+
+class If(Statement):
+    def __init__(self, condition, body, otherwise):
+        self.condition = condition
+        self.body = body
+        self.otherwise = otherwise
+        self.writes = any(statement.writes for statement in body + otherwise)
+
+    def run(self, state):
+        row = state.connection.execute(f"SELECT CASE WHEN {self.condition} THEN 1 ELSE 0 END", state.params).fetchone()
+        for statement in self.body if row[0] else self.otherwise:
+            statement.run(state)
+
+
+class Output:
+    """
+    OUTPUT clause: columns of the inserted / deleted row images and $action, returned as a
+    result set or inserted INTO a table variable.
+    """
+
+    def __init__(self, clause):
+        into = re.search(r"\s+INTO\s+(\w+)\s*$", clause, re.IGNORECASE)
+        self.into = into.group(1) if into else None
+        if into:
+            clause = clause[:into.start()]
+        self.columns = []
+        for expression in split_top(mask(clause), clause):
+            alias = re.search(r"\s+(?:AS\s+)?(\w+)$", expression, re.IGNORECASE)
+            source = expression
+            name = None
+            if alias and not re.match(r"^(?:inserted|deleted)\.\w+$|^\$action$", expression, re.IGNORECASE):
+                source, name = expression[:alias.start()].strip(), alias.group(1)
+            reference = re.match(r"^(inserted|deleted)\.(\w+)$", source, re.IGNORECASE)
+            if source.lower() == "$action":
+                self.columns.append((name or "$action", None, None))
+            elif reference:
+                self.columns.append((name or reference.group(2), reference.group(1).lower(), reference.group(2)))
+            else:
+                raise UnsupportedStatement(f"OUTPUT expression: {expression}")
+
+    def emit(self, state, changes):
+        """
+        changes: (action, inserted row or None, deleted row or None) per affected row.
+        """
+        rows = []
+        for action, inserted, deleted in changes:
+            images = {"inserted": inserted or {}, "deleted": deleted or {}}
+            rows.append(tuple(action if image is None else images[image].get(column)
+                              for _, image, column in self.columns))
+        if self.into:
+            if rows:
+                placeholders = ", ".join("?" for _ in self.columns)
+                state.connection.executemany(f"INSERT INTO {self.into} VALUES ({placeholders})", rows)
+            state.rowcount = len(rows)
+        else:
+            state.result([name for name, _, _ in self.columns], rows)
+
+
+def _row_dicts(cursor):
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class OutputDml(Statement):
+    """
+    INSERT / UPDATE / DELETE with an OUTPUT clause. SQLite's RETURNING only sees the new row
+    image, so an UPDATE reads the old images first.
+    """
+    writes = True
+
+    def __init__(self, kind, table, sql, where, output):
+        self.kind = kind
+        self.table = table
+        self.sql = sql
+        self.where = where
+        self.output = output
+
+    def run(self, state):
+        connection = state.connection
+        if self.kind == "UPDATE":
+            before = {row["__rowid"]: row for row in _row_dicts(connection.execute(
+                f"SELECT rowid AS __rowid, * FROM {self.table} {self.where}", state.params
+            ))}
+            after = _row_dicts(connection.execute(f"{self.sql} RETURNING rowid AS __rowid, *", state.params))
+            changes = [("UPDATE", row, before.get(row["__rowid"])) for row in after]
+        else:
+            rows = _row_dicts(connection.execute(f"{self.sql} RETURNING *", state.params))
+            changes = [(self.kind, row, None) if self.kind == "INSERT" else (self.kind, None, row) for row in rows]
+        self.output.emit(state, changes)
+
+
+class Merge(Statement):
+    """
+    MERGE run row by row: the source is read once, each source row updates (or deletes) the
+    target row it matches or inserts a new one.
+    """
+    writes = True
+
+    def __init__(self, table, alias, source, source_alias, condition, matched, not_matched, output):
+        self.table = table
+        self.alias = alias
+        self.source = source
+        self.condition = _bind_source(condition, source_alias)
+        self.matched = matched and (matched[0], _bind_source(matched[1], source_alias))
+        self.not_matched = not_matched and (
+            not_matched[0], [_bind_source(value, source_alias) for value in not_matched[1]]
+        )
+        self.output = output
+
+    def run(self, state):
+        connection = state.connection
+        source_rows = _row_dicts(connection.execute(self.source, state.params))
+        changes = []
+        for source_row in source_rows:
+            params = dict(state.params, **{f"src_{column}": value for column, value in source_row.items()})
+            targets = _row_dicts(connection.execute(
+                f"SELECT rowid AS __rowid, * FROM {self.table} AS {self.alias} WHERE {self.condition}", params
+            ))
+            if len(targets) > 1:
+                raise UnsupportedStatement(f"MERGE source row matches {len(targets)} rows of {self.table}")
+            if targets and self.matched:
+                target = targets[0]
+                params["__rowid"] = target["__rowid"]
+                kind, assignments = self.matched
+                if kind == "DELETE":
+                    connection.execute(f"DELETE FROM {self.table} WHERE rowid = :__rowid", params)
+                    changes.append(("DELETE", None, target))
+                else:
+                    updated = _row_dicts(connection.execute(
+                        f"UPDATE {self.table} AS {self.alias} SET {assignments} WHERE rowid = :__rowid RETURNING *",
+                        params
+                    ))
+                    changes.append(("UPDATE", updated[0], target))
+            elif not targets and self.not_matched:
+                columns, values = self.not_matched
+                inserted = _row_dicts(connection.execute(
+                    f"INSERT INTO {self.table} ({columns}) VALUES ({', '.join(values)}) RETURNING *", params
+                ))
+                changes.append(("INSERT", inserted[0], None))
+        state.rowcount = len(changes)
+        if self.output:
+            self.output.emit(state, changes)
+
+
+def _bind_source(sql, source_alias):
+    # src.column -> :src_column, bound per source row
+    return re.sub(rf"\b{source_alias}\.(\w+)\b", r":src_\1", sql)
+
+def first_keyword(sql):
+    match = re.match(r"\s*(\w+)", sql)
+    return match.group(1).upper() if match else ""
+
+
+# Compilation
+
+@lru_cache(maxsize=512)
+def compile_batch(sql):
+    """
+    Compiles a T-SQL batch into statements. Cached per statement text, like a plan cache.
+
+    Returns:
+        tuple: (statements, parameter count)
+    """
+    sql, count = number_params(strip_comments(sql))
+    table_variables = set(re.findall(r"\bDECLARE\s+@(\w+)\s+TABLE\b", sql, re.IGNORECASE))
+    statements, _ = _parse_block(sql, 0, table_variables, in_block=False)
+    return tuple(statements), count
+
+def _parse_block(sql, position, table_variables, in_block):
+    statements = []
+    masked = mask(sql)
+    while True:
+        skip = re.match(r"[\s;]*", masked[position:])
+        position += skip.end()
+        if position >= len(sql):
+            if in_block:
+                raise UnsupportedStatement("BEGIN without END")
+            return statements, position
+        word = first_keyword(masked[position:])
+        if in_block and word == "END":
+            return statements, position + 3
+        if word == "IF":
+            begin = find_top(masked, r"\bBEGIN\b", position)
+            if begin is None:
+                raise UnsupportedStatement("IF without a BEGIN ... END block")
+            condition = _substitute_variables(sql[position + 2:begin.start()], table_variables)
+            body, position = _parse_block(sql, begin.end(), table_variables, in_block=True)
+            otherwise = []
+            if re.match(r"\s*ELSE\s+BEGIN\b", masked[position:], re.IGNORECASE):
+                start = position + re.match(r"\s*ELSE\s+BEGIN\b", masked[position:], re.IGNORECASE).end()
+                otherwise, position = _parse_block(sql, start, table_variables, in_block=True)
+            statements.append(If(translate_expressions(condition), body, otherwise))
+            continue
+        end = _statement_end(masked, position, in_block)
+        statements.append(compile_statement(sql[position:end], table_variables))
+        position = end
+
+def _statement_end(masked, position, in_block):
+    # The next ";" at depth 0, or the END closing the block (CASE ... END excluded)
+    levels = depths(masked)
+    case_depth = 0
+    for match in re.finditer(r";|\bCASE\b|\bEND\b", masked[position:], re.IGNORECASE):
+        index = position + match.start()
+        if levels[index] != 0:
+            continue
+        token = match.group(0).upper()
+        if token == ";":
+            return index
+        if token == "CASE":
+            case_depth += 1
+        elif case_depth:
+            case_depth -= 1
+        elif in_block:
+            return index
+    return len(masked)
+
+def _substitute_variables(sql, table_variables):
+    def replace(match):
+        name = match.group(1)
+        return f"tv_{name}" if name in table_variables else f":v_{name}"
+    return re.sub(r"@(\w+)", replace, sql)
+
+def compile_statement(sql, table_variables=frozenset()):
+    """
+    Compiles one statement (parameters already numbered).
+    """
+    sql = sql.strip()
+    word = first_keyword(sql)
+
+    if word == "SET":
+        if re.match(r"SET\s+(?:NOCOUNT|XACT_ABORT|ANSI_\w+|TRANSACTION\s+ISOLATION)\b", sql, re.IGNORECASE):
+            return Skip()
+        assignment = re.match(r"SET\s+@(\w+)\s*=\s*(.+)$", sql, re.IGNORECASE | re.DOTALL)
+        if assignment is None:
+            raise UnsupportedStatement(sql)
+        expression = _substitute_variables(assignment.group(2), table_variables)
+        return SetVariable(assignment.group(1), translate_expressions(expression))
+
+    if word == "DECLARE":
+        table = re.match(r"DECLARE\s+@(\w+)\s+TABLE\s*\((.*)\)\s*$", sql, re.IGNORECASE | re.DOTALL)
+        if table:
+            return DeclareTable(f"tv_{table.group(1)}", translate_ddl_types(table.group(2)))
+        scalar = re.match(r"DECLARE\s+@(\w+)\s+\w+(?:\s*\([^)]*\))?\s*(?:=\s*(.+))?$", sql, re.IGNORECASE | re.DOTALL)
+        if scalar is None:
+            raise UnsupportedStatement(sql)
+        expression = scalar.group(2) and translate_expressions(_substitute_variables(scalar.group(2), table_variables))
+        return SetVariable(scalar.group(1), expression)
+
+    sql = translate_expressions(_substitute_variables(sql, table_variables))
+    if word == "MERGE":
+        return _compile_merge(sql)
+    if word == "UPDATE":
+        sql = _update_from(sql)
+    if word == "DELETE":
+        sql = _delete_from_join(sql)
+    if word in ("INSERT", "UPDATE", "DELETE") and find_top(mask(sql), r"\bOUTPUT\b"):
+        return _compile_output_dml(word, sql)
+    return Plain(sql)
+
+def translate_ddl_types(sql):
+    return re.sub(r"\(\s*MAX\s*\)", "", sql, flags=re.IGNORECASE)
+
+def _update_from(sql):
+    # UPDATE alias SET ... FROM Table alias JOIN other o ON cond [WHERE w]
+    #   -> UPDATE Table AS alias SET ... FROM other AS o WHERE cond [AND w]
+    masked = mask(sql)
+    head = re.match(r"UPDATE\s+(\w+)\s+SET\s+", masked, re.IGNORECASE)
+    from_clause = find_top(masked, r"\bFROM\b")
+    if head is None or from_clause is None:
+        return sql
+    alias = head.group(1)
+    assignments = sql[head.end():from_clause.start()].strip()
+    rest = sql[from_clause.end():]
+    match = re.match(
+        rf"\s*(\w+)\s+(?:AS\s+)?{alias}\s+(?:INNER\s+)?JOIN\s+(\w+)\s+(?:AS\s+)?(\w+)\s+ON\s+(.*)$",
+        rest, re.IGNORECASE | re.DOTALL
+    )
+    if match is None:
+        raise UnsupportedStatement(f"UPDATE ... FROM: {sql}")
+    table, joined, joined_alias, tail = match.groups()
+    where = find_top(mask(tail), r"\bWHERE\b")
+    condition = tail if where is None else f"{tail[:where.start()]}) AND ({tail[where.end():]}"
+    return f"UPDATE {table} AS {alias} SET {assignments} FROM {joined} AS {joined_alias} WHERE ({condition.strip()})"
+
+def _delete_from_join(sql):
+    # DELETE alias FROM Table alias JOIN ... -> DELETE FROM Table WHERE rowid IN (SELECT alias.rowid ...)
+    match = re.match(r"DELETE\s+(\w+)\s+FROM\s+(\w+)\s+(?:AS\s+)?(\w+)\b(.*)$", sql, re.IGNORECASE | re.DOTALL)
+    if match is None or match.group(1) != match.group(3):
+        return sql
+    alias, table, _, rest = match.groups()
+    return f"DELETE FROM {table} WHERE rowid IN (SELECT {alias}.rowid FROM {table} {alias}{rest})"
+
+def _compile_output_dml(kind, sql):
+    masked = mask(sql)
+    output = find_top(masked, r"\bOUTPUT\b")
+    ends = {"INSERT": r"\b(?:SELECT|VALUES|DEFAULT\s+VALUES)\b", "UPDATE": r"\b(?:FROM|WHERE)\b", "DELETE": r"\bWHERE\b"}
+    clause_end = find_top(masked, ends[kind], output.end())
+    end = clause_end.start() if clause_end else len(sql)
+    clause = Output(sql[output.end():end].strip())
+    statement = (sql[:output.start()].rstrip() + " " + sql[end:].lstrip()).strip()
+    table = re.match(r"(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|DELETE)\s+(\w+)", statement, re.IGNORECASE).group(1)
+    where = ""
+    if kind == "UPDATE":
+        where_clause = find_top(mask(statement), r"\bWHERE\b")
+        if where_clause is not None:
+            where = statement[where_clause.start():]
+    return OutputDml(kind, table, statement, where, clause)
+
+def _compile_merge(sql):
+    masked = mask(sql)
+    head = re.match(r"MERGE\s+(?:INTO\s+)?(\w+)\s+(?:AS\s+)?(\w+)\s+USING\s*", masked, re.IGNORECASE)
+    if head is None or masked[head.end()] != "(":
+        raise UnsupportedStatement(f"MERGE: {sql[:80]}")
+    table, alias = head.group(1), head.group(2)
+    close = closing_paren(masked, head.end())
+    source = sql[head.end() + 1:close].strip()
+    on = re.match(r"\s*(?:AS\s+)?(\w+)\s+ON\s+", masked[close + 1:], re.IGNORECASE)
+    if on is None:
+        raise UnsupportedStatement(f"MERGE without ON: {sql[:80]}")
+    source_alias = on.group(1)
+    position = close + 1 + on.end()
+
+    clauses = []
+    boundaries = [m for m in re.finditer(r"\bWHEN\s+(NOT\s+)?MATCHED\b|\bOUTPUT\b", masked[position:], re.IGNORECASE)
+                  if depths(masked)[position + m.start()] == 0]
+    condition = sql[position:position + boundaries[0].start()].strip() if boundaries else sql[position:]
+    for index, boundary in enumerate(boundaries):
+        start = position + boundary.start()
+        end = position + boundaries[index + 1].start() if index + 1 < len(boundaries) else len(sql)
+        clauses.append(sql[start:end].strip())
+
+    matched = not_matched = output = None
+    for clause in clauses:
+        if re.match(r"OUTPUT\b", clause, re.IGNORECASE):
+            output = Output(clause[len("OUTPUT"):].strip())
+            continue
+        body = re.match(r"WHEN\s+(NOT\s+)?MATCHED(?:\s+BY\s+TARGET)?\s+THEN\s+(.*)$", clause, re.IGNORECASE | re.DOTALL)
+        if body is None:
+            raise UnsupportedStatement(f"MERGE clause: {clause[:80]}")
+        action = body.group(2).strip()
+        if body.group(1):
+            insert = re.match(r"INSERT\s*\((.*?)\)\s*VALUES\s*\((.*)\)$", action, re.IGNORECASE | re.DOTALL)
+            if insert is None:
+                raise UnsupportedStatement(f"MERGE insert: {action[:80]}")
+            not_matched = (insert.group(1), split_top(mask(insert.group(2)), insert.group(2)))
+        elif re.match(r"DELETE$", action, re.IGNORECASE):
+            matched = ("DELETE", "")
+        else:
+            update = re.match(r"UPDATE\s+SET\s+(.*)$", action, re.IGNORECASE | re.DOTALL)
+            if update is None:
+                raise UnsupportedStatement(f"MERGE update: {action[:80]}")
+            matched = ("UPDATE", update.group(1))
+    return Merge(table, alias, source, source_alias, condition, matched, not_matched, output)
+
+
+class BatchState:
+    """
+    Variables, table variables and the current result of one batch execution.
+    """
+
+    def __init__(self, connection, params):
+        self.connection = connection
+        self.params = params
+        self.temp_tables = []
+        self.description = None
+        self.rows = []
+        self.rowcount = -1
+
+    def execute(self, sql):
+        cursor = self.connection.execute(sql, self.params)
+        if cursor.description is not None:
+            self.result([column[0] for column in cursor.description], cursor.fetchall())
+        else:
+            self.rowcount = cursor.rowcount
+
+    def result(self, columns, rows):
+        self.description = tuple((column, None, None, None, None, None, True) for column in columns)
+        self.rows = list(rows)
+        self.rowcount = len(self.rows)
+
+
+def run_batch(connection, sql, params=()):
+    """
+    Runs a T-SQL batch with positional parameters on a SQLite connection in autocommit mode.
+    Statements that write (or read with locking hints) open a BEGIN IMMEDIATE transaction
+    first, which stays open until the caller commits or rolls back, as with pyodbc.
+
+    Returns:
+        BatchState: The last result set (description, rows) and the last row count.
+    """
+    statements, count = compile_batch(sql)
+    params = list(params or ())
+    if len(params) != count:
+        raise UnsupportedStatement(f"The batch takes {count} parameters, {len(params)} were supplied")
+    if not connection.in_transaction and (LOCK_HINT_PATTERN.search(sql) or any(s.writes for s in statements)):
+        connection.execute("BEGIN IMMEDIATE")
+    state = BatchState(connection, {f"p{index}": value for index, value in enumerate(params, 1)})
+    try:
+        for statement in statements:
+            statement.run(state)
+    finally:
+        for name in state.temp_tables:
+            connection.execute(f"DROP TABLE IF EXISTS temp.{name}")
+    return state
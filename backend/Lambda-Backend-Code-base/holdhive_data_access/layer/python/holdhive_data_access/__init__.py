@@ -0,0 +1,21 @@
+from holdhive_data_access.transports import (
+    DBRequestError,
+    InProcessTransport,
+    LambdaTransport,
+    call_db_transactions,
+    get_transport,
+    invoke_db,
+    set_transport,
+    warm_up_transport,
+)
+
+__all__ = [
+    "DBRequestError",
+    "InProcessTransport",
+    "LambdaTransport",
+    "call_db_transactions",
+    "get_transport",
+    "invoke_db",
+    "set_transport",
+    "warm_up_transport",
+]
@@ -0,0 +1,135 @@
+import functools
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Per-request metrics written as CloudWatch Embedded Metric Format (EMF) log lines, which
+# CloudWatch turns into metrics without any API call. Used by holdhive_db_transactions and
+# the service Lambdas. Each request emits one line with its duration, its phase timers
+# (connect / execute / fetch / serialize / db) and counters such as rows and payload bytes.
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'Holdhive')
+# Share of requests whose debug prints (events, payloads) are logged
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.05))
+# Share of requests whose response size is measured where that costs an extra serialization
+PAYLOAD_SAMPLE_RATE = float(os.environ.get('METRICS_PAYLOAD_SAMPLE_RATE', 0.1))
+
+_current = ContextVar("holdhive_request_metrics", default=None)
+# Services that have served a request in this container (cold start detection)
+_warm_services = set()
+
+
+class RequestMetrics:
+    """
+    Metric values and properties collected while one request is handled.
+    """
+
+    def __init__(self, service, action=None):
+        self.service = service
+        self.action = action
+        self.values = {}
+        self.units = {}
+        self.properties = {}
+
+    def add(self, name, value, unit="Count"):
+        self.values[name] = self.values.get(name, 0) + value
+        self.units[name] = unit
+
+    def to_emf(self):
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": METRICS_NAMESPACE,
+                    "Dimensions": [["Service", "Action"], ["Service"]],
+                    "Metrics": [{"Name": name, "Unit": self.units[name]} for name in self.values]
+                }]
+            },
+            "Service": self.service,
+            "Action": str(self.action),
+        }
+        record.update(self.properties)
+        record.update({name: round(value, 3) for name, value in self.values.items()})
+        return record
+
+
+@contextmanager
+def request_metrics(service, action=None):
+    """
+    Collects the metrics of one request and emits them when the block exits.
+
+    Usage:
+        with request_metrics("holdhive_rental_services", path) as metrics:
+            ...
+            metrics.properties["StatusCode"] = 200
+    """
+    metrics = RequestMetrics(service, action)
+    metrics.add("ColdStart", 0 if service in _warm_services else 1)
+    _warm_services.add(service)
+    token = _current.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    except Exception:
+        metrics.add("Errors", 1)
+        raise
+    finally:
+        metrics.add("Duration", (time.perf_counter() - started) * 1000, "Milliseconds")
+        _current.reset(token)
+        if METRICS_ENABLED:
+            print(json.dumps(metrics.to_emf(), default=str))
+
+@contextmanager
+def phase(name):
+    """
+    Adds the time spent in the block to the current request's <name>Time metric.
+    Does nothing outside a request.
+    """
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.add(f"{name.capitalize()}Time", (time.perf_counter() - started) * 1000, "Milliseconds")
+
+def instrumented(service):
+    """
+    Decorator emitting request metrics for an API Gateway Lambda handler: duration, cold
+    start, status code, errors and response body size, with the path as the action.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            with request_metrics(service, (event or {}).get("path")) as metrics:
+                response = handler(event, context)
+                if isinstance(response, dict):
+                    status_code = response.get("statusCode") or 0
+                    metrics.properties["StatusCode"] = status_code
+                    metrics.add("Errors", 1 if status_code >= 500 else 0)
+                    metrics.add("PayloadBytes", len(response.get("body") or ""), "Bytes")
+                return response
+        return wrapper
+    return decorator
+
+def add_metric(name, value, unit="Count"):
+    """
+    Adds to a metric of the current request, if any.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(name, value, unit)
+
+def sampled(rate):
+    return rate >= 1 or random.random() < rate
+
+def log_sampled(message):
+    """
+    Prints a debug message for a LOG_SAMPLE_RATE share of calls.
+    """
+    if sampled(LOG_SAMPLE_RATE):
+        print(message)
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from holdhive_data_access import json_codec
+from holdhive_data_access.metrics import add_metric
+
+# Per-container cache of serialized API responses for hot listing routes. A hit returns the
+# stored body string as is: no DB call, no decode of the DB payload, no encode of the
+# response. Entries expire after RESPONSE_CACHE_TTL_SECONDS, so writes made through other
+# containers show up within that window; the owning service clears the cache on its own
+# writes. Memory is bounded by the total body size, not the entry count, since one listing
+# body can be far larger than the rest.
+#
+# Routes that can read a cheap version token from the DB layer pass it along: the ETag is
+# then derived from the version, entries are only served while it is current (and may live
+# for RESPONSE_CACHE_VERSIONED_TTL_SECONDS), and a client sending that ETag in If-None-Match
+# gets a 304 before the listing is read at all.
+
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 10))
+RESPONSE_CACHE_VERSIONED_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_VERSIONED_TTL_SECONDS', 300))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+
+class SerializedResponse:
+    """
+    A JSON response body encoded once, with the ETag identifying its content.
+    """
+
+    __slots__ = ("body", "etag", "size")
+
+    def __init__(self, body, etag=None):
+        encoded = body.encode("utf-8")
+        self.body = body
+        self.size = len(encoded)
+        self.etag = etag or '"' + hashlib.blake2b(encoded, digest_size=12).hexdigest() + '"'
+
+    @classmethod
+    def from_payload(cls, payload, etag=None):
+        return cls(json_codec.dumps(payload), etag)
+
+    def to_response(self):
+        return {
+            "statusCode": 200,
+            "headers": validator_headers(self.etag),
+            "body": self.body
+        }
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of SerializedResponse entries, evicting the least recently used entries
+    once the bodies exceed max_bytes. Keys are tuples starting with the route.
+    """
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL_SECONDS, max_bytes=RESPONSE_CACHE_MAX_BYTES,
+                 enabled=RESPONSE_CACHE_ENABLED, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached SerializedResponse, or None when absent or expired.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at <= self.clock():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key, response, ttl=None):
+        """
+        Stores a SerializedResponse; bodies larger than the whole budget are not kept.
+        """
+        if not self.enabled or response.size > self.max_bytes:
+            return response
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (response, self.clock() + (self.ttl if ttl is None else ttl))
+            self._bytes += response.size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return response
+
+    def get_or_build(self, key, build, etag=None):
+        """
+        Returns the cached response for key, or serializes build()'s payload and caches it.
+
+        Args:
+            key (tuple): Route followed by the parameters that select the response.
+            build (callable): Returns the payload to serialize on a miss.
+            etag (str, optional): Version ETag the response must carry (see version_etag);
+                a cached response of another version is rebuilt.
+
+        Returns:
+            SerializedResponse: The cached or freshly built response.
+        """
+        response = self.get(key)
+        if response is not None and (etag is None or response.etag == etag):
+            add_metric("ResponseCacheHits", 1)
+            return response
+        add_metric("ResponseCacheMisses", 1)
+        ttl = RESPONSE_CACHE_VERSIONED_TTL_SECONDS if etag is not None else None
+        return self.put(key, SerializedResponse.from_payload(build(), etag), ttl)
+
+    def invalidate(self, *prefix):
+        """
+        Drops the entries whose key starts with prefix; everything when no prefix is given.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+                self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0].size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def validator_headers(etag):
+    # no-cache: clients keep the body but revalidate it with If-None-Match on every use
+    return {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Expose-Headers": "ETag",
+        "Cache-Control": "no-cache",
+        "ETag": etag,
+    }
+
+def version_etag(key, version):
+    """
+    Returns the ETag of the response selected by key at the given resource version.
+    Derived from both, so every container computes the same tag.
+    """
+    raw = repr((key, version)).encode("utf-8")
+    return '"' + hashlib.blake2b(raw, digest_size=12).hexdigest() + '"'
+
+def if_none_match(event):
+    """
+    Returns the entity tags of the request's If-None-Match header, weak tags compared as strong.
+    """
+    headers = (event or {}).get("headers") or {}
+    value = next((value for name, value in headers.items() if name.lower() == "if-none-match"), None)
+    if not value:
+        return set()
+    tags = set()
+    for tag in value.split(","):
+        tag = tag.strip()
+        tags.add(tag[2:] if tag.startswith("W/") else tag)
+    return tags
+
+def not_modified(etag):
+    return {
+        "statusCode": 304,
+        "headers": validator_headers(etag),
+        "body": ""
+    }
+
+def conditional_response(event, cache, key, build, version=None):
+    """
+    Answers a GET from the response cache, honouring If-None-Match.
+
+    Args:
+        event (dict): API Gateway event of the request.
+        cache (ResponseCache): Cache of the route's responses.
+        key (tuple): Route followed by the parameters that select the response.
+        build (callable): Returns the payload to serialize on a miss.
+        version (str, optional): Current version token of the resource; without it the
+            ETag is a hash of the body, so a 304 still needs the body.
+
+    Returns:
+        dict: A 304 response when the client's copy is current, else the full response.
+    """
+    tags = if_none_match(event)
+    etag = version_etag(key, version) if version is not None else None
+    if etag is not None and (etag in tags or "*" in tags):
+        add_metric("NotModified", 1)
+        return not_modified(etag)
+    response = cache.get_or_build(key, build, etag)
+    if response.etag in tags or "*" in tags:
+        add_metric("NotModified", 1)
+        return not_modified(response.etag)
+    return response.to_response()
@@ -0,0 +1,174 @@
+import copy
+import os
+import sys
+
+from holdhive_data_access import json_codec
+from holdhive_data_access.metrics import phase
+
+# How the service Lambdas reach the DB actions:
+#   lambda     - synchronous invoke of the holdhive_db_transactions Lambda (default)
+#   in_process - call the DB actions directly; needs the DB code layer, the pyodbc layer,
+#                the DB_* variables and the VPC config of holdhive_db_transactions
+DB_TRANSPORT = os.environ.get('DB_TRANSPORT', 'lambda')
+
+# Where the holdhive_db_transactions sources are deployed for the in_process transport
+DB_CODE_PATH = os.environ.get('DB_CODE_PATH', '/opt')
+
+
+class DBRequestError(Exception):
+    """
+    A DB action rejected the request (4xx), e.g. a booking conflict; the service can pass
+    status_code and body on to the client instead of answering 500.
+    """
+
+    def __init__(self, status_code, body):
+        error = body.get("error", "Unknown Error") if isinstance(body, dict) else body
+        super().__init__(f"DB Error: {error}")
+        self.status_code = status_code
+        self.body = body
+
+
+class LambdaTransport:
+    """
+    Invokes the db_transactions Lambda and decodes its JSON response.
+    """
+
+    def __init__(self, function_name, client=None):
+        self.function_name = function_name
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('lambda')
+        return self._client
+
+    def warm_up(self):
+        # Importing boto3 and creating the client is most of a service's cold start
+        self.client
+
+    def invoke(self, action, data):
+        with phase("serialize"):
+            payload = json_codec.dumps_bytes({"action": action, "data": data})
+        response = self.client.invoke(
+            FunctionName=self.function_name,
+            InvocationType="RequestResponse",
+            Payload=payload
+        )
+        raw = response['Payload'].read()
+        with phase("serialize"):
+            return json_codec.loads(raw)
+
+
+class InProcessTransport:
+    """
+    Runs the DB actions inside the calling Lambda, skipping the invoke and the JSON round trip.
+    Responses are deep copies: the DB side hands out its read cache's objects, which the
+    caller must be free to change.
+    """
+
+    def __init__(self, code_path=DB_CODE_PATH):
+        self.code_path = code_path
+        self._handle_request = None
+
+    def _load(self):
+        # The DB modules import each other by top-level name (utils, db_client, ...), which a
+        # service may ship as well. They are imported with the service's modules of those
+        # names set aside and the code path first on sys.path; then the service gets its
+        # modules back, so each side keeps the modules it imported.
+        code_path = os.path.abspath(self.code_path) if self.code_path else None
+        shadowed = {}
+        if code_path and os.path.isdir(code_path):
+            for name in [name[:-3] for name in os.listdir(code_path) if name.endswith(".py")]:
+                module = sys.modules.get(name)
+                if module is not None and not self._loaded_from_code_path(module, code_path):
+                    shadowed[name] = sys.modules.pop(name)
+            position = sys.path.index(code_path) if code_path in sys.path else None
+            if position is not None:
+                sys.path.remove(code_path)
+            sys.path.insert(0, code_path)
+        try:
+            from db_service import handle_request
+        finally:
+            if code_path and os.path.isdir(code_path):
+                # Back where it was, or behind the service code for imports made after loading
+                sys.path.remove(code_path)
+                sys.path.insert(len(sys.path) if position is None else position, code_path)
+            sys.modules.update(shadowed)
+        return handle_request
+
+    @staticmethod
+    def _loaded_from_code_path(module, code_path):
+        path = getattr(module, "__file__", None)
+        return path is not None and os.path.dirname(os.path.abspath(path)) == code_path
+
+    def warm_up(self):
+        if self._handle_request is None:
+            self._handle_request = self._load()
+
+    def invoke(self, action, data):
+        if self._handle_request is None:
+            self._handle_request = self._load()
+        return copy.deepcopy(self._handle_request(action, data))
+
+
+_transport = None
+
+def get_transport():
+    """
+    Returns the transport selected by DB_TRANSPORT, created on first use.
+    """
+    global _transport
+    if _transport is None:
+        if DB_TRANSPORT == 'in_process':
+            _transport = InProcessTransport()
+        elif DB_TRANSPORT == 'lambda':
+            function_name = os.environ.get('DB_LAMBDA_NAME') or os.environ['db_lambda_name']
+            _transport = LambdaTransport(function_name)
+        else:
+            raise ValueError(f"Unsupported DB_TRANSPORT: {DB_TRANSPORT}")
+    return _transport
+
+def set_transport(transport):
+    """
+    Replaces the configured transport (local runs and benchmarks).
+    """
+    global _transport
+    _transport = transport
+
+def warm_up_transport():
+    """
+    Creates the transport and its client ahead of the first request (see warmup.on_warmup).
+    """
+    get_transport().warm_up()
+
+def invoke_db(action, data):
+    """
+    Runs a DB action and returns the raw {"statusCode", "body"} response.
+    """
+    with phase("db"):
+        return get_transport().invoke(action, data)
+
+# Request conventions of the DB actions, which the services pass client parameters through to:
+#   list actions - newest first, one page per call; send the returned next_cursor back as
+#                  cursor for the next page (page_size and fields=a,b,c are optional)
+#   create actions - retries send the same idempotency_key (services copy a client's
+#                    Idempotency-Key header into it) so the DB creates the row once
+#   version actions - cheap version tokens that let a GET answer If-None-Match with a 304
+#                     before the resource is read (see response_cache.conditional_response)
+def call_db_transactions(action, data):
+    """
+    Runs a DB action and returns its body.
+
+    Raises:
+        DBRequestError: When the action rejects the request (4xx).
+        Exception: When the action does not succeed otherwise.
+    """
+    payload = invoke_db(action, data)
+    status_code = payload.get("statusCode")
+    if isinstance(status_code, int) and 400 <= status_code < 500:
+        raise DBRequestError(status_code, payload.get("body"))
+    if status_code != 200:
+        raise Exception(f"DB Error: {payload.get('body', {}).get('error', 'Unknown Error')}")
+    return payload.get("body")
@@ -0,0 +1,87 @@
+import functools
+import importlib
+import json
+import os
+import time
+
+# Cold start helpers shared by the Lambdas. Heavy dependencies (boto3, pyodbc) are imported
+# and their clients created on first use, so importing a handler stays cheap. Modules register
+# initializers that prepare those dependencies ahead of time; they run when the function gets
+# a warm-up event ({"warmup": true}, sent by the scheduled Warmup rule of each template) and,
+# with WARM_UP_ON_INIT=true, during the init phase (provisioned concurrency).
+
+WARMUP_EVENT_KEY = os.environ.get('WARMUP_EVENT_KEY', 'warmup')
+WARM_UP_ON_INIT = os.environ.get('WARM_UP_ON_INIT', 'false').lower() == 'true'
+
+_initializers = {}
+
+
+class LazyModule:
+    """
+    Imports a module on first attribute access.
+
+    Usage:
+        pyodbc = LazyModule("pyodbc")
+        ...
+        except pyodbc.Error:  # imported here, once
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+
+def on_warmup(name, initializer=None):
+    """
+    Registers a function that prepares a dependency before the first request needs it.
+    Usable as a decorator (@on_warmup("db_pool")) or called with the function.
+    """
+    def register(function):
+        _initializers[name] = function
+        return function
+    return register(initializer) if initializer is not None else register
+
+def is_warmup_event(event):
+    return isinstance(event, dict) and bool(event.get(WARMUP_EVENT_KEY))
+
+def warm_up():
+    """
+    Runs the registered initializers, including those registered by modules an initializer
+    imports. A failing initializer is reported, not raised, so the others still run.
+
+    Returns:
+        dict: Milliseconds spent per initializer, or its error.
+    """
+    timings = {}
+    while len(timings) < len(_initializers):
+        for name, initializer in list(_initializers.items()):
+            if name in timings:
+                continue
+            started = time.perf_counter()
+            try:
+                initializer()
+                timings[name] = round((time.perf_counter() - started) * 1000, 3)
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {str(e)}")
+                timings[name] = {"error": str(e)}
+    return timings
+
+def handles_warmup(handler):
+    """
+    Decorator for Lambda handlers: answers warm-up events by running warm_up() instead of
+    the handler, and runs it once at import time when WARM_UP_ON_INIT is set.
+    """
+    if WARM_UP_ON_INIT:
+        warm_up()
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if is_warmup_event(event):
+            return {"statusCode": 200, "body": json.dumps({"warmup": warm_up()})}
+        return handler(event, context)
+    return wrapper
@@ -0,0 +1,146 @@
+from datetime import date, datetime
+
+# Per storage availability index. Each StorageAvailability row holds a bitmap of booked
+# days (bit i = horizon_start + i days) over a rolling horizon that starts on the first
+# day of the month the row was written. Rentals occupy start_date..end_date inclusive,
+# matching the overlap predicate used by the SQL availability checks.
+
+HORIZON_DAYS = 731
+BITMAP_BYTES = (HORIZON_DAYS + 7) // 8
+
+RENTALS_IN_HORIZON_QUERY = """
+    SELECT start_date, end_date
+    FROM Rentals WITH (UPDLOCK, HOLDLOCK)
+    WHERE storage_id = ? AND end_date >= ?;
+"""
+
+ALL_RENTALS_IN_HORIZON_QUERY = """
+    SELECT storage_id, start_date, end_date
+    FROM Rentals
+    WHERE end_date >= ?;
+"""
+
+SAVE_AVAILABILITY_QUERY = """
+    MERGE StorageAvailability WITH (HOLDLOCK) AS a
+    USING (SELECT ? AS storage_id, CAST(? AS DATE) AS horizon_start, CAST(? AS VARBINARY(92)) AS booked_days) AS src
+        ON a.storage_id = src.storage_id
+    WHEN MATCHED THEN
+        UPDATE SET horizon_start = src.horizon_start, booked_days = src.booked_days, updated_at = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (storage_id, horizon_start, booked_days, updated_at)
+        VALUES (src.storage_id, src.horizon_start, src.booked_days, GETDATE());
+"""
+
+CLEAR_AVAILABILITY_QUERY = "DELETE FROM StorageAvailability;"
+
+INSERT_AVAILABILITY_QUERY = """
+    INSERT INTO StorageAvailability (storage_id, horizon_start, booked_days, updated_at)
+    VALUES (?, CAST(? AS DATE), CAST(? AS VARBINARY(92)), GETDATE());
+"""
+
+
+def as_date(value):
+    """
+    Accepts a date, a datetime or an ISO 8601 string.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def current_horizon_start(today=None):
+    return (today or date.today()).replace(day=1)
+
+def day_range_mask(start, end, horizon_start):
+    """
+    Bitmask of the days start..end (inclusive), clipped to the horizon.
+    """
+    first = max((start - horizon_start).days, 0)
+    last = min((end - horizon_start).days, HORIZON_DAYS - 1)
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
+
+def covers(start, end, horizon_start):
+    """
+    Whether a bitmap starting at horizon_start can answer a query for start..end.
+    """
+    return horizon_start <= start and (end - horizon_start).days < HORIZON_DAYS
+
+def build_bitmap(rentals, horizon_start):
+    """
+    ORs the days of every (start_date, end_date) pair into one bitmap.
+    """
+    bitmap = 0
+    for start_date, end_date in rentals:
+        bitmap |= day_range_mask(as_date(start_date), as_date(end_date), horizon_start)
+    return bitmap
+
+def to_bytes(bitmap):
+    return bitmap.to_bytes(BITMAP_BYTES, "little")
+
+def from_bytes(raw):
+    return int.from_bytes(bytes(raw), "little")
+
+def is_booked(row, start, end):
+    """
+    Tests a StorageAvailability row against start..end.
+
+    Returns:
+        bool or None: None when the row's horizon does not cover the range.
+    """
+    horizon_start = as_date(row["horizon_start"])
+    if not covers(start, end, horizon_start):
+        return None
+    return from_bytes(row["booked_days"]) & day_range_mask(start, end, horizon_start) != 0
+
+def booked_storage_ids(rows, start, end):
+    """
+    Scans the availability rows for storages booked at some point in start..end.
+
+    Returns:
+        set or None: None when a row cannot answer the query and the caller must fall back to SQL.
+    """
+    masks = {}
+    booked = set()
+    for row in rows:
+        horizon_start = as_date(row["horizon_start"])
+        if horizon_start not in masks:
+            if not covers(start, end, horizon_start):
+                return None
+            masks[horizon_start] = day_range_mask(start, end, horizon_start)
+        if from_bytes(row["booked_days"]) & masks[horizon_start]:
+            booked.add(row["storage_id"])
+    return booked
+
+def refresh_storage_availability(tx, storage_id):
+    """
+    Rebuilds one storage's bitmap from its rentals inside the caller's transaction.
+    Called after every rental insert or delete for that storage.
+    """
+    horizon_start = current_horizon_start()
+    rentals = tx.execute(RENTALS_IN_HORIZON_QUERY, (storage_id, horizon_start.isoformat()))
+    bitmap = build_bitmap(((r["start_date"], r["end_date"]) for r in rentals), horizon_start)
+    tx.execute(SAVE_AVAILABILITY_QUERY, (storage_id, horizon_start.isoformat(), to_bytes(bitmap)))
+
+def rebuild_availability_index(tx):
+    """
+    Rebuilds every storage's bitmap from Rentals. Run once after creating the table and
+    monthly to roll the horizon forward.
+
+    Returns:
+        int: Number of storages with a bitmap.
+    """
+    horizon_start = current_horizon_start()
+    bitmaps = {}
+    for rental in tx.execute(ALL_RENTALS_IN_HORIZON_QUERY, (horizon_start.isoformat(),)):
+        bitmaps[rental["storage_id"]] = bitmaps.get(rental["storage_id"], 0) | day_range_mask(
+            as_date(rental["start_date"]), as_date(rental["end_date"]), horizon_start
+        )
+    tx.execute(CLEAR_AVAILABILITY_QUERY)
+    tx.executemany(
+        INSERT_AVAILABILITY_QUERY,
+        [(storage_id, horizon_start.isoformat(), to_bytes(bitmap)) for storage_id, bitmap in bitmaps.items()]
+    )
+    return len(bitmaps)
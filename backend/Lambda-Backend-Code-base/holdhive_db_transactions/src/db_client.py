@@ -1,8 +1,16 @@
-import pyodbc
 import os
+import threading
+import time
+from contextlib import contextmanager
 from decimal import Decimal
 from datetime import date, datetime
 
+from holdhive_data_access.metrics import add_metric, phase
+from holdhive_data_access.warmup import LazyModule, on_warmup
+
+# Loading the ODBC driver is left to the first connection (or a warm-up), not the import
+pyodbc = LazyModule("pyodbc")
+
 
 # Environment variables for DB credentials
 DB_HOST = os.environ['DB_HOST']
@@ -11,6 +19,21 @@ DB_NAME = os.environ['DB_NAME']
 DB_USER = os.environ['DB_USER']
 DB_PASS = os.environ['DB_PASS']
 
+# Connection pool settings. A Lambda container serves one request at a time, so a
+# small pool is enough; the connections survive between warm invocations.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 2))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+# Connections idle for longer than this are pinged before being handed out again
+DB_POOL_VALIDATE_AFTER = float(os.environ.get('DB_POOL_VALIDATE_AFTER', 30))
+# Connections older than this are closed and replaced (server side idle timeouts)
+DB_POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800))
+
+# Streaming fetch settings for large result sets
+DB_FETCH_BATCH_SIZE = int(os.environ.get('DB_FETCH_BATCH_SIZE', 500))
+DB_MAX_ROWS = int(os.environ.get('DB_MAX_ROWS', 10000))
+# Parameter rows sent per fast_executemany round trip
+DB_BULK_BATCH_SIZE = int(os.environ.get('DB_BULK_BATCH_SIZE', 1000))
+
 def get_db_connection():
     """
     Establishes a connection to the database.
@@ -26,6 +49,164 @@ def get_db_connection():
 
     return pyodbc.connect(connection_string)
 
+
+class PooledConnection:
+    """
+    A pyodbc connection together with the bookkeeping the pool needs.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+    def close(self):
+        try:
+            self.connection.close()
+        except pyodbc.Error:
+            pass
+
+
+class ConnectionPool:
+    """
+    Module level pool of database connections that is reused across warm Lambda invocations.
+
+    Connections are validated with a cheap `SELECT 1` only when they have been idle for a
+    while, recycled after `max_lifetime` seconds, and replaced when they turn out to be broken.
+    """
+
+    def __init__(self, connect, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 validate_after=DB_POOL_VALIDATE_AFTER, max_lifetime=DB_POOL_MAX_LIFETIME):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self.max_lifetime = max_lifetime
+        self._idle = []
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "reconnects": 0,
+            "wait_time_ms": 0.0,
+        }
+
+    def acquire(self):
+        """
+        Returns a healthy connection from the pool, opening a new one if needed.
+        """
+        started = time.monotonic()
+        with self._condition:
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise Exception(f"Timed out waiting for a database connection after {self.timeout}s")
+                self._condition.wait(remaining)
+            pooled = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            self.stats["wait_time_ms"] += (time.monotonic() - started) * 1000
+
+        try:
+            # The liveness ping and the connect run outside the lock; only the counters need it
+            if pooled is not None and self._is_usable(pooled):
+                self._count("hits")
+                return pooled
+            if pooled is not None:
+                pooled.close()
+                self._count("reconnects")
+            else:
+                self._count("misses")
+            return PooledConnection(self._connect())
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, pooled, discard=False):
+        """
+        Returns a connection to the pool, or closes it when it is broken.
+        """
+        with self._condition:
+            self._in_use -= 1
+            if discard:
+                pooled.close()
+            else:
+                pooled.last_used_at = time.monotonic()
+                self._idle.append(pooled)
+            self._condition.notify()
+
+    def reconnect(self, pooled):
+        """
+        Replaces a broken connection in place and returns the fresh one.
+        """
+        pooled.close()
+        self._count("reconnects")
+        return PooledConnection(self._connect())
+
+    def _count(self, counter):
+        with self._condition:
+            self.stats[counter] += 1
+
+    def _is_usable(self, pooled):
+        now = time.monotonic()
+        if now - pooled.created_at > self.max_lifetime:
+            return False
+        if now - pooled.last_used_at < self.validate_after:
+            return True
+        try:
+            cursor = pooled.connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def close_all(self):
+        """
+        Closes every idle connection.
+        """
+        with self._condition:
+            while self._idle:
+                self._idle.pop().close()
+
+    def get_stats(self):
+        with self._condition:
+            return dict(self.stats, idle=len(self._idle), in_use=self._in_use, max_size=self.max_size)
+
+
+_pool = ConnectionPool(get_db_connection)
+
+@on_warmup("db_pool")
+def warm_up_pool():
+    """
+    Opens a pooled connection, or pings an idle one, ahead of the first request.
+    """
+    _pool.release(_pool.acquire())
+
+def _acquire():
+    with phase("connect"):
+        return _pool.acquire()
+
+def get_pool_stats():
+    """
+    Returns the connection pool counters (hits, misses, reconnects, wait time).
+    """
+    return _pool.get_stats()
+
+def is_connection_error(error):
+    """
+    Checks whether a pyodbc error means the connection itself is unusable.
+    SQLSTATE class 08 covers communication link failures and closed connections.
+    """
+    if isinstance(error, pyodbc.OperationalError):
+        return True
+    if isinstance(error, pyodbc.Error) and error.args:
+        return str(error.args[0]).startswith("08")
+    return False
+
 def execute_query(query, params=None, commit=False):
     """
     Executes a SQL query on the database.
@@ -33,45 +214,221 @@ def execute_query(query, params=None, commit=False):
     Args:
         query (str): SQL query to execute.
         commit (bool): Whether to commit the transaction (default is False).
-    
+
     Returns:
         list: Query results for SELECT queries.
     """
+    pooled = _acquire()
+    discard = False
+    try:
+        try:
+            result = _run_query(pooled.connection, query, params, commit)
+        except pyodbc.Error as e:
+            if not is_connection_error(e):
+                raise
+            # Stale handle left over from a previous invocation, retry once on a fresh connection
+            with phase("connect"):
+                pooled = _pool.reconnect(pooled)
+            result = _run_query(pooled.connection, query, params, commit)
+        if not commit:
+            # End the read transaction so the connection goes back to the pool clean
+            discard = not _rollback(pooled)
+        return result
+    except Exception as e:
+        discard = not _reset_connection(pooled, e)
+        raise
+    finally:
+        _pool.release(pooled, discard=discard)
+
+def _reset_connection(pooled, error):
+    """
+    Rolls back after a failed statement so the connection can go back to the pool.
+    Returns False when the connection should be thrown away instead.
+    """
+    if is_connection_error(error):
+        return False
+    return _rollback(pooled)
+
+def _rollback(pooled):
+    """
+    Rolls back the open transaction. Returns False when the connection is unusable.
+    """
     try:
-        connection = get_db_connection()
-        with connection.cursor() as cursor:
-            # cursor.execute(query, params)
-            # print(f"Cursor Fetchall Rows: {cursor.fetchall()}")
+        pooled.connection.rollback()
+        return True
+    except pyodbc.Error:
+        return False
 
-            # Execute query with or without parameters
+def _run_query(connection, query, params, commit):
+    with connection.cursor() as cursor:
+        # Execute query with or without parameters
+        with phase("execute"):
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
 
-            if commit:
-                try:
-                    connection.commit()
-                    return {"message": "Transaction committed successfully"}
-                except Exception as e:
-                    # Handle commit-specific errors
-                    raise Exception(f"Commit failed: {str(e)}")
-            
-            # Fetch results and convert to list of dictionaries
-            columns = [column[0] for column in cursor.description]  # Get column names
-            rows = cursor.fetchall()
-
-             # Convert Decimal values to float
-            results = []
+        if commit:
+            try:
+                connection.commit()
+                return {"message": "Transaction committed successfully"}
+            except Exception as e:
+                # Handle commit-specific errors
+                raise Exception(f"Commit failed: {str(e)}")
+
+        return _fetch_rows(cursor)
+
+def _fetch_rows(cursor):
+    """
+    Fetches the current result set of a cursor as a list of dictionaries.
+    """
+    with phase("fetch"):
+        columns = [column[0] for column in cursor.description]  # Get column names
+        results = [_row_to_dict(columns, row) for row in cursor.fetchall()]
+    add_metric("RowsReturned", len(results))
+    return results
+
+def _row_to_dict(columns, row):
+    """
+    Converts a pyodbc row into a serializable dictionary in a single pass.
+    """
+    return {column: convert_to_serializable(value) for column, value in zip(columns, row)}
+
+
+class TooManyRowsError(Exception):
+    """
+    Raised by stream_query when a result set grows beyond the max_rows guard.
+    """
+
+
+def stream_query(query, params=None, batch_size=DB_FETCH_BATCH_SIZE, max_rows=DB_MAX_ROWS):
+    """
+    Executes a SELECT query and yields the rows one dictionary at a time.
+
+    Rows are pulled from the server with fetchmany(batch_size), so only one batch of raw
+    rows is held in memory at once and callers can serialize rows as they arrive.
+
+    Args:
+        query (str): SQL query to execute.
+        params (tuple, optional): Query parameters.
+        batch_size (int): Number of rows fetched per round trip.
+        max_rows (int): Raise TooManyRowsError once more rows than this are produced (None disables the guard).
+
+    Yields:
+        dict: One serializable row.
+    """
+    pooled = _acquire()
+    discard = False
+    cursor = None
+    count = 0
+    try:
+        cursor = pooled.connection.cursor()
+        with phase("execute"):
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+        columns = [column[0] for column in cursor.description]
+        while True:
+            with phase("fetch"):
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
             for row in rows:
-                row_dict = dict(zip(columns, row))
-                row_dict = {key: convert_to_serializable(value) for key, value in row_dict.items()}
-                results.append(row_dict)
+                count += 1
+                if max_rows is not None and count > max_rows:
+                    raise TooManyRowsError(f"Query returned more than {max_rows} rows")
+                yield _row_to_dict(columns, row)
+    except Exception as e:
+        discard = is_connection_error(e)
+        raise
+    finally:
+        add_metric("RowsReturned", count)
+        # Also runs when the caller stops iterating early; end the read transaction
+        # so the connection goes back to the pool clean.
+        if not discard:
+            try:
+                if cursor is not None:
+                    cursor.close()
+            except pyodbc.Error:
+                pass
+            discard = not _rollback(pooled)
+        _pool.release(pooled, discard=discard)
+
+
+class Transaction:
+    """
+    Runs several statements on one connection; they are committed (or rolled back) together.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+
+    def execute(self, query, params=None):
+        """
+        Executes a statement inside the transaction.
 
-            print(f"Results in db_client: {results}")
-            return results
+        Returns:
+            list: Query results when the statement produces rows, otherwise the affected row count.
+        """
+        with phase("execute"):
+            if params:
+                self.cursor.execute(query, params)
+            else:
+                self.cursor.execute(query)
+        if self.cursor.description is None:
+            return self.cursor.rowcount
+        return _fetch_rows(self.cursor)
+
+    def executemany(self, query, seq_of_params, batch_size=DB_BULK_BATCH_SIZE):
+        """
+        Executes a statement once per parameter tuple inside the transaction.
+        fast_executemany binds each batch as a parameter array and sends it in one round
+        trip instead of one per row.
+
+        Returns:
+            int: Number of parameter tuples executed.
+        """
+        rows = list(seq_of_params)
+        self.cursor.fast_executemany = True
+        with phase("execute"):
+            for start in range(0, len(rows), batch_size):
+                self.cursor.executemany(query, rows[start:start + batch_size])
+        add_metric("RowsWritten", len(rows))
+        return len(rows)
+
+    def close(self):
+        try:
+            self.cursor.close()
+        except pyodbc.Error:
+            pass
+
+@contextmanager
+def transaction():
+    """
+    Unit of work on a single pooled connection.
+
+    Usage:
+        with transaction() as tx:
+            tx.execute("DELETE FROM Payments WHERE rental_id = ?;", (rental_id,))
+            tx.execute("DELETE FROM Rentals WHERE rental_id = ?;", (rental_id,))
+
+    Commits once when the block exits normally and rolls back if it raises.
+    """
+    pooled = _acquire()
+    tx = Transaction(pooled.connection)
+    discard = False
+    try:
+        yield tx
+        tx.close()
+        pooled.connection.commit()
+    except Exception as e:
+        tx.close()
+        discard = not _reset_connection(pooled, e)
+        raise
     finally:
-        connection.close()
+        _pool.release(pooled, discard=discard)
 
 def convert_to_serializable(value):
     """
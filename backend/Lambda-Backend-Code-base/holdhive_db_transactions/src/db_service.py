@@ -0,0 +1,47 @@
+import json
+
+from db_client import TooManyRowsError, get_pool_stats
+from holdhive_data_access.metrics import PAYLOAD_SAMPLE_RATE, phase, request_metrics, sampled
+from dispatcher import dispatch, register
+from query_builder import query_cache_info
+from read_cache import get_cache_stats
+from single_flight import get_coalescing_stats
+from utils import format_response
+
+# Importing the action modules registers their handlers with the dispatcher
+import storage_actions  # noqa: F401
+import profile_actions  # noqa: F401
+import rental_actions  # noqa: F401
+import review_actions  # noqa: F401
+
+
+@register("get_cache_stats")
+def cache_stats(data):
+    # Read cache, request coalescing, statement cache and connection pool counters of this container
+    return format_response(200, dict(get_cache_stats(), coalescing=get_coalescing_stats(),
+                                     statements=query_cache_info(), pool=get_pool_stats()))
+
+def handle_request(action, data):
+    """
+    Runs a DB action and maps failures to error responses.
+    Shared by the Lambda handler and in-process callers (see holdhive_data_access).
+    """
+    with request_metrics("holdhive_db_transactions", action) as metrics:
+        response = _run(action, data)
+        metrics.properties["StatusCode"] = response["statusCode"]
+        metrics.add("Errors", 1 if response["statusCode"] >= 500 else 0)
+        # Measuring the payload means serializing it once more, so only on a sample
+        if sampled(PAYLOAD_SAMPLE_RATE):
+            with phase("serialize"):
+                metrics.add("PayloadBytes", len(json.dumps(response, default=str)), "Bytes")
+        return response
+
+def _run(action, data):
+    try:
+        return dispatch(action, data or {})
+    except TooManyRowsError as e:
+        print(f"Result set too large: {str(e)}")
+        return format_response(413, {"error": str(e)})
+    except Exception as e:
+        print(f"Error processing request: {str(e)}")
+        return format_response(500, {"error": "Internal server error"})
@@ -0,0 +1,118 @@
+from db_client import execute_query
+from idempotency import idempotent_response
+from projection import project_rows
+from read_cache import cached_response
+from single_flight import coalesced
+from utils import format_response
+
+
+class Action:
+    """
+    A registered database action: its handler, the params it requires, for cached reads the
+    params its responses are cached by and the fields callers may pick and, for writes,
+    whether they accept an idempotency_key. The SQL is the handler's own.
+    """
+
+    def __init__(self, name, handler, required=(), cache_params=None, idempotent=False, projection=None):
+        self.name = name
+        self.handler = handler
+        self.required = tuple(required)
+        self.cache_params = tuple(cache_params) if cache_params is not None else None
+        self.idempotent = idempotent
+        self.projection = projection
+
+
+# Action name -> Action, filled in by the *_actions modules when they are imported
+ACTIONS = {}
+
+def register(name, required=(), cache_params=None, idempotent=False, projection=None):
+    """
+    Decorator registering a handler for an action.
+
+    The handler receives the request data and returns the full response
+    ({"statusCode": ..., "body": ...}). Required params are validated before it runs.
+    With cache_params, successful responses are cached per value of those params
+    (see read_cache.py) and concurrent identical calls share one execution (see
+    single_flight.py); the write actions touching the data must invalidate them. A
+    projection then applies the fields param to the cached rows (see projection.py).
+    With idempotent=True, requests carrying an idempotency_key run once per key and
+    retries get the stored response (see idempotency.py).
+    """
+    def decorator(handler):
+        if name in ACTIONS:
+            raise ValueError(f"Action already registered: {name}")
+        ACTIONS[name] = Action(name, handler, required, cache_params, idempotent, projection)
+        return handler
+    return decorator
+
+def register_query(name, query, params=(), required=(), postprocess=None, projection=None):
+    """
+    Registers an action that runs a single SELECT and returns its rows.
+
+    Args:
+        name (str): Action name.
+        query (str): SQL query to execute.
+        params (tuple): Keys of the request data passed as query parameters, in order.
+        required (tuple): Keys that must be present in the request data.
+        postprocess (callable, optional): Applied to the rows before they are returned.
+        projection (Projection, optional): Lets callers pick columns with the fields param
+            (see projection.py); query is then the WHERE clause of the projected SELECT.
+    """
+    def handler(data):
+        sql = query
+        if projection is not None:
+            try:
+                sql = projection.query(query, projection.parse_fields(data.get("fields")))
+            except ValueError as e:
+                return format_response(400, {"error": str(e)})
+        query_params = tuple(data.get(key) for key in params)
+        result = execute_query(sql, query_params or None)
+        if postprocess:
+            result = postprocess(result)
+        return {"statusCode": 200, "body": result}
+
+    register(name, required)(handler)
+
+def missing_params(action, data):
+    """
+    Returns the required params that are absent from the request data.
+    """
+    return [key for key in action.required if data.get(key) in (None, "")]
+
+def join_names(names):
+    """
+    Joins param names for error messages: "a", "a and b", "a, b, and c".
+    """
+    if len(names) <= 2:
+        return " and ".join(names)
+    return ", ".join(names[:-1]) + ", and " + names[-1]
+
+def dispatch(name, data):
+    """
+    Looks up the action and runs it.
+    """
+    action = ACTIONS.get(name)
+    if action is None:
+        return format_response(400, {"error": f"Unsupported action: {name}"})
+
+    missing = missing_params(action, data)
+    if missing:
+        return format_response(400, {"error": f"{join_names(missing)} {'is' if len(missing) == 1 else 'are'} required"})
+
+    if action.idempotent and data.get("idempotency_key") not in (None, ""):
+        return idempotent_response(name, data, lambda: action.handler(data))
+    if action.cache_params is None:
+        return action.handler(data)
+    fields = None
+    if action.projection is not None:
+        try:
+            fields = action.projection.parse_fields(data.get("fields"))
+        except ValueError as e:
+            return format_response(400, {"error": str(e)})
+    params = [data.get(key) for key in action.cache_params]
+    # Cache misses are coalesced, so concurrent identical reads run one query
+    response = cached_response(name, params, lambda: coalesced(name, params, lambda: action.handler(data)))
+    if fields is not None and isinstance(response["body"], list):
+        # The cached rows hold every field; copy out the requested ones
+        response = dict(response, body=project_rows(response["body"], fields))
+    return response
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+
+from db_client import execute_query, transaction
+from holdhive_data_access.metrics import add_metric
+from read_cache import LRUCache
+from utils import format_response
+
+# Idempotency keys for write actions registered with idempotent=True. A caller sends the same
+# idempotency_key when it retries (client timeouts, the async invoke MaximumRetryAttempts):
+# the first request claims the key in IdempotencyKeys and stores its response, later ones get
+# that response back without running the action again.
+#
+# A claim that is still running blocks the key for IDEMPOTENCY_LOCK_SECONDS, so a container
+# that dies mid request does not block it for the whole TTL.
+
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 86400))
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 120))
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+# How long a container keeps a stored response in memory
+IDEMPOTENCY_LOCAL_TTL_SECONDS = min(IDEMPOTENCY_TTL_SECONDS, 300)
+
+# Expired rows of the key are dropped first; the key is then claimed unless another request holds it.
+# Returns the row either way, claimed = 1 when this request owns it.
+CLAIM_KEY_QUERY = """
+    SET NOCOUNT ON;
+    DECLARE @claimed BIT = 0;
+    DELETE FROM IdempotencyKeys
+    WHERE action = ? AND idempotency_key = ? AND expires_at <= SYSUTCDATETIME();
+    IF NOT EXISTS (
+        SELECT 1 FROM IdempotencyKeys WITH (UPDLOCK, HOLDLOCK)
+        WHERE action = ? AND idempotency_key = ?
+    )
+    BEGIN
+        INSERT INTO IdempotencyKeys (action, idempotency_key, request_hash, expires_at)
+        VALUES (?, ?, ?, DATEADD(SECOND, ?, SYSUTCDATETIME()));
+        SET @claimed = 1;
+    END
+    SELECT @claimed AS claimed, request_hash, status_code, response
+    FROM IdempotencyKeys
+    WHERE action = ? AND idempotency_key = ?;
+"""
+
+SAVE_RESPONSE_QUERY = """
+    UPDATE IdempotencyKeys
+    SET status_code = ?, response = ?, expires_at = DATEADD(SECOND, ?, SYSUTCDATETIME())
+    WHERE action = ? AND idempotency_key = ?;
+"""
+
+RELEASE_KEY_QUERY = """
+    DELETE FROM IdempotencyKeys
+    WHERE action = ? AND idempotency_key = ? AND status_code IS NULL;
+"""
+
+# Stored responses of this container, so a retry landing here skips the claim round trip too
+_responses = LRUCache()
+
+
+def request_hash(data):
+    """
+    Fingerprint of the request data (without the key), to catch a key reused for another request.
+    """
+    payload = {key: value for key, value in data.items() if key != "idempotency_key"}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def idempotent_response(action, data, run):
+    """
+    Runs the action once per idempotency key and returns the stored response to retries.
+    Responses with a 5xx status are not stored, so the request can be retried.
+
+    Args:
+        action (str): Action name.
+        data (dict): Request data carrying the idempotency_key.
+        run (callable): Runs the action and returns its response.
+    """
+    key = str(data["idempotency_key"])
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        return format_response(400, {"error": f"idempotency_key must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters"})
+    fingerprint = request_hash(data)
+
+    cached = _responses.get((action, key))
+    if cached is not None:
+        return _replay(fingerprint, *cached)
+
+    with transaction() as tx:
+        row = tx.execute(CLAIM_KEY_QUERY, (
+            action, key,
+            action, key,
+            action, key, fingerprint, IDEMPOTENCY_LOCK_SECONDS,
+            action, key
+        ))[0]
+    if not row["claimed"]:
+        if row["status_code"] is None:
+            return format_response(409, {"error": "A request with this idempotency_key is still in progress"})
+        response = format_response(row["status_code"], json.loads(row["response"]))
+        _responses.set((action, key), (row["request_hash"], response), IDEMPOTENCY_LOCAL_TTL_SECONDS)
+        return _replay(fingerprint, row["request_hash"], response)
+
+    try:
+        response = run()
+    except Exception:
+        execute_query(RELEASE_KEY_QUERY, (action, key), commit=True)
+        raise
+    if response["statusCode"] >= 500:
+        execute_query(RELEASE_KEY_QUERY, (action, key), commit=True)
+        return response
+
+    execute_query(SAVE_RESPONSE_QUERY, (
+        response["statusCode"], json.dumps(response["body"], default=str), IDEMPOTENCY_TTL_SECONDS, action, key
+    ), commit=True)
+    _responses.set((action, key), (fingerprint, response), IDEMPOTENCY_LOCAL_TTL_SECONDS)
+    return response
+
+def _replay(fingerprint, stored_fingerprint, response):
+    if fingerprint != stored_fingerprint:
+        return format_response(422, {"error": "idempotency_key was already used for a different request"})
+    add_metric("IdempotentReplays", 1)
+    return response
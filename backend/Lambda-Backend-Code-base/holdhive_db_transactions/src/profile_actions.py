@@ -0,0 +1,167 @@
+from datetime import datetime
+
+from db_client import execute_query, stream_query, transaction
+from dispatcher import register
+from holdhive_data_access.metrics import log_sampled
+from read_cache import invalidate, invalidate_storage
+from review_stats import CAPTURE_USER_REVIEW_STATS_QUERY, SUBTRACT_USER_REVIEW_STATS_QUERY
+from utils import format_response
+
+
+CREATE_ACCOUNT_QUERY = "INSERT INTO Users (user_id, email, role_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?)"
+
+UPDATE_PROFILE_QUERY = """
+    UPDATE Users
+    SET name = ?, phone = ?, profile_image_url = ?, role_id = ?, address = ?, eircode = ?, updated_at = ?
+    WHERE user_id = ?
+"""
+
+USER_PROFILE_SELECT = """
+    SELECT
+        u.user_id, u.name, u.email, u.phone, u.profile_image_url,
+        u.address, u.eircode, u.created_at, u.updated_at,
+        r.role_name
+    FROM Users u
+    JOIN Roles r ON u.role_id = r.role_id
+"""
+
+GET_USER_PROFILE_QUERY = USER_PROFILE_SELECT + """
+    WHERE u.user_id = ?;
+"""
+
+LIST_ALL_USERS_QUERY = USER_PROFILE_SELECT + ";"
+
+CURRENT_ROLE_QUERY = """
+    SELECT r.role_name
+    FROM Users u
+    JOIN Roles r ON u.role_id = r.role_id
+    WHERE u.email = ?
+"""
+
+UPDATE_USER_ROLE_QUERY = """
+    UPDATE Users
+    SET role_id = (SELECT role_id FROM Roles WHERE role_name = ?)
+    WHERE email = ?
+"""
+
+# Rentals as a renter and rentals for owned storage, checked in one round trip
+ACTIVE_USER_RENTALS_QUERY = """
+    SELECT
+        (SELECT COUNT(*)
+         FROM Rentals
+         WHERE renter_id = ? AND end_date >= GETDATE()) AS renter_count,
+        (SELECT COUNT(*)
+         FROM Rentals r
+         JOIN StorageSpaces s ON r.storage_id = s.storage_id
+         WHERE s.owner_id = ? AND r.end_date >= GETDATE()) AS owner_count;
+"""
+
+# Reviews, rentals, storage spaces (leaving tombstones for list_storage_changes_since) and
+# finally the user, deleted as one batch.
+# The user's reviews of other storages are subtracted from StorageReviewStats; the
+# stats of the user's own storages go away with them (ON DELETE CASCADE).
+REMOVE_USER_QUERY = """
+    SET NOCOUNT ON;
+""" + CAPTURE_USER_REVIEW_STATS_QUERY + """
+    DELETE FROM Reviews WHERE user_id = ?;
+""" + SUBTRACT_USER_REVIEW_STATS_QUERY + """
+    DELETE r
+    FROM Reviews r
+    JOIN StorageSpaces s ON r.storage_id = s.storage_id
+    WHERE s.owner_id = ?;
+    DELETE FROM Rentals WHERE renter_id = ?;
+    DELETE r
+    FROM Rentals r
+    JOIN StorageSpaces s ON r.storage_id = s.storage_id
+    WHERE s.owner_id = ?;
+    INSERT INTO StorageDeletions (storage_id, deleted_at)
+    SELECT storage_id, GETDATE() FROM StorageSpaces WHERE owner_id = ?;
+    DELETE FROM StorageSpaces WHERE owner_id = ?;
+    DELETE FROM Users WHERE user_id = ?;
+"""
+
+
+def role_id_for(role_name):
+    """
+    Maps a role name to its role_id.
+    """
+    if isinstance(role_name, tuple):
+        role_name = role_name[0]
+    return 1001 if role_name == "admin" else 1004
+
+
+@register("create_account")
+def create_account(data):
+    # Creation of the new Account details addition in the DB
+    role_id = role_id_for(data.get("role_name"))
+    log_sampled(f"RoleName = {data.get('role_name')}, Role_Id: {role_id}")
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    params = (data.get("user_id"), data.get("email"), role_id, now, now)
+    execute_query(CREATE_ACCOUNT_QUERY, params, commit=True)
+    return format_response(200, {"message": "User created successfully in the DB"})
+
+@register("update_profile")
+def update_profile(data):
+    # Updation of the Profile
+    user_id = data.get("user_id")
+    fields = data.get("profile_data", {})
+    params = (
+        fields.get("name"),
+        fields.get("phone"),
+        fields.get("profile_image_url"),
+        role_id_for(fields.get("role_name")),
+        fields.get("address"),
+        fields.get("eircode"),
+        datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        user_id
+    )
+    execute_query(UPDATE_PROFILE_QUERY, params, commit=True)
+    invalidate("get_user_profile", user_id)
+    return format_response(200, {"message": "User Profile Updated Successfully"})
+
+@register("get_user_profile", cache_params=("user_id",))
+def get_user_profile(data):
+    result = execute_query(GET_USER_PROFILE_QUERY, (data.get("user_id"),))
+    if result:
+        return {"statusCode": 200, "body": result[0]}  # Return the first result as a dictionary
+    return {"statusCode": 404, "body": {"error": "User not found"}}
+
+@register("list_all_users")
+def list_all_users(data):
+    return {"statusCode": 200, "body": list(stream_query(LIST_ALL_USERS_QUERY))}
+
+@register("update_user_role", required=("email_id",))
+def update_user_role(data):
+    # Update the user's role based on the current role
+    user_email_id = data.get("email_id")
+    with transaction() as tx:
+        current_role_result = tx.execute(CURRENT_ROLE_QUERY, (user_email_id,))
+        if not current_role_result:
+            return format_response(404, {"error": "User not found"})
+
+        # Determine the new role based on the current role
+        current_role = current_role_result[0]["role_name"]
+        new_role = "admin" if current_role == "user" else "user"
+        tx.execute(UPDATE_USER_ROLE_QUERY, (new_role, user_email_id))
+
+    # Profiles are cached by user_id, not email
+    invalidate("get_user_profile")
+    return format_response(200, {"message": f"User role updated to {new_role.capitalize()} successfully"})
+
+@register("remove_user", required=("user_id",))
+def remove_user(data):
+    # Deletion of the user and related data
+    user_id = data.get("user_id")
+    with transaction() as tx:
+        counts = tx.execute(ACTIVE_USER_RENTALS_QUERY, (user_id, user_id))[0]
+        if counts["renter_count"] > 0:
+            return format_response(400, {"error": "Cannot delete user due to active or future rentals as a renter"})
+        if counts["owner_count"] > 0:
+            return format_response(400, {"error": "Cannot delete user due to active or future rentals for owned storage spaces"})
+
+        tx.execute(REMOVE_USER_QUERY, (user_id,) * REMOVE_USER_QUERY.count("?"))
+
+    invalidate("get_user_profile", user_id)
+    # Removes the user's storages and reviews of other storages
+    invalidate_storage()
+    return format_response(200, {"message": "User and related data deleted successfully"})
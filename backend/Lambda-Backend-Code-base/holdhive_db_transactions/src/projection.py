@@ -0,0 +1,160 @@
+import os
+import re
+from functools import lru_cache
+
+from db_client import execute_query
+from query_builder import QUERY_CACHE_SIZE
+from utils import decode_cursor, encode_cursor
+
+# Sparse fieldsets for the list / fetch actions. A Projection lists the fields a listing can
+# return, each with its SQL expression and the join it needs; a request passing
+# fields=title,price_per_month gets only those columns, and joins no selected field (or the
+# WHERE clause) uses are left out of the statement. Without fields every column is returned.
+
+# Keyset pagination of the listings (see keyset_page)
+LIST_PAGE_SIZE = int(os.environ.get('LIST_PAGE_SIZE', 100))
+LIST_MAX_PAGE_SIZE = int(os.environ.get('LIST_MAX_PAGE_SIZE', 500))
+
+
+class Projection:
+    """
+    Field catalogue of a listing query.
+
+    Args:
+        source (str): FROM clause with the base table alias, e.g. "Rentals r".
+        columns (tuple): (field, SQL expression, join alias or None) triples, in output order.
+        joins (tuple): (alias, JOIN clause, aliases it depends on) triples, in statement order.
+    """
+
+    def __init__(self, source, columns, joins=()):
+        self.source = source
+        self.columns = tuple(columns)
+        self.joins = tuple(joins)
+        self.fields = tuple(field for field, _, _ in self.columns)
+        self._column_joins = {field: join for field, _, join in self.columns}
+
+    def parse_fields(self, value):
+        """
+        Returns the requested fields in catalogue order, or None for every field.
+
+        Args:
+            value (str or list): Comma-separated field names, or a list of them.
+
+        Raises:
+            ValueError: If value is not a string or a list, or a field is not part of the listing.
+        """
+        if value is None or value == "" or value == []:
+            return None
+        if not isinstance(value, (str, list)):
+            raise ValueError("fields must be a comma-separated string or a list of field names")
+        names = value.split(",") if isinstance(value, str) else value
+        requested = {str(name).strip() for name in names if str(name).strip()}
+        unknown = sorted(requested - set(self.fields))
+        if unknown:
+            raise ValueError(f"Unsupported fields: {', '.join(unknown)}. Use any of {', '.join(self.fields)}")
+        return tuple(field for field in self.fields if field in requested)
+
+    def query(self, where="", fields=None, top=False):
+        """
+        Builds the SELECT for the fields (all when None) followed by the where text
+        (WHERE / ORDER BY clauses, ending with ";"). With top, the row limit is the first parameter.
+        """
+        return _projected_query(self, fields or self.fields, where, top)
+
+    def including(self, fields, *names):
+        """
+        Adds fields the caller needs (e.g. a pagination key) to a parsed field selection.
+        """
+        if fields is None:
+            return None
+        return tuple(field for field in self.fields if field in fields or field in names)
+
+    def _needed_joins(self, fields, where):
+        needed = {self._column_joins[field] for field in fields} - {None}
+        needed |= set(re.findall(r"\b(\w+)\.", where)) & {alias for alias, _, _ in self.joins}
+        # Pull in the joins the needed ones depend on
+        for alias, _, requires in reversed(self.joins):
+            if alias in needed:
+                needed.update(requires)
+        return [clause for alias, clause, _ in self.joins if alias in needed]
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _projected_query(projection, fields, where, top=False):
+    expressions = {field: expression for field, expression, _ in projection.columns}
+    select = ",\n        ".join(
+        expressions[field] if expressions[field].endswith(f".{field}") else f"{expressions[field]} AS {field}"
+        for field in fields
+    )
+    joins = "".join(f"\n    {clause}" for clause in projection._needed_joins(fields, where))
+    return f"""
+    SELECT{" TOP (?)" if top else ""}
+        {select}
+    FROM {projection.source}{joins}
+    {where.strip()}
+"""
+
+def project_rows(rows, fields):
+    """
+    Copies of the rows with only the requested fields, for responses served from the read cache.
+    """
+    if fields is None:
+        return rows
+    return [{field: row.get(field) for field in fields} for row in rows]
+
+def parse_page_size(data, default=LIST_PAGE_SIZE, maximum=LIST_MAX_PAGE_SIZE):
+    """
+    Returns the page_size param, default when absent, capped at maximum
+    (LIST_PAGE_SIZE and LIST_MAX_PAGE_SIZE unless given).
+
+    Raises:
+        ValueError: If the page size is not a positive integer.
+    """
+    try:
+        page_size = int(data.get("page_size") or default)
+    except (TypeError, ValueError):
+        page_size = 0
+    if page_size < 1:
+        raise ValueError(f"page_size must be an integer between 1 and {maximum}")
+    return min(page_size, maximum)
+
+def keyset_page(projection, data, key, key_expr, conditions=(), params=()):
+    """
+    Runs one page of a listing, newest first, with keyset pagination on an identity column:
+    a page continues after the last key of the previous one, so deep pages cost the same as
+    the first. Honors the fields, page_size and cursor params of the request.
+
+    Args:
+        projection (Projection): Listing fields.
+        data (dict): Request data.
+        key (str): Field holding the key, e.g. "rental_id".
+        key_expr (str): SQL expression of the key, e.g. "r.rental_id".
+        conditions (tuple): Filter predicates, joined with AND.
+        params (tuple): Parameters of the conditions, in order.
+
+    Returns:
+        dict: {"data": rows, "next_cursor": token of the next page or None}
+
+    Raises:
+        ValueError: If the fields, the page size or the cursor are invalid.
+    """
+    fields = projection.including(projection.parse_fields(data.get("fields")), key)
+    page_size = parse_page_size(data)
+
+    conditions = list(conditions)
+    # One extra row tells us whether there is a next page
+    query_params = [page_size + 1] + list(params)
+    if data.get("cursor"):
+        cursor = decode_cursor(data["cursor"])
+        if not isinstance(cursor, dict) or not isinstance(cursor.get(key), int):
+            raise ValueError("Invalid cursor")
+        conditions.append(f"{key_expr} < ?")
+        query_params.append(cursor[key])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = execute_query(projection.query(f"{where} ORDER BY {key_expr} DESC;", fields, top=True), query_params)
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor({key: rows[-1][key]})
+    return {"data": rows, "next_cursor": next_cursor}
@@ -1,31 +1,79 @@
-def build_insert_query(table, data):
-    """
-    Dynamically builds an INSERT SQL query.
+from functools import lru_cache
 
-    Args:
-        table (str): Table name.
-        data (dict): Key-value pairs for columns and values.
+# Statements are built from whitelisted column names only and take every value as a
+# parameter. Statement text is cached per (table, column set), so a repeated shape reuses
+# both the Python string and SQL Server's cached plan.
 
-    Returns:
-        str: INSERT SQL query string.
+QUERY_CACHE_SIZE = 256
+
+# Columns that may appear in built statements, per table
+TABLE_COLUMNS = {
+    "Users": (
+        "user_id", "name", "email", "phone", "profile_image_url", "role_id", "address", "eircode",
+        "created_at", "updated_at"
+    ),
+    "StorageSpaces": (
+        "storage_id", "owner_id", "title", "description", "storage_type", "size", "location", "eircode",
+        "price_per_month", "availability", "images_url", "insurance_option", "created_at", "updated_at"
+    ),
+    "Rentals": (
+        "rental_id", "storage_id", "renter_id", "start_date", "end_date", "total_price", "payment_status",
+        "created_at", "updated_at"
+    ),
+    "Reviews": ("review_id", "storage_id", "user_id", "rating", "comment", "created_at"),
+    "Payments": ("payment_id", "rental_id", "payment_method", "amount", "status", "created_at", "updated_at"),
+}
+
+
+def checked_columns(table, columns):
     """
-    columns = ", ".join(data.keys())
-    values = ", ".join([f"'{v}'" for v in data.values()])
-    return f"INSERT INTO {table} ({columns}) VALUES ({values});"
+    Returns the columns sorted, so every ordering of a column set maps to one statement.
 
-def build_select_query(table, conditions=None):
+    Raises:
+        ValueError: If the table or a column is not whitelisted.
     """
-    Dynamically builds a SELECT SQL query.
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unsupported table: {table}")
+    unknown = sorted(set(columns) - set(TABLE_COLUMNS[table]))
+    if unknown:
+        raise ValueError(f"Unsupported columns for {table}: {', '.join(unknown)}")
+    return tuple(sorted(columns))
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _update_statement(table, columns, key_columns):
+    assignments = [f"{column} = ?" for column in columns]
+    if "updated_at" in TABLE_COLUMNS[table] and "updated_at" not in columns:
+        assignments.append("updated_at = GETDATE()")
+    where = " AND ".join(f"{column} = ?" for column in key_columns)
+    return f"UPDATE {table} SET {', '.join(assignments)} WHERE {where};"
+
+
+def build_update_query(table, data, where):
+    """
+    Builds a parameterized UPDATE. updated_at is set to GETDATE() when the table has it
+    and data does not.
 
     Args:
         table (str): Table name.
-        conditions (dict, optional): Conditions for the WHERE clause.
+        data (dict): Column values to set.
+        where (dict): Column equality conditions identifying the rows.
 
     Returns:
-        str: SELECT SQL query string.
+        tuple: (UPDATE SQL query string, params)
+    """
+    if not data or not where:
+        raise ValueError("UPDATE needs at least one column to set and one condition")
+    columns = checked_columns(table, data)
+    key_columns = checked_columns(table, where)
+    params = [data[column] for column in columns] + [where[column] for column in key_columns]
+    return _update_statement(table, columns, key_columns), params
+
+def query_cache_info():
+    """
+    Returns hit / miss counts of the statement caches.
     """
-    query = f"SELECT * FROM {table}"
-    if conditions:
-        where_clause = " AND ".join([f"{k}='{v}'" for k, v in conditions.items()])
-        query += f" WHERE {where_clause}"
-    return query + ";"
+    caches = {
+        "update": _update_statement,
+    }
+    return {name: cache.cache_info()._asdict() for name, cache in caches.items()}
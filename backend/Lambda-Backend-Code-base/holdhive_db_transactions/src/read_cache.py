@@ -0,0 +1,210 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from holdhive_data_access.metrics import add_metric
+
+# Read-through cache for hot read actions, keyed by action + params. Actions opt in with
+# register(..., cache_params=(...)); write actions call invalidate() after they commit.
+#
+# Entries live in a per-container TTL + LRU cache and, when an external backend is
+# configured, in a cache shared by every container. Whole-action invalidations reach every
+# container through the shared backend; other than that, a container may serve a response
+# up to CACHE_TTL_SECONDS old.
+
+CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'true').lower() == 'true'
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', 60))
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 256))
+
+
+class LRUCache:
+    """
+    In-process cache with a per-entry TTL, evicting the least recently used entry when full.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """
+        Returns the cached value, or None when absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ExternalCacheStandIn:
+    """
+    Local stand-in for a shared cache (e.g. ElastiCache) with the interface external
+    backends implement: get(key) -> str or None, set(key, str, ttl), delete(key).
+    Values are stored as JSON text, as they would be over the network.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._values = {}
+
+    def get(self, key):
+        entry = self._values.get(key)
+        if entry is None or entry[1] <= self.clock():
+            self._values.pop(key, None)
+            return None
+        return entry[0]
+
+    def set(self, key, value, ttl):
+        self._values[key] = (value, self.clock() + ttl)
+
+    def delete(self, key):
+        self._values.pop(key, None)
+
+
+class ReadCache:
+    """
+    Two-level read-through cache: the local LRUCache, then the optional external backend.
+    Cached responses are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, local=None, external=None, ttl=CACHE_TTL_SECONDS):
+        self.local = local if local is not None else LRUCache()
+        self.external = external
+        self.ttl = ttl
+        self.stats = {"hits": 0, "external_hits": 0, "misses": 0, "invalidations": 0}
+        self._generations = {}
+
+    def _generation(self, action):
+        # Bumped by invalidate(action) to drop every cached entry of the action at once
+        if self.external is not None:
+            return int(self.external.get(f"generation:{action}") or 0)
+        return self._generations.get(action, 0)
+
+    def key(self, action, params):
+        return json.dumps([action, self._generation(action), [str(param) for param in params]])
+
+    def get_or_load(self, action, params, load):
+        """
+        Returns the cached response for action + params, calling load() on a miss.
+        Only successful responses are cached.
+        """
+        key = self.key(action, params)
+        response = self.local.get(key)
+        if response is not None:
+            self.stats["hits"] += 1
+            add_metric("CacheHits", 1)
+            return response
+
+        if self.external is not None:
+            cached = self.external.get(key)
+            if cached is not None:
+                response = json.loads(cached)
+                self.local.set(key, response, self.ttl)
+                self.stats["external_hits"] += 1
+                add_metric("CacheHits", 1)
+                return response
+
+        self.stats["misses"] += 1
+        add_metric("CacheMisses", 1)
+        response = load()
+        if response.get("statusCode") == 200:
+            self.local.set(key, response, self.ttl)
+            if self.external is not None:
+                self.external.set(key, json.dumps(response), self.ttl)
+        return response
+
+    def invalidate(self, action, *params):
+        """
+        Drops the cached response of action + params, or every response of the action when
+        no params are given.
+        """
+        self.stats["invalidations"] += 1
+        if params:
+            key = self.key(action, params)
+            self.local.delete(key)
+            if self.external is not None:
+                self.external.delete(key)
+            return
+
+        generation = self._generation(action) + 1
+        self._generations[action] = generation
+        if self.external is not None:
+            # Must outlive the entries it guards, or old keys would become reachable again
+            self.external.set(f"generation:{action}", str(generation), self.ttl * 10)
+
+    def get_stats(self):
+        return dict(
+            self.stats,
+            evictions=self.local.evictions,
+            expirations=self.local.expirations,
+            size=len(self.local),
+            max_size=self.local.max_entries
+        )
+
+
+_cache = ReadCache()
+
+def configure(local=None, external=None, ttl=CACHE_TTL_SECONDS):
+    """
+    Replaces the cache, e.g. to plug in an external backend.
+    """
+    global _cache
+    _cache = ReadCache(local, external, ttl)
+
+def cached_response(action, params, load):
+    if not CACHE_ENABLED:
+        return load()
+    return _cache.get_or_load(action, params, load)
+
+def invalidate(action, *params):
+    _cache.invalidate(action, *params)
+
+def invalidate_storage(storage_id=None):
+    """
+    Drops the cached reads that include a storage location (its row or its review summary).
+    """
+    invalidate("list_all_storage_locations")
+    if storage_id is None:
+        invalidate("fetch_storage_by_id")
+        invalidate("get_storage_price")
+    else:
+        invalidate("fetch_storage_by_id", storage_id)
+        invalidate("get_storage_price", storage_id)
+
+def get_cache_stats():
+    """
+    Returns the read cache counters (hits, misses, evictions, invalidations).
+    """
+    return _cache.get_stats()
@@ -0,0 +1,187 @@
+import json
+
+from availability_index import as_date, refresh_storage_availability
+from db_client import transaction
+from dispatcher import join_names, register, register_query
+from projection import Projection, keyset_page
+from utils import format_response, bulk_items
+
+
+# Rental fields, with the storage, renter and owner joins they need
+RENTAL_PROJECTION = Projection(
+    "Rentals r",
+    columns=(
+        ("rental_id", "r.rental_id", None),
+        ("start_date", "r.start_date", None),
+        ("end_date", "r.end_date", None),
+        ("total_price", "r.total_price", None),
+        ("payment_status", "r.payment_status", None),
+        ("renter_id", "r.renter_id", None),
+        ("renter_name", "u_renter.name", "u_renter"),
+        ("renter_email", "u_renter.email", "u_renter"),
+        ("renter_phone", "u_renter.phone", "u_renter"),
+        ("owner_id", "s.owner_id", "s"),
+        ("owner_name", "u_owner.name", "u_owner"),
+        ("owner_email", "u_owner.email", "u_owner"),
+        ("owner_phone", "u_owner.phone", "u_owner"),
+        ("storage_id", "r.storage_id", None),
+        ("storage_title", "s.title", "s"),
+        ("storage_description", "s.description", "s"),
+        ("storage_size", "s.size", "s"),
+        ("storage_location", "s.location", "s"),
+        ("price_per_month", "s.price_per_month", "s"),
+        ("insurance_option", "s.insurance_option", "s"),
+        ("eircode", "s.eircode", "s"),
+        ("storage_type", "s.storage_type", "s"),
+    ),
+    joins=(
+        ("s", "JOIN StorageSpaces s ON r.storage_id = s.storage_id", ()),
+        ("u_renter", "JOIN Users u_renter ON r.renter_id = u_renter.user_id", ()),
+        ("u_owner", "JOIN Users u_owner ON s.owner_id = u_owner.user_id", ("s",)),
+    )
+)
+
+LIST_RENTAL_BY_ID_WHERE = "WHERE r.rental_id = ?;"
+LIST_RENTALS_BY_STORAGE_ID_WHERE = "WHERE r.storage_id = ?;"
+LIST_RENTALS_BY_RENTER_ID_WHERE = "WHERE r.renter_id = ?;"
+
+# Inserts the rental unless it overlaps a booking of the same storage, in one statement. The
+# date ranges are inclusive, so two ranges overlap when each starts before the other ends.
+# UPDLOCK + HOLDLOCK take key-range locks on the storage's rentals (IX_Rentals_storage_id_end_date),
+# so a concurrent overlapping booking waits for this transaction and then sees its row.
+# OUTPUT returns nothing when the booking conflicts.
+BOOK_RENTAL_QUERY = """
+    INSERT INTO Rentals (storage_id, renter_id, start_date, end_date, total_price, payment_status)
+    OUTPUT inserted.rental_id
+    SELECT ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM Rentals WITH (UPDLOCK, HOLDLOCK)
+        WHERE storage_id = ? AND start_date <= ? AND end_date >= ?
+    );
+"""
+
+CREATE_RENTAL_QUERY = """
+    INSERT INTO Rentals (storage_id, renter_id, start_date, end_date, total_price, payment_status)
+    VALUES (?, ?, ?, ?, ?, ?);
+"""
+
+# Rentals of a bulk request (JSON array) that overlap an existing rental. Same predicate and
+# locking as BOOK_RENTAL_QUERY, so the inserts that follow in the transaction cannot race.
+BULK_RENTAL_CONFLICTS_QUERY = """
+    SELECT b.idx
+    FROM OPENJSON(?) WITH (idx INT, storage_id INT, start_date DATE, end_date DATE) b
+    WHERE EXISTS (
+        SELECT 1
+        FROM Rentals r WITH (UPDLOCK, HOLDLOCK)
+        WHERE r.storage_id = b.storage_id
+        AND r.start_date <= b.end_date AND r.end_date >= b.start_date
+    );
+"""
+
+RENTAL_FIELDS = ("storage_id", "renter_id", "start_date", "end_date", "total_price", "payment_status")
+
+# Associated payment records first, then the rental record, in one round trip.
+# OUTPUT returns the storage whose availability bitmap must be refreshed.
+DELETE_RENTAL_QUERY = """
+    SET NOCOUNT ON;
+    DELETE FROM Payments WHERE rental_id = ?;
+    DELETE FROM Rentals OUTPUT deleted.storage_id WHERE rental_id = ?;
+"""
+
+
+def rental_page(data, conditions=(), params=()):
+    try:
+        page = keyset_page(RENTAL_PROJECTION, data, "rental_id", "r.rental_id", conditions, params)
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+    return format_response(200, page)
+
+@register("list_all_rentals")
+def list_all_rentals(data):
+    return rental_page(data)
+
+@register("list_rentals_by_owner_id")
+def list_rentals_by_owner_id(data):
+    return rental_page(data, ("s.owner_id = ?",), (data.get("owner_id"),))
+
+register_query("list_rental_by_id", LIST_RENTAL_BY_ID_WHERE, params=("rental_id",),
+               projection=RENTAL_PROJECTION)
+register_query("list_rentals_by_storage_id", LIST_RENTALS_BY_STORAGE_ID_WHERE, params=("storage_id",),
+               projection=RENTAL_PROJECTION)
+register_query("list_rentals_by_renter_id", LIST_RENTALS_BY_RENTER_ID_WHERE, params=("renter_id",),
+               projection=RENTAL_PROJECTION)
+
+@register("create_rental", required=RENTAL_FIELDS, idempotent=True)
+def create_rental(data):
+    params = (
+        data["storage_id"],
+        data["renter_id"],
+        data["start_date"],
+        data["end_date"],
+        data["total_price"],
+        data["payment_status"],
+        # Overlap check
+        data["storage_id"],
+        data["end_date"],
+        data["start_date"]
+    )
+    with transaction() as tx:
+        booked = tx.execute(BOOK_RENTAL_QUERY, params)
+        if not booked:
+            return {"statusCode": 409, "body": {"error": "Storage is already rented for the given timeline."}}
+        refresh_storage_availability(tx, data["storage_id"])
+    return {"statusCode": 200, "body": {"message": "Rental created successfully", "rental_id": booked[0]["rental_id"]}}
+
+def overlapping_in_batch(items):
+    """
+    Indexes of rentals overlapping an earlier rental of the same storage within the batch.
+    """
+    conflicts = []
+    booked = {}
+    for idx, item in enumerate(items):
+        start, end = as_date(item["start_date"]), as_date(item["end_date"])
+        ranges = booked.setdefault(str(item["storage_id"]), [])
+        if any(start <= other_end and end >= other_start for other_start, other_end in ranges):
+            conflicts.append(idx)
+        else:
+            ranges.append((start, end))
+    return conflicts
+
+@register("bulk_create_rentals", required=("rentals",))
+def bulk_create_rentals(data):
+    # All or nothing: no rental is created when any of them overlaps another booking
+    try:
+        items = bulk_items(data, "rentals")
+        for idx, item in enumerate(items):
+            missing = [key for key in RENTAL_FIELDS if item.get(key) in (None, "")]
+            if missing:
+                raise ValueError(f"rentals[{idx}]: {join_names(missing)} {'is' if len(missing) == 1 else 'are'} required")
+        conflicts = overlapping_in_batch(items)
+        batch = json.dumps([
+            {"idx": idx, "storage_id": int(item["storage_id"]), "start_date": item["start_date"], "end_date": item["end_date"]}
+            for idx, item in enumerate(items)
+        ])
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+
+    with transaction() as tx:
+        conflicts += [row["idx"] for row in tx.execute(BULK_RENTAL_CONFLICTS_QUERY, (batch,))]
+        if conflicts:
+            return {"statusCode": 409, "body": {
+                "error": "Storage is already rented for the given timeline.",
+                "conflicting_rentals": sorted(set(conflicts))
+            }}
+        count = tx.executemany(CREATE_RENTAL_QUERY, [tuple(item[key] for key in RENTAL_FIELDS) for item in items])
+        for storage_id in dict.fromkeys(int(item["storage_id"]) for item in items):
+            refresh_storage_availability(tx, storage_id)
+    return {"statusCode": 200, "body": {"message": f"{count} rentals created successfully"}}
+
+@register("delete_rental")
+def delete_rental(data):
+    rental_id = data.get("rental_id")
+    with transaction() as tx:
+        deleted = tx.execute(DELETE_RENTAL_QUERY, (rental_id, rental_id))
+        for row in deleted:
+            refresh_storage_availability(tx, row["storage_id"])
+    return {"statusCode": 200, "body": {"message": "Rental and associated payments deleted successfully"}}
@@ -0,0 +1,267 @@
+from db_client import execute_query, transaction
+from dispatcher import register, register_query
+from projection import Projection, keyset_page
+from read_cache import invalidate_storage
+from review_stats import (
+    RATINGS, apply_review_delta, recompute_review_stats, review_stats_merge_sql, written_review_deltas_sql
+)
+from utils import format_response, bulk_items, version_token
+
+
+# Review fields, with the storage, reviewer, owner and review summary joins they need
+REVIEW_PROJECTION = Projection(
+    "Reviews r",
+    columns=(
+        ("review_id", "r.review_id", None),
+        ("rating", "r.rating", None),
+        ("comment", "r.comment", None),
+        ("created_at", "r.created_at", None),
+        ("reviewer_id", "r.user_id", None),
+        ("reviewer_name", "u_reviewer.name", "u_reviewer"),
+        ("reviewer_email", "u_reviewer.email", "u_reviewer"),
+        ("reviewer_profile_image", "u_reviewer.profile_image_url", "u_reviewer"),
+        ("storage_id", "r.storage_id", None),
+        ("owner_id", "s.owner_id", "s"),
+        ("owner_name", "u_owner.name", "u_owner"),
+        ("owner_email", "u_owner.email", "u_owner"),
+        ("storage_title", "s.title", "s"),
+        ("storage_description", "s.description", "s"),
+        ("storage_price", "s.price_per_month", "s"),
+        ("storage_location", "s.location", "s"),
+        ("average_rating", "ar.average_rating", "ar"),
+    ),
+    joins=(
+        ("s", "JOIN StorageSpaces s ON r.storage_id = s.storage_id", ()),
+        ("u_reviewer", "JOIN Users u_reviewer ON r.user_id = u_reviewer.user_id", ()),
+        ("u_owner", "JOIN Users u_owner ON s.owner_id = u_owner.user_id", ("s",)),
+        ("ar", "LEFT JOIN StorageReviewStats ar ON r.storage_id = ar.storage_id", ()),
+    )
+)
+
+LIST_REVIEW_BY_REVIEW_ID_WHERE = "WHERE r.review_id = ?;"
+LIST_REVIEWS_BY_STORAGE_ID_WHERE = "WHERE r.storage_id = ?;"
+
+# Reviews that the user has made
+LIST_REVIEWS_BY_USER_ID_QUERY = """
+    WITH ReviewDetails AS (
+        SELECT
+            r.review_id,
+            r.storage_id,
+            r.rating,
+            r.comment,
+            r.created_at AS review_created_at
+        FROM
+            Reviews r
+        WHERE
+            r.user_id = ?
+    ),
+    StorageDetails AS (
+        SELECT
+            s.storage_id,
+            s.title AS storage_title,
+            s.location AS storage_location,
+            s.price_per_month AS storage_price,
+            u.name AS owner_name,
+            u.email AS owner_email,
+            u.phone AS owner_phone
+        FROM
+            StorageSpaces s
+        JOIN
+            Users u ON s.owner_id = u.user_id
+    ),
+    RentalDetails AS (
+        SELECT
+            rentals.storage_id,
+            MAX(rentals.rental_id) AS rental_id
+        FROM
+            Rentals rentals
+        WHERE
+            rentals.renter_id = ?
+        GROUP BY
+            rentals.storage_id
+    )
+    SELECT
+        rd.review_id,
+        rd.storage_id,
+        rd.rating,
+        rd.comment,
+        rd.review_created_at,
+        sd.storage_title,
+        sd.storage_location,
+        sd.storage_price,
+        sd.owner_name,
+        sd.owner_email,
+        sd.owner_phone,
+        COALESCE(rd.rating, 0) AS average_review_score,
+        COALESCE(rd.review_id, '') AS review_ids,
+        rd.comment
+    FROM
+        ReviewDetails rd
+    LEFT JOIN
+        StorageDetails sd ON rd.storage_id = sd.storage_id
+    LEFT JOIN
+        RentalDetails rt ON rd.storage_id = rt.storage_id;
+"""
+
+# Version of a storage's reviews: every review write updates the storage's summary row, and
+# the storage fields shown with each review move its updated_at. Reviewer names are not part
+# of it; a renamed reviewer shows up with the storage's next review change.
+STORAGE_REVIEWS_VERSION_QUERY = """
+    SELECT s.updated_at AS storage_updated_at, ar.review_count, ar.rating_sum, ar.updated_at AS reviews_updated_at
+    FROM StorageSpaces s
+    LEFT JOIN StorageReviewStats ar ON s.storage_id = ar.storage_id
+    WHERE s.storage_id = ?;
+"""
+
+# One review per user and storage: inserts the review or updates the user's existing one,
+# which then counts as the newest. Parameters (storage_id, user_id, rating, comment), typed
+# by the CASTs so fast_executemany can bind them.
+REVIEW_MERGE_SQL = """
+    MERGE Reviews WITH (HOLDLOCK) AS target
+    USING (
+        SELECT CAST(? AS INT) AS storage_id, CAST(? AS VARCHAR(255)) AS user_id,
+            CAST(? AS INT) AS rating, CAST(? AS VARCHAR(MAX)) AS comment
+    ) AS src
+        ON target.storage_id = src.storage_id AND target.user_id = src.user_id
+    WHEN MATCHED THEN
+        UPDATE SET rating = src.rating, comment = src.comment, created_at = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (storage_id, user_id, rating, comment, created_at)
+        VALUES (src.storage_id, src.user_id, src.rating, src.comment, GETDATE())"""
+
+# The review MERGE, with the storage's summary row taking the delta, all in one round trip.
+# merge_action is INSERT or UPDATE.
+UPSERT_REVIEW_QUERY = f"""
+    SET NOCOUNT ON;
+    DECLARE @written TABLE (merge_action NVARCHAR(10), review_id INT, storage_id INT, rating INT, previous_rating INT);
+    {REVIEW_MERGE_SQL.strip()}
+    OUTPUT $action, inserted.review_id, inserted.storage_id, inserted.rating, deleted.rating INTO @written;
+    {review_stats_merge_sql(written_review_deltas_sql("@written"))}
+    SELECT merge_action, review_id FROM @written;
+"""
+
+# Same MERGE as create_review, one row per execution; the stats are recounted afterwards
+IMPORT_REVIEW_QUERY = REVIEW_MERGE_SQL + ";"
+
+# OUTPUT returns the previous rating so the review stats can be adjusted without another read
+UPDATE_REVIEW_QUERY = """
+    UPDATE Reviews
+    SET rating = ?, comment = ?, created_at = GETDATE()
+    OUTPUT deleted.storage_id, deleted.rating
+    WHERE review_id = ?;
+"""
+
+DELETE_REVIEW_QUERY = """
+    DELETE FROM Reviews
+    OUTPUT deleted.storage_id, deleted.rating
+    WHERE review_id = ?;
+"""
+
+
+def review_page(data, conditions=(), params=()):
+    try:
+        page = keyset_page(REVIEW_PROJECTION, data, "review_id", "r.review_id", conditions, params)
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+    return format_response(200, page)
+
+@register("list_all_reviews")
+def list_all_reviews(data):
+    return review_page(data)
+
+@register("list_reviews_by_owner_id")
+def list_reviews_by_owner_id(data):
+    return review_page(data, ("s.owner_id = ?",), (data.get("owner_id"),))
+
+register_query("list_reviews_by_storage_id", LIST_REVIEWS_BY_STORAGE_ID_WHERE, params=("storage_id",),
+               projection=REVIEW_PROJECTION)
+@register("get_storage_reviews_version")
+def get_storage_reviews_version(data):
+    # Token for conditional requests on list_reviews_by_storage_id, without reading the reviews
+    rows = execute_query(STORAGE_REVIEWS_VERSION_QUERY, (data.get("storage_id"),))
+    return format_response(200, {"version": version_token(rows)})
+
+register_query("list_reviews_by_user_id", LIST_REVIEWS_BY_USER_ID_QUERY,
+               params=("user_id", "user_id"), required=("user_id",))
+register_query("list_review_by_review_id", LIST_REVIEW_BY_REVIEW_ID_WHERE, params=("review_id",),
+               projection=REVIEW_PROJECTION)
+
+def parse_rating(value):
+    """
+    Returns the rating as an int, or None unless it is one of RATINGS.
+    """
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if rating in RATINGS else None
+
+@register("create_review", required=("storage_id", "user_id", "rating"), idempotent=True)
+def create_review(data):
+    # An existing review of the storage by the user is updated instead
+    rating = parse_rating(data["rating"])
+    if rating is None:
+        return format_response(400, {"error": "rating must be between 1 and 5"})
+
+    with transaction() as tx:
+        written = tx.execute(UPSERT_REVIEW_QUERY, (data["storage_id"], data["user_id"], rating, data.get("comment")))[0]
+
+    # Storage reads carry the review summary
+    invalidate_storage(data["storage_id"])
+    created = written["merge_action"] == "INSERT"
+    return {"statusCode": 200, "body": {
+        "message": "Review created successfully" if created else "Review updated successfully",
+        "review_id": written["review_id"],
+        "created": created
+    }}
+
+@register("update_review", required=("review_id", "rating"))
+def update_review(data):
+    rating = parse_rating(data["rating"])
+    if rating is None:
+        return format_response(400, {"error": "rating must be between 1 and 5"})
+
+    params = (
+        rating,
+        data.get("comment"),
+        data["review_id"]
+    )
+    with transaction() as tx:
+        previous = tx.execute(UPDATE_REVIEW_QUERY, params)
+        for row in previous:
+            apply_review_delta(tx, row["storage_id"], added_rating=rating, removed_rating=row["rating"])
+    for row in previous:
+        invalidate_storage(row["storage_id"])
+    return {"statusCode": 200, "body": {"message": "Review updated successfully"}}
+
+@register("delete_review", required=("review_id",))
+def delete_review(data):
+    with transaction() as tx:
+        deleted = tx.execute(DELETE_REVIEW_QUERY, (data["review_id"],))
+        for row in deleted:
+            apply_review_delta(tx, row["storage_id"], removed_rating=row["rating"])
+    for row in deleted:
+        invalidate_storage(row["storage_id"])
+    return {"statusCode": 200, "body": {"message": "Review deleted successfully"}}
+
+@register("bulk_import_reviews", required=("reviews",))
+def bulk_import_reviews(data):
+    # Imports reviews in one transaction, then recounts the stats of the storages involved
+    try:
+        items = bulk_items(data, "reviews")
+        rows = []
+        for idx, item in enumerate(items):
+            if item.get("storage_id") in (None, "") or item.get("user_id") in (None, ""):
+                raise ValueError(f"reviews[{idx}]: storage_id and user_id are required")
+            rating = parse_rating(item.get("rating"))
+            if rating is None:
+                raise ValueError(f"reviews[{idx}]: rating must be between 1 and 5")
+            rows.append((int(item["storage_id"]), item["user_id"], rating, item.get("comment")))
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+
+    with transaction() as tx:
+        count = tx.executemany(IMPORT_REVIEW_QUERY, rows)
+        recompute_review_stats(tx, dict.fromkeys(row[0] for row in rows))
+    invalidate_storage()
+    return {"statusCode": 200, "body": {"message": f"{count} reviews imported successfully"}}
@@ -0,0 +1,149 @@
+# Maintenance of the StorageReviewStats summary table. Storage and review reads join it
+# instead of aggregating the whole Reviews table; the review write actions keep it
+# current by applying deltas inside their own transaction.
+
+# Number of review ids kept in StorageReviewStats.latest_review_ids
+LATEST_REVIEW_IDS_LIMIT = 50
+
+RATINGS = (1, 2, 3, 4, 5)
+
+
+def latest_review_ids_sql(storage_id_expr):
+    """
+    Subquery returning the newest review ids of a storage as a comma-separated string.
+    Backed by IX_Reviews_storage_id_created_at, so it reads at most LATEST_REVIEW_IDS_LIMIT index rows.
+    """
+    return f"""(
+        SELECT STRING_AGG(CAST(latest.review_id AS VARCHAR(20)), ',')
+            WITHIN GROUP (ORDER BY latest.created_at DESC, latest.review_id DESC)
+        FROM (
+            SELECT TOP ({LATEST_REVIEW_IDS_LIMIT}) review_id, created_at
+            FROM Reviews
+            WHERE storage_id = {storage_id_expr}
+            ORDER BY created_at DESC, review_id DESC
+        ) latest
+    )"""
+
+
+HISTOGRAM_COLUMNS = ", ".join(f"rating_{rating}_count" for rating in RATINGS)
+
+def review_stats_merge_sql(source):
+    """
+    MERGE adding the deltas selected by source (storage_id, review_count, rating_sum and
+    rating_<n>_count columns) to the storages' summary rows, creating missing rows.
+    """
+    return f"""
+    MERGE StorageReviewStats WITH (HOLDLOCK) AS stats
+    USING ({source}) AS src
+        ON stats.storage_id = src.storage_id
+    WHEN MATCHED THEN
+        UPDATE SET
+            review_count = stats.review_count + src.review_count,
+            rating_sum = stats.rating_sum + src.rating_sum,
+            {", ".join(f"rating_{rating}_count = stats.rating_{rating}_count + src.rating_{rating}_count" for rating in RATINGS)},
+            latest_review_ids = {latest_review_ids_sql("src.storage_id")},
+            updated_at = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (storage_id, review_count, rating_sum, {HISTOGRAM_COLUMNS}, latest_review_ids, updated_at)
+        VALUES (src.storage_id, src.review_count, src.rating_sum, {", ".join(f"src.rating_{rating}_count" for rating in RATINGS)}, {latest_review_ids_sql("src.storage_id")}, GETDATE());
+"""
+
+APPLY_REVIEW_DELTA_QUERY = review_stats_merge_sql(
+    f"SELECT ? AS storage_id, ? AS review_count, ? AS rating_sum, {', '.join(f'? AS rating_{rating}_count' for rating in RATINGS)}"
+)
+
+def written_review_deltas_sql(table):
+    """
+    SELECT turning rows of (storage_id, rating, previous_rating) written reviews into summary
+    deltas, for review_stats_merge_sql. previous_rating is NULL for a new review.
+    """
+    histogram = ", ".join(
+        f"(CASE WHEN rating = {rating} THEN 1 ELSE 0 END) - (CASE WHEN previous_rating = {rating} THEN 1 ELSE 0 END) AS rating_{rating}_count"
+        for rating in RATINGS
+    )
+    return f"""
+        SELECT storage_id,
+            CASE WHEN previous_rating IS NULL THEN 1 ELSE 0 END AS review_count,
+            rating - COALESCE(previous_rating, 0) AS rating_sum,
+            {histogram}
+        FROM {table}
+    """
+
+# Used by remove_user: collect what a user's reviews contribute to each storage before they are deleted...
+CAPTURE_USER_REVIEW_STATS_QUERY = f"""
+    DECLARE @removed_stats TABLE (storage_id INT PRIMARY KEY, review_count INT, rating_sum INT, {", ".join(f"rating_{rating}_count INT" for rating in RATINGS)});
+    INSERT INTO @removed_stats
+    SELECT storage_id, COUNT(*), SUM(rating), {", ".join(f"SUM(CASE WHEN rating = {rating} THEN 1 ELSE 0 END)" for rating in RATINGS)}
+    FROM Reviews
+    WHERE user_id = ?
+    GROUP BY storage_id;
+"""
+
+# ...and subtract it once they are gone (same batch, so @removed_stats is still in scope)
+SUBTRACT_USER_REVIEW_STATS_QUERY = f"""
+    UPDATE stats
+    SET review_count = stats.review_count - removed.review_count,
+        rating_sum = stats.rating_sum - removed.rating_sum,
+        {", ".join(f"rating_{rating}_count = stats.rating_{rating}_count - removed.rating_{rating}_count" for rating in RATINGS)},
+        latest_review_ids = {latest_review_ids_sql("stats.storage_id")},
+        updated_at = GETDATE()
+    FROM StorageReviewStats stats
+    JOIN @removed_stats removed ON stats.storage_id = removed.storage_id;
+"""
+
+# Used by bulk_import_reviews: recount a storage's summary row from Reviews (one storage per execution)
+RECOMPUTE_REVIEW_STATS_QUERY = f"""
+    MERGE StorageReviewStats WITH (HOLDLOCK) AS stats
+    USING (
+        SELECT
+            s.storage_id,
+            COUNT(r.review_id) AS review_count,
+            COALESCE(SUM(r.rating), 0) AS rating_sum,
+            {", ".join(f"SUM(CASE WHEN r.rating = {rating} THEN 1 ELSE 0 END) AS rating_{rating}_count" for rating in RATINGS)}
+        FROM (SELECT CAST(? AS INT) AS storage_id) s
+        LEFT JOIN Reviews r ON r.storage_id = s.storage_id
+        GROUP BY s.storage_id
+    ) AS src
+        ON stats.storage_id = src.storage_id
+    WHEN MATCHED THEN
+        UPDATE SET
+            review_count = src.review_count,
+            rating_sum = src.rating_sum,
+            {", ".join(f"rating_{rating}_count = src.rating_{rating}_count" for rating in RATINGS)},
+            latest_review_ids = {latest_review_ids_sql("src.storage_id")},
+            updated_at = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (storage_id, review_count, rating_sum, {HISTOGRAM_COLUMNS}, latest_review_ids, updated_at)
+        VALUES (src.storage_id, src.review_count, src.rating_sum, {", ".join(f"src.rating_{rating}_count" for rating in RATINGS)}, {latest_review_ids_sql("src.storage_id")}, GETDATE());
+"""
+
+
+def review_delta_params(storage_id, added_rating=None, removed_rating=None):
+    """
+    Builds the parameters of APPLY_REVIEW_DELTA_QUERY.
+
+    Args:
+        storage_id (int): Storage the review belongs to.
+        added_rating (int, optional): Rating of a created review, or the new rating of an updated one.
+        removed_rating (int, optional): Rating of a deleted review, or the old rating of an updated one.
+    """
+    count_delta = (added_rating is not None) - (removed_rating is not None)
+    sum_delta = int(added_rating or 0) - int(removed_rating or 0)
+    histogram = [0] * len(RATINGS)
+    if added_rating is not None:
+        histogram[RATINGS.index(int(added_rating))] += 1
+    if removed_rating is not None:
+        histogram[RATINGS.index(int(removed_rating))] -= 1
+    return [storage_id, count_delta, sum_delta] + histogram
+
+def apply_review_delta(tx, storage_id, added_rating=None, removed_rating=None):
+    """
+    Applies a review create / update / delete to the storage's summary row within the caller's transaction.
+    """
+    tx.execute(APPLY_REVIEW_DELTA_QUERY, review_delta_params(storage_id, added_rating, removed_rating))
+
+def recompute_review_stats(tx, storage_ids):
+    """
+    Recounts the summary rows of the given storages within the caller's transaction.
+    """
+    tx.executemany(RECOMPUTE_REVIEW_STATS_QUERY, [(storage_id,) for storage_id in storage_ids])
@@ -0,0 +1,76 @@
+import json
+import os
+import threading
+
+# Request coalescing for read actions: while a read is in flight, identical reads from
+# other threads wait for it and share its response instead of running the same query.
+# Once it completes, read_cache serves the response until its TTL expires.
+
+COALESCE_ENABLED = os.environ.get('COALESCE_ENABLED', 'true').lower() == 'true'
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the same key get its
+    result (or its exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["executed"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._calls))
+
+
+_group = SingleFlight()
+
+def coalesced(action, params, load):
+    """
+    Runs load() for action + params unless an identical call is already in flight.
+    """
+    if not COALESCE_ENABLED:
+        return load()
+    return _group.do(json.dumps([action, [str(param) for param in params]]), load)
+
+def get_coalescing_stats():
+    """
+    Returns the executed / coalesced request counters.
+    """
+    return _group.get_stats()
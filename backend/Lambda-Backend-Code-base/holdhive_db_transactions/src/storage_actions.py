@@ -0,0 +1,734 @@
+import json
+import os
+import re
+from datetime import date, datetime, timezone
+
+import availability_index
+from db_client import execute_query, transaction
+from dispatcher import register, register_query
+from projection import Projection, parse_page_size
+from query_builder import build_update_query
+from read_cache import invalidate_storage
+from utils import format_response, encode_cursor, decode_cursor, bulk_items, version_token
+
+
+# Answer date range availability checks from the StorageAvailability bitmaps instead of
+# scanning Rentals. Enable once rebuild_availability_index has populated the table.
+AVAILABILITY_INDEX_ENABLED = os.environ.get('AVAILABILITY_INDEX_ENABLED', 'false').lower() == 'true'
+
+# list_storage_changes_since leaves out changes younger than this, so a transaction that
+# stamped its rows earlier but commits later is not skipped by a cursor already past them
+STORAGE_SYNC_SETTLE_SECONDS = int(os.environ.get('STORAGE_SYNC_SETTLE_SECONDS', 5))
+
+STORAGE_COLUMNS = (
+    ("storage_id", "s.storage_id", None),
+    ("owner_id", "s.owner_id", None),
+    ("title", "s.title", None),
+    ("description", "s.description", None),
+    ("size", "s.size", None),
+    ("location", "s.location", None),
+    ("price_per_month", "s.price_per_month", None),
+    ("availability", "s.availability", None),
+    ("images_url", "s.images_url", None),
+    ("insurance_option", "s.insurance_option", None),
+    ("eircode", "s.eircode", None),
+    ("storage_type", "s.storage_type", None),
+    ("created_at", "s.created_at", None),
+    ("updated_at", "s.updated_at", None),
+)
+
+# Pre-aggregated review summary (see review_stats.py)
+REVIEW_SUMMARY_COLUMNS = (
+    ("average_review_score", "COALESCE(r.average_rating, 0)", "r"),
+    ("review_ids", "COALESCE(r.latest_review_ids, '[]')", "r"),
+)
+
+REVIEW_SUMMARY_JOIN = ("r", "LEFT JOIN StorageReviewStats r ON s.storage_id = r.storage_id", ())
+
+# Storage fields with the review summary
+STORAGE_PROJECTION = Projection(
+    "StorageSpaces s",
+    columns=STORAGE_COLUMNS + REVIEW_SUMMARY_COLUMNS,
+    joins=(REVIEW_SUMMARY_JOIN,)
+)
+
+# Same, with the owner's contact details
+STORAGE_WITH_OWNER_PROJECTION = Projection(
+    "StorageSpaces s",
+    columns=STORAGE_COLUMNS + (
+        ("owner_name", "u.name", "u"),
+        ("owner_email", "u.email", "u"),
+        ("owner_phone", "u.phone", "u"),
+    ) + REVIEW_SUMMARY_COLUMNS,
+    joins=(
+        ("u", "JOIN Users u ON s.owner_id = u.user_id", ()),
+        REVIEW_SUMMARY_JOIN,
+    )
+)
+
+LIST_ALL_STORAGE_LOCATIONS_QUERY = STORAGE_PROJECTION.query("""
+    WHERE
+        s.availability = ?;
+""")
+
+# Version of the storage listing: any storage insert, update or delete changes the count or
+# the newest updated_at, and every review summary write sets StorageReviewStats.updated_at
+STORAGE_LIST_VERSION_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM StorageSpaces) AS storage_count,
+        (SELECT MAX(updated_at) FROM StorageSpaces) AS storage_updated_at,
+        (SELECT MAX(updated_at) FROM StorageReviewStats) AS reviews_updated_at;
+"""
+
+# Storage change feed (list_storage_changes_since): StorageSpaces rows only, so every change
+# to a returned field moves updated_at. Rows come oldest change first after an
+# (updated_at, storage_id) cursor, seeking on IX_StorageSpaces_updated_at.
+STORAGE_SYNC_PROJECTION = Projection("StorageSpaces s", columns=STORAGE_COLUMNS)
+STORAGE_CHANGED_AFTER = "s.updated_at >= ? AND (s.updated_at > ? OR s.storage_id > ?)"
+STORAGE_CHANGE_SETTLED = "s.updated_at < DATEADD(second, ?, GETDATE())"
+
+# Tombstones in StorageDeletions, in deletion_id order
+STORAGE_DELETIONS_SELECT = "SELECT TOP (?) deletion_id, storage_id, deleted_at FROM StorageDeletions"
+STORAGE_DELETION_SETTLED = "deleted_at < DATEADD(second, ?, GETDATE())"
+LAST_STORAGE_DELETION_QUERY = f"""
+    SELECT COALESCE(MAX(deletion_id), 0) AS deletion_id
+    FROM StorageDeletions
+    WHERE {STORAGE_DELETION_SETTLED};
+"""
+
+# Written in the deleting transaction, before the row goes
+LOG_STORAGE_DELETION_QUERY = """
+    INSERT INTO StorageDeletions (storage_id, deleted_at)
+    SELECT storage_id, GETDATE() FROM StorageSpaces WHERE storage_id = ?;
+"""
+
+CHECK_AVAILABLE_STORAGE_WHERE = """
+    WHERE
+        s.availability = 'available'
+        AND NOT EXISTS (
+            SELECT 1
+            FROM Rentals rt
+            WHERE rt.storage_id = s.storage_id
+                AND (
+                    (rt.start_date < ? AND rt.end_date > ?) -- Rentals that overlap at the start
+                    OR
+                    (rt.start_date <= ? AND rt.end_date >= ?) -- Rentals entirely within the query range
+                    OR
+                    (rt.start_date >= ? AND rt.start_date <= ?) -- Rentals that overlap at the end
+                )
+        );
+"""
+
+AVAILABLE_STORAGE_EXCLUDING_WHERE = """
+    WHERE
+        s.availability = 'available'
+        AND s.storage_id NOT IN (SELECT CAST([value] AS INT) FROM OPENJSON(?));
+"""
+
+AVAILABILITY_BITMAPS_QUERY = "SELECT storage_id, horizon_start, booked_days FROM StorageAvailability;"
+
+STORAGE_AVAILABILITY_BITMAP_QUERY = """
+    SELECT storage_id, horizon_start, booked_days
+    FROM StorageAvailability
+    WHERE storage_id = ?;
+"""
+
+FETCH_STORAGE_BY_ID_QUERY = STORAGE_PROJECTION.query("""
+    WHERE
+        s.storage_id = ?;
+""")
+
+FETCH_STORAGE_BY_OWNER_ID_WHERE = """
+    WHERE
+        s.owner_id = ?;
+"""
+
+ADD_STORAGE_LOCATION_QUERY = """
+    INSERT INTO StorageSpaces (owner_id, title, description, storage_type, size, location, eircode, price_per_month, availability, images_url, insurance_option, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Fields update_storage_location accepts in update_data
+STORAGE_UPDATABLE_COLUMNS = (
+    "title", "description", "storage_type", "size", "location", "eircode",
+    "price_per_month", "availability", "images_url", "insurance_option"
+)
+
+ACTIVE_RENTAL_COUNT_QUERY = """
+    SELECT COUNT(*) AS rental_count
+    FROM Rentals
+    WHERE storage_id = ? AND end_date >= GETDATE();
+"""
+
+DELETE_STORAGE_LOCATION_QUERY = "DELETE FROM StorageSpaces WHERE storage_id = ?;"
+
+CHECK_STORAGE_AVAILABILITY_QUERY = """
+    SELECT COUNT(*) AS count
+    FROM Rentals
+    WHERE storage_id = ?
+    AND (
+        (start_date < ? AND end_date > ?)
+        OR
+        (start_date <= ? AND end_date >= ?)
+        OR
+        (start_date >= ? AND start_date <= ?)
+    )
+"""
+
+GET_STORAGE_PRICE_QUERY = """
+    SELECT price_per_month
+    FROM StorageSpaces
+    WHERE storage_id = ?
+"""
+
+# Price and availability of each storage in a JSON id list, for one date range
+QUOTE_STORAGE_QUERY = """
+    SELECT
+        s.storage_id,
+        s.price_per_month,
+        CASE WHEN EXISTS (
+            SELECT 1
+            FROM Rentals r
+            WHERE r.storage_id = s.storage_id
+            AND (
+                (r.start_date < ? AND r.end_date > ?)
+                OR
+                (r.start_date <= ? AND r.end_date >= ?)
+                OR
+                (r.start_date >= ? AND r.start_date <= ?)
+            )
+        ) THEN 0 ELSE 1 END AS available
+    FROM StorageSpaces s
+    WHERE s.storage_id IN (SELECT CAST([value] AS INT) FROM OPENJSON(?));
+"""
+
+# Same quote answered from the availability index: prices with each storage's bitmap. A
+# storage without a StorageAvailability row has no rentals in the horizon.
+QUOTE_STORAGE_INDEXED_QUERY = """
+    SELECT s.storage_id, s.price_per_month, a.horizon_start, a.booked_days
+    FROM StorageSpaces s
+    LEFT JOIN StorageAvailability a ON a.storage_id = s.storage_id
+    WHERE s.storage_id IN (SELECT CAST([value] AS INT) FROM OPENJSON(?));
+"""
+
+QUOTE_MAX_STORAGES = 100
+
+# Search: listing card columns only (no description), keyset paginated
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+SEARCH_SELECT = """
+    SELECT TOP (?)
+        s.storage_id,
+        s.owner_id,
+        s.title,
+        s.size,
+        s.location,
+        s.price_per_month,
+        s.availability,
+        s.images_url,
+        s.insurance_option,
+        s.eircode,
+        s.storage_type,
+        s.created_at,
+        s.updated_at,
+        COALESCE(rs.average_rating, 0) AS average_review_score,
+        COALESCE(rs.review_count, 0) AS review_count
+    FROM
+        StorageSpaces s
+    LEFT JOIN
+        StorageReviewStats rs ON s.storage_id = rs.storage_id
+    WHERE
+        s.availability = 'available'
+"""
+
+# sort -> (sort expression, direction, result column holding the sort value)
+SEARCH_SORTS = {
+    "price": ("s.price_per_month", "ASC", "price_per_month"),
+    "price_desc": ("s.price_per_month", "DESC", "price_per_month"),
+    "rating": ("COALESCE(rs.average_rating, 0)", "DESC", "average_review_score"),
+    "newest": ("s.created_at", "DESC", "created_at"),
+}
+
+
+def _parse_bool(value):
+    if str(value).lower() in ("1", "true", "yes"):
+        return 1
+    if str(value).lower() in ("0", "false", "no"):
+        return 0
+    raise ValueError(f"Invalid boolean value: {value}")
+
+def _like_prefix(value):
+    # Escape LIKE wildcards so the prefix is matched literally
+    escaped = str(value).replace("[", "[[]").replace("%", "[%]").replace("_", "[_]")
+    return escaped + "%"
+
+# request key -> (predicate, converter)
+SEARCH_FILTERS = (
+    ("min_price", "s.price_per_month >= ?", float),
+    ("max_price", "s.price_per_month <= ?", float),
+    ("min_size", "s.size >= ?", float),
+    ("max_size", "s.size <= ?", float),
+    ("storage_type", "s.storage_type = ?", str),
+    ("insurance_option", "s.insurance_option = ?", _parse_bool),
+    ("eircode_prefix", "s.eircode LIKE ?", _like_prefix),
+    ("min_rating", "COALESCE(rs.average_rating, 0) >= ?", float),
+)
+
+
+def split_review_ids(results):
+    """
+    Converts review_ids from a comma-separated string to a list.
+    """
+    for result in results:
+        if result.get("review_ids"):
+            result["review_ids"] = result["review_ids"].split(",")
+    return results
+
+
+@register("list_all_storage_locations", cache_params=("version",), projection=STORAGE_PROJECTION)
+def list_all_storage_locations(data):
+    # Fetch all available storage locations. Callers may pass the get_storage_list_version
+    # token as version, so a newer version is never answered from an older cached listing.
+    results = execute_query(LIST_ALL_STORAGE_LOCATIONS_QUERY, ('available',))
+    if not results:
+        return format_response(200, {"message": "No available storage locations found", "data": []})
+    return format_response(200, split_review_ids(results))
+
+@register("get_storage_list_version")
+def get_storage_list_version(data):
+    # Token for conditional requests on the storage listing, without reading the listing
+    return format_response(200, {"version": version_token(execute_query(STORAGE_LIST_VERSION_QUERY))})
+
+def _index_date_range(data):
+    """
+    Returns the requested range as dates when the availability index may answer it, else None.
+    Past dates are left to SQL: rentals deleted with a user are only guaranteed to have ended.
+    """
+    if not AVAILABILITY_INDEX_ENABLED:
+        return None
+    try:
+        start, end = availability_index.as_date(data["start_date"]), availability_index.as_date(data["end_date"])
+    except ValueError:
+        return None
+    if start < date.today() or end < start:
+        return None
+    return start, end
+
+@register("check_available_storage", required=("start_date", "end_date"))
+def check_available_storage(data):
+    # Fetch available storage locations based on the given date range
+    try:
+        fields = STORAGE_PROJECTION.parse_fields(data.get("fields"))
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+    query = STORAGE_PROJECTION.query(CHECK_AVAILABLE_STORAGE_WHERE, fields)
+    params = (end_date, start_date, end_date, start_date, start_date, end_date)
+
+    date_range = _index_date_range(data)
+    if date_range:
+        booked = availability_index.booked_storage_ids(execute_query(AVAILABILITY_BITMAPS_QUERY), *date_range)
+        if booked is not None:
+            query = STORAGE_PROJECTION.query(AVAILABLE_STORAGE_EXCLUDING_WHERE, fields)
+            params = (json.dumps(sorted(booked)),)
+
+    results = execute_query(query, params)
+    if not results:
+        return format_response(200, {"message": "No available storage locations found", "data": []})
+    return {"statusCode": 200, "body": split_review_ids(results)}
+
+@register("fetch_storage_by_id", cache_params=("storage_id",), projection=STORAGE_PROJECTION)
+def fetch_storage_by_id(data):
+    # Fetch a specific storage location by ID
+    storage_id = data.get("storage_id")
+    results = execute_query(FETCH_STORAGE_BY_ID_QUERY, (storage_id,))
+    if not results:
+        return {
+            "statusCode": 404,
+            "body": {"message": f"Storage location with ID {storage_id} not found"}
+        }
+    return {"statusCode": 200, "body": split_review_ids(results)}
+
+register_query("fetch_storage_by_owner_id", FETCH_STORAGE_BY_OWNER_ID_WHERE,
+               params=("owner_id",), required=("owner_id",), postprocess=split_review_ids,
+               projection=STORAGE_WITH_OWNER_PROJECTION)
+
+def storage_location_params(data, now):
+    """
+    Parameters of ADD_STORAGE_LOCATION_QUERY for one storage location.
+    """
+    return (
+        data.get("user_id"),
+        data.get("title"),
+        data.get("description"),
+        data.get("storage_type"),
+        data.get("size"),
+        data.get("location"),
+        data.get("eircode"),
+        data.get("price_per_month"),
+        "available",
+        data.get("images_url"),
+        data.get("insurance_option", 0),
+        now,
+        now
+    )
+
+@register("add_storage_location")
+def add_storage_location(data):
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    execute_query(ADD_STORAGE_LOCATION_QUERY, storage_location_params(data, now), commit=True)
+    invalidate_storage()
+    return {"statusCode": 200, "body": {"message": "Storage location added"}}
+
+@register("bulk_add_storage_locations", required=("storage_locations",))
+def bulk_add_storage_locations(data):
+    # Each entry takes the fields of add_storage_location; user_id defaults to the request's
+    try:
+        items = bulk_items(data, "storage_locations")
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = [storage_location_params({"user_id": data.get("user_id"), **item}, now) for item in items]
+    with transaction() as tx:
+        count = tx.executemany(ADD_STORAGE_LOCATION_QUERY, rows)
+    invalidate_storage()
+    return {"statusCode": 200, "body": {"message": f"{count} storage locations added"}}
+
+@register("delete_storage_location")
+def delete_storage_location(data):
+    storage_id = data.get("storage_id")
+
+    # Check for current or future rentals and delete in the same transaction
+    with transaction() as tx:
+        rental_count_result = tx.execute(ACTIVE_RENTAL_COUNT_QUERY, (storage_id,))
+        rental_count = rental_count_result[0]["rental_count"] if rental_count_result else 0
+
+        if rental_count > 0:
+            # Rentals exist, block deletion
+            return {
+                "statusCode": 400,
+                "body": {"error": "Cannot delete storage space. Active or future rentals are present."}
+            }
+
+        tx.execute(LOG_STORAGE_DELETION_QUERY, (storage_id,))
+        tx.execute(DELETE_STORAGE_LOCATION_QUERY, (storage_id,))
+
+    invalidate_storage(storage_id)
+    return {
+        "statusCode": 200,
+        "body": {"message": "Storage location deleted successfully."}
+    }
+
+@register("update_storage_location", required=("storage_id", "update_data"))
+def update_storage_location(data):
+    update_data = data["update_data"]
+    if not isinstance(update_data, dict) or not update_data:
+        return format_response(400, {"error": "update_data must be an object with at least one field"})
+    unsupported = sorted(set(update_data) - set(STORAGE_UPDATABLE_COLUMNS))
+    if unsupported:
+        return format_response(400, {"error": f"Unsupported fields: {', '.join(unsupported)}"})
+    query, params = build_update_query("StorageSpaces", update_data, {"storage_id": data["storage_id"]})
+    execute_query(query, params, commit=True)
+    invalidate_storage(data.get("storage_id"))
+    return {"statusCode": 200, "body": {"message": "Storage location updated"}}
+
+def _cursor_timestamp(value):
+    # DATETIME keeps 1/300 s; text with at most milliseconds converts back to the same value.
+    # Other cursor values (prices, ratings) are kept as they are.
+    if isinstance(value, datetime):
+        value = str(value)
+    if not isinstance(value, str):
+        return value
+    return re.sub(r"(\.\d{3})\d+$", r"\1", value)
+
+def _since_timestamp(value):
+    # ISO 8601, naive values as database (UTC) time
+    try:
+        since = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("since must be an ISO 8601 timestamp")
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since.isoformat(sep=" ", timespec="milliseconds")
+
+def _sync_position(data):
+    """
+    Returns where a change feed call starts: (changed after, deleted after, deleted since).
+    changed after is an [updated_at, storage_id] pair or None for every row; deleted after
+    is a deletion_id, or None when the call starts a snapshot and needs no tombstones.
+    deleted since is the since bound of a feed started from since; its cursors keep it, as
+    tombstones older than since can still come after their deletion_id.
+
+    Raises:
+        ValueError: If the cursor or since is invalid.
+    """
+    if data.get("cursor"):
+        cursor = decode_cursor(data["cursor"])
+        changed_after = cursor.get("u") if isinstance(cursor, dict) else None
+        if (not isinstance(cursor, dict) or not isinstance(cursor.get("d"), int)
+                or not (changed_after is None or (isinstance(changed_after, list) and len(changed_after) == 2))
+                or not (cursor.get("s") is None or isinstance(cursor["s"], str))):
+            raise ValueError("Invalid cursor")
+        deleted_since = _since_timestamp(cursor["s"]) if cursor.get("s") else None
+        return changed_after, cursor["d"], deleted_since
+    if data.get("since"):
+        since = _since_timestamp(data["since"])
+        return [since, 0], 0, since
+    return None, None, None
+
+@register("list_storage_changes_since")
+def list_storage_changes_since(data):
+    # Change feed of the catalogue for syncing partners: rows inserted or updated and
+    # tombstones of rows deleted since the cursor (or since), oldest first. Without either,
+    # the pages are a snapshot of every row. Keep next_cursor for the next call; while
+    # has_more is set there is more to fetch right away.
+    try:
+        fields = STORAGE_SYNC_PROJECTION.including(
+            STORAGE_SYNC_PROJECTION.parse_fields(data.get("fields")), "storage_id", "updated_at"
+        )
+        page_size = parse_page_size(data)
+        changed_after, deleted_after, deleted_since = _sync_position(data)
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+
+    # One extra row per stream tells whether there is more
+    conditions, params = [], [page_size + 1]
+    if changed_after is not None:
+        conditions.append(STORAGE_CHANGED_AFTER)
+        params += [changed_after[0], changed_after[0], changed_after[1]]
+    conditions.append(STORAGE_CHANGE_SETTLED)
+    params.append(-STORAGE_SYNC_SETTLE_SECONDS)
+    query = STORAGE_SYNC_PROJECTION.query(
+        f"WHERE {' AND '.join(conditions)} ORDER BY s.updated_at, s.storage_id;", fields, top=True
+    )
+    changes = execute_query(query, params)
+
+    if deleted_after is None:
+        # A snapshot starts the tombstones at the latest deletion
+        deletions = []
+        deleted_after = execute_query(LAST_STORAGE_DELETION_QUERY, (-STORAGE_SYNC_SETTLE_SECONDS,))[0]["deletion_id"]
+    else:
+        conditions = ["deletion_id > ?", STORAGE_DELETION_SETTLED]
+        params = [page_size + 1, deleted_after, -STORAGE_SYNC_SETTLE_SECONDS]
+        if deleted_since is not None:
+            conditions.append("deleted_at >= ?")
+            params.append(deleted_since)
+        deletions = execute_query(
+            f"{STORAGE_DELETIONS_SELECT} WHERE {' AND '.join(conditions)} ORDER BY deletion_id;", params
+        )
+
+    has_more = len(changes) > page_size or len(deletions) > page_size
+    changes, deletions = changes[:page_size], deletions[:page_size]
+    if changes:
+        changed_after = [_cursor_timestamp(changes[-1]["updated_at"]), changes[-1]["storage_id"]]
+    if deletions:
+        deleted_after = deletions[-1]["deletion_id"]
+    position = {"u": changed_after, "d": deleted_after}
+    if deleted_since is not None:
+        position["s"] = deleted_since
+    return format_response(200, {
+        "data": changes,
+        "deleted": [{"storage_id": row["storage_id"], "deleted_at": row["deleted_at"]} for row in deletions],
+        "next_cursor": encode_cursor(position),
+        "has_more": has_more
+    })
+
+@register("check_storage_availability", required=("storage_id", "start_date", "end_date"))
+def check_storage_availability(data):
+    storage_id = data.get("storage_id")
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+    try:
+        date_range_days(start_date, end_date)
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+
+    date_range = _index_date_range(data)
+    if date_range:
+        rows = execute_query(STORAGE_AVAILABILITY_BITMAP_QUERY, (storage_id,))
+        booked = availability_index.is_booked(rows[0], *date_range) if rows else False
+        if booked is not None:
+            return {"statusCode": 200, "body": {"available": not booked}}
+
+    params = (storage_id, end_date, start_date, end_date, start_date, start_date, end_date)
+    result = execute_query(CHECK_STORAGE_AVAILABILITY_QUERY, params)
+    available = result[0]["count"] == 0
+    return {"statusCode": 200, "body": {"available": available}}
+
+@register("get_storage_price", required=("storage_id",), cache_params=("storage_id",))
+def get_storage_price(data):
+    result = execute_query(GET_STORAGE_PRICE_QUERY, (data.get("storage_id"),))
+    return {"statusCode": 200, "body": result[0] if result else {}}
+
+def quote_price(price_per_month, days):
+    """
+    Price for the rental days, charged per day at price_per_month / 30 with a 30 day minimum.
+    """
+    return price_per_month / 30 * max(days, 30)
+
+def indexed_quote_rows(storage_ids, start, end):
+    """
+    Prices and availability of the storages from the availability index.
+
+    Returns:
+        dict or None: storage_id -> {price_per_month, available (1 or 0)}, or None when a
+        bitmap does not cover start..end and the caller must fall back to SQL.
+    """
+    rows = {}
+    for row in execute_query(QUOTE_STORAGE_INDEXED_QUERY, (json.dumps(storage_ids),)):
+        booked = availability_index.is_booked(row, start, end) if row["booked_days"] is not None else False
+        if booked is None:
+            return None
+        rows[row["storage_id"]] = {"price_per_month": row["price_per_month"], "available": 0 if booked else 1}
+    return rows
+
+def date_range_days(start_date, end_date):
+    """
+    Returns the number of days from start_date to end_date.
+
+    Raises:
+        ValueError: If a date is not YYYY-MM-DD or end_date is before start_date.
+    """
+    try:
+        start, end = datetime.strptime(start_date, "%Y-%m-%d"), datetime.strptime(end_date, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ValueError("dates must be YYYY-MM-DD")
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    return (end - start).days
+
+def fetch_quotes(storage_ids, start_date, end_date):
+    """
+    Quotes several storages for one date range in a single query, answered from the
+    availability index when it is enabled and covers the dates, else from Rentals.
+
+    Returns:
+        list: One {storage_id, available, price_per_month, days, final_price} per existing storage, in request order.
+    """
+    days = date_range_days(start_date, end_date)
+    storage_ids = list(dict.fromkeys(int(i) for i in storage_ids))
+    rows = None
+    date_range = _index_date_range({"start_date": start_date, "end_date": end_date})
+    if date_range:
+        rows = indexed_quote_rows(storage_ids, *date_range)
+    if rows is None:
+        params = (end_date, start_date, end_date, start_date, start_date, end_date, json.dumps(storage_ids))
+        rows = {row["storage_id"]: row for row in execute_query(QUOTE_STORAGE_QUERY, params)}
+    quotes = []
+    for storage_id in storage_ids:
+        row = rows.get(storage_id)
+        if row:
+            quotes.append({
+                "storage_id": storage_id,
+                "available": row["available"] == 1,
+                "price_per_month": row["price_per_month"],
+                "days": days,
+                "final_price": quote_price(row["price_per_month"], days)
+            })
+    return quotes
+
+@register("quote_storage", required=("storage_id", "start_date", "end_date"))
+def quote_storage(data):
+    # Availability and final price of one storage (replaces check_storage_availability + get_storage_price)
+    try:
+        storage_id = int(data["storage_id"])
+    except (TypeError, ValueError):
+        return format_response(400, {"error": "storage_id must be a number"})
+    try:
+        quotes = fetch_quotes([storage_id], data["start_date"], data["end_date"])
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+    if not quotes:
+        return format_response(404, {"error": "Storage not found"})
+    return {"statusCode": 200, "body": quotes[0]}
+
+@register("quote_storages", required=("storage_ids", "start_date", "end_date"))
+def quote_storages(data):
+    # Batch form of quote_storage; storage_ids is a list of ints or a comma-separated string
+    storage_ids = data["storage_ids"]
+    if isinstance(storage_ids, str):
+        try:
+            storage_ids = [int(i) for i in storage_ids.split(",") if i.strip()]
+        except ValueError:
+            storage_ids = None
+    if not isinstance(storage_ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in storage_ids):
+        return format_response(400, {"error": "storage_ids must be a list of storage ids"})
+    if len(storage_ids) > QUOTE_MAX_STORAGES:
+        return format_response(400, {"error": f"At most {QUOTE_MAX_STORAGES} storage_ids can be quoted at once"})
+    try:
+        quotes = fetch_quotes(storage_ids, data["start_date"], data["end_date"])
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+    return {"statusCode": 200, "body": quotes}
+
+@register("rebuild_availability_index")
+def rebuild_availability_index(data):
+    # Repopulates StorageAvailability from Rentals (initial load and monthly horizon roll)
+    with transaction() as tx:
+        count = availability_index.rebuild_availability_index(tx)
+    return {"statusCode": 200, "body": {"message": f"Availability index rebuilt for {count} storage locations"}}
+
+def build_search_query(data):
+    """
+    Builds the keyset paginated search query.
+
+    Returns:
+        tuple: (query, params, sort, page_size)
+
+    Raises:
+        ValueError: If a filter, the sort order, the page size or the cursor is invalid.
+    """
+    sort = data.get("sort") or "price"
+    if sort not in SEARCH_SORTS:
+        raise ValueError(f"Unsupported sort: {sort}. Use one of {', '.join(SEARCH_SORTS)}")
+    sort_expr, direction, _ = SEARCH_SORTS[sort]
+
+    page_size = parse_page_size(data, SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE)
+
+    # One extra row tells us whether there is a next page
+    params = [page_size + 1]
+    conditions = []
+    for key, predicate, convert in SEARCH_FILTERS:
+        value = data.get(key)
+        if value in (None, ""):
+            continue
+        conditions.append(predicate)
+        params.append(convert(value))
+
+    if data.get("cursor"):
+        cursor = decode_cursor(data["cursor"])
+        if not isinstance(cursor, dict) or cursor.get("sort") != sort:
+            raise ValueError("Invalid cursor")
+        comparison = ">" if direction == "ASC" else "<"
+        conditions.append(
+            f"({sort_expr} {comparison} ? OR ({sort_expr} = ? AND s.storage_id {comparison} ?))"
+        )
+        params.extend([cursor.get("value"), cursor.get("value"), cursor.get("storage_id")])
+
+    query = SEARCH_SELECT
+    for condition in conditions:
+        query += f"        AND {condition}\n"
+    query += f"    ORDER BY {sort_expr} {direction}, s.storage_id {direction};"
+    return query, params, sort, page_size
+
+@register("search_storage_locations")
+def search_storage_locations(data):
+    # Filtered, sorted and keyset paginated listing of available storage locations
+    try:
+        query, params, sort, page_size = build_search_query(data)
+    except ValueError as e:
+        return format_response(400, {"error": str(e)})
+
+    results = execute_query(query, params)
+    next_cursor = None
+    if len(results) > page_size:
+        results = results[:page_size]
+        last = results[-1]
+        next_cursor = encode_cursor({
+            "sort": sort,
+            "value": _cursor_timestamp(last[SEARCH_SORTS[sort][2]]),
+            "storage_id": last["storage_id"],
+        })
+    return format_response(200, {"data": results, "next_cursor": next_cursor})
@@ -1,4 +1,10 @@
+import base64
+import hashlib
 import json
+import os
+
+# Upper bound on the rows of one bulk action (Lambda payloads are limited to 6 MB)
+BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS', 5000))
 
 def format_response(status_code, body):
     """
@@ -8,3 +14,46 @@ def format_response(status_code, body):
         "statusCode": status_code,
         "body": body
     }
+
+def encode_cursor(values):
+    """
+    Encodes keyset pagination values into an opaque, URL safe cursor token.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(token):
+    """
+    Decodes a cursor token produced by encode_cursor.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor")
+
+def version_token(rows):
+    """
+    Digest of the rows a resource's version is derived from; changes whenever they do.
+    """
+    raw = json.dumps(rows, default=str, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+def bulk_items(data, key):
+    """
+    Returns the list of row objects a bulk action received under key.
+
+    Raises:
+        ValueError: If the list is missing, empty, too long or holds non-objects.
+    """
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"{key} must be a non-empty list")
+    if len(items) > BULK_MAX_ROWS:
+        raise ValueError(f"At most {BULK_MAX_ROWS} {key} can be sent at once")
+    if not all(isinstance(item, dict) for item in items):
+        raise ValueError(f"Every entry of {key} must be an object")
+    return items
@@ -1,35 +1,19 @@
 import json
-import boto3
-import os
 
-# Initialize the AWS Lambda client
-lambda_client = boto3.client('lambda')
+from holdhive_data_access import DBRequestError, call_db_transactions, warm_up_transport
+from holdhive_data_access.metrics import instrumented, log_sampled
+from holdhive_data_access.warmup import handles_warmup, on_warmup
 
-def call_db_transactions(action, data):
-    """
-    Calls the db_transactions Lambda for database operations.
-    """
-    response = lambda_client.invoke(
-        FunctionName=os.environ['db_lambda_name'],
-        InvocationType="RequestResponse",
-        Payload=json.dumps({"action": action, "data": data})
-    )
-
-    # print(f"Response: {response}")
-    # Parse the response from db_transactions
-    payload = json.loads(response['Payload'].read())
-    print(f"Payload: {payload}")
-    if payload.get("statusCode") != 200:
-        db_error = payload.get("body", payload.get("error", "Unknown error"))
-        raise Exception(f"DB Error: {db_error}")
-    return payload.get("body")
+on_warmup("db_transport", warm_up_transport)
 
+@handles_warmup
+@instrumented("holdhive_profile_services")
 def lambda_handler(event, context):
     """
     Handles user profile-related API requests.
     """
     try:
-        print(f"Event: {event}")
+        log_sampled(f"Event: {event}")
 
         # Extract HTTP method
         http_method = event.get("httpMethod")
@@ -183,6 +167,16 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "Unsupported action"})
             }
 
+    except DBRequestError as e:
+        # Rejected by the DB action, e.g. 404 for an unknown user or 400 when removing a user with active rentals
+        return {
+            "statusCode": e.status_code,
+            "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                    },
+            "body": json.dumps(e.body)
+        }
+
     except Exception as e:
         return {
             "statusCode": 500,
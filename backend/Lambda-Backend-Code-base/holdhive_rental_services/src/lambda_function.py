@@ -1,32 +1,19 @@
 import json
-import boto3
-import os
 
-# Initialize the AWS Lambda client
-lambda_client = boto3.client('lambda')
+from holdhive_data_access import DBRequestError, call_db_transactions, warm_up_transport
+from holdhive_data_access.metrics import instrumented, log_sampled
+from holdhive_data_access.warmup import handles_warmup, on_warmup
 
-def call_db_transactions(action, data):
-    """
-    Calls the db_transactions Lambda for database operations.
-    """
-    response = lambda_client.invoke(
-        FunctionName=os.environ['db_lambda_name'],
-        InvocationType="RequestResponse",
-        Payload=json.dumps({"action": action, "data": data})
-    )
-
-    # Parse the response from db_transactions
-    payload = json.loads(response['Payload'].read())
-    if payload.get("statusCode") != 200:
-        raise Exception(f"DB Error: {payload.get('body', {}).get('error', 'Unknown Error')}")
-    return payload.get("body")
+on_warmup("db_transport", warm_up_transport)
 
+@handles_warmup
+@instrumented("holdhive_rental_services")
 def lambda_handler(event, context):
     """
     Handles rental-related API requests.
     """
     try:
-        print(f"Event: {event}")
+        log_sampled(f"Event: {event}")
         http_method = event.get("httpMethod")
         path = event.get("path")
         data = json.loads(event.get("body", "{}")) if http_method == "POST" else event.get("queryStringParameters", {})
@@ -34,20 +21,25 @@ def lambda_handler(event, context):
         if http_method == "GET":
             # List all rentals
             if path == "/rental-service/list-all-rentals":
-                response = call_db_transactions("list_all_rentals", {})
+                query_params = event.get("queryStringParameters") or {}
+                response = call_db_transactions("list_all_rentals", {
+                    "fields": query_params.get("fields"),
+                    "page_size": query_params.get("page_size"),
+                    "cursor": query_params.get("cursor")
+                })
                 return {
                     "statusCode": 200,
                     "headers": {
                         "Access-Control-Allow-Origin": "*",
                     },
-                    "body": json.dumps({"message": "Rentals fetched successfully", "data": response})
+                    "body": json.dumps({"message": "Rentals fetched successfully", "data": response.get("data", []), "next_cursor": response.get("next_cursor")})
                 }
 
             # List rental by rental ID
             if path.startswith("/rental-service/list-rental-by-rental-id"):
                 query_params = event.get("queryStringParameters", {})
                 rental_id = query_params.get("rental_id")
-                response = call_db_transactions("list_rental_by_id", {"rental_id": rental_id})
+                response = call_db_transactions("list_rental_by_id", {"rental_id": rental_id, "fields": query_params.get("fields")})
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -60,7 +52,7 @@ def lambda_handler(event, context):
             if path.startswith("/rental-service/list-rental-by-storage-id"):
                 query_params = event.get("queryStringParameters", {})
                 storage_id = query_params.get("storage_id")
-                response = call_db_transactions("list_rentals_by_storage_id", {"storage_id": storage_id})
+                response = call_db_transactions("list_rentals_by_storage_id", {"storage_id": storage_id, "fields": query_params.get("fields")})
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -73,7 +65,7 @@ def lambda_handler(event, context):
             if path.startswith("/rental-service/list-rental-by-renter-id"):
                 query_params = event.get("queryStringParameters", {})
                 renter_id = query_params.get("renter_id")
-                response = call_db_transactions("list_rentals_by_renter_id", {"renter_id": renter_id})
+                response = call_db_transactions("list_rentals_by_renter_id", {"renter_id": renter_id, "fields": query_params.get("fields")})
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -84,15 +76,19 @@ def lambda_handler(event, context):
 
             # List rentals by owner ID
             if path.startswith("/rental-service/list-rental-by-owner-id"):
-                query_params = event.get("queryStringParameters", {})
-                owner_id = query_params.get("owner_id")
-                response = call_db_transactions("list_rentals_by_owner_id", {"owner_id": owner_id})
+                query_params = event.get("queryStringParameters") or {}
+                response = call_db_transactions("list_rentals_by_owner_id", {
+                    "owner_id": query_params.get("owner_id"),
+                    "fields": query_params.get("fields"),
+                    "page_size": query_params.get("page_size"),
+                    "cursor": query_params.get("cursor")
+                })
                 return {
                     "statusCode": 200,
                     "headers": {
                         "Access-Control-Allow-Origin": "*",
                     },
-                    "body": json.dumps({"message": "Rentals for owner fetched successfully", "data": response})
+                    "body": json.dumps({"message": "Rentals for owner fetched successfully", "data": response.get("data", []), "next_cursor": response.get("next_cursor")})
                 }
 
         elif http_method == "POST":
@@ -100,6 +96,9 @@ def lambda_handler(event, context):
 
             # Create a rental
             if action == "create_rental":
+                headers = {key.lower(): value for key, value in (event.get("headers") or {}).items()}
+                if headers.get("idempotency-key"):
+                    data["idempotency_key"] = headers["idempotency-key"]
                 response = call_db_transactions("create_rental", data)
                 return {
                     "statusCode": 200,
@@ -109,6 +108,17 @@ def lambda_handler(event, context):
                     "body": json.dumps({"message": "Rental created successfully", "data": response})
                 }
 
+            # Create many rentals at once (rentals: list of create_rental fields)
+            elif action == "bulk_create_rentals":
+                response = call_db_transactions("bulk_create_rentals", data)
+                return {
+                    "statusCode": 200,
+                    "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                    },
+                    "body": json.dumps({"message": "Rentals created successfully", "data": response})
+                }
+
             # Delete a rental
             elif action == "delete_rental":
                 rental_id = data.get("rental_id")
@@ -138,6 +148,16 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "Method not allowed"})
                 }
 
+    except DBRequestError as e:
+        # Rejected by the DB action, e.g. 409 when the storage is already booked for the dates
+        return {
+                "statusCode": e.status_code,
+                "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                },
+                "body": json.dumps(e.body)
+                }
+
     except Exception as e:
         return {
                 "statusCode": 500, 
@@ -1,32 +1,23 @@
 import json
-import boto3
-import os
 
-# Initialize the AWS Lambda client
-lambda_client = boto3.client('lambda')
+from holdhive_data_access import DBRequestError, call_db_transactions, warm_up_transport
+from holdhive_data_access.metrics import instrumented, log_sampled
+from holdhive_data_access.response_cache import ResponseCache, conditional_response
+from holdhive_data_access.warmup import handles_warmup, on_warmup
 
-def call_db_transactions(action, data):
-    """
-    Calls the db_transactions Lambda for database operations.
-    """
-    response = lambda_client.invoke(
-        FunctionName=os.environ['db_lambda_name'],
-        InvocationType="RequestResponse",
-        Payload=json.dumps({"action": action, "data": data})
-    )
+on_warmup("db_transport", warm_up_transport)
 
-    # Parse the response from db_transactions
-    payload = json.loads(response['Payload'].read())
-    if payload.get("statusCode") != 200:
-        raise Exception(f"DB Error: {payload.get('body', {}).get('error', 'Unknown Error')}")
-    return payload.get("body")
+# Serialized review listings per storage, served while the storage's review version is current
+_storage_reviews = ResponseCache()
 
+@handles_warmup
+@instrumented("holdhive_reviews_services")
 def lambda_handler(event, context):
     """
     Handles review-related API requests.
     """
     try:
-        print(f"Event: {event}")
+        log_sampled(f"Event: {event}")
         http_method = event.get("httpMethod")
         path = event.get("path")
         data = json.loads(event.get("body", "{}")) if http_method == "POST" else event.get("queryStringParameters", {})
@@ -34,39 +25,46 @@ def lambda_handler(event, context):
         if http_method == "GET":
             if path == "/review-service/list-reviews":
                 # List all reviews
-                response = call_db_transactions("list_all_reviews", {})
+                query_params = event.get("queryStringParameters") or {}
+                response = call_db_transactions("list_all_reviews", {
+                    "fields": query_params.get("fields"),
+                    "page_size": query_params.get("page_size"),
+                    "cursor": query_params.get("cursor")
+                })
                 return {
                         "statusCode": 200, 
                         "headers": {
                             "Access-Control-Allow-Origin": "*",
                         },
-                        "body": json.dumps({"message": "Reviews fetched successfully", "data": response})
+                        "body": json.dumps({"message": "Reviews fetched successfully", "data": response.get("data", []), "next_cursor": response.get("next_cursor")})
                         }
 
             elif path.startswith("/review-service/list-reviews-by-storage-id"):
                 # List reviews by storage_id
                 query_params = event.get("queryStringParameters", {})
                 storage_id = query_params.get("storage_id")
-                response = call_db_transactions("list_reviews_by_storage_id", {"storage_id": storage_id})
-                return {
-                        "statusCode": 200, 
-                        "headers": {
-                            "Access-Control-Allow-Origin": "*",
-                        },
-                        "body": json.dumps({"message": "Reviews for storage fetched successfully", "data": response})
-                        }
+                fields = query_params.get("fields")
+                version = call_db_transactions("get_storage_reviews_version", {"storage_id": storage_id})["version"]
+                return conditional_response(event, _storage_reviews, ("by_storage", str(storage_id), fields), lambda: {
+                    "message": "Reviews for storage fetched successfully",
+                    "data": call_db_transactions("list_reviews_by_storage_id", {"storage_id": storage_id, "fields": fields})
+                }, version)
 
             elif path.startswith("/review-service/list-reviews-by-owner-id"):
                 # List reviews by storage owner / List all the reviews of the storage the user is owner of
-                query_params = event.get("queryStringParameters", {})
-                owner_id = query_params.get("owner_id")
-                response = call_db_transactions("list_reviews_by_owner_id", {"owner_id": owner_id})
+                query_params = event.get("queryStringParameters") or {}
+                response = call_db_transactions("list_reviews_by_owner_id", {
+                    "owner_id": query_params.get("owner_id"),
+                    "fields": query_params.get("fields"),
+                    "page_size": query_params.get("page_size"),
+                    "cursor": query_params.get("cursor")
+                })
                 return {
                         "statusCode": 200,
                         "headers": {
                             "Access-Control-Allow-Origin": "*",
                         },
-                        "body": json.dumps({"message": "Reviews for owner fetched successfully", "data": response})
+                        "body": json.dumps({"message": "Reviews for owner fetched successfully", "data": response.get("data", []), "next_cursor": response.get("next_cursor")})
                         }
             
             elif path.startswith("/review-service/list-reviews-by-user-id"):
@@ -94,7 +92,7 @@ def lambda_handler(event, context):
                 #List reviews by Review ID
                 query_params = event.get("queryStringParameters", {})
                 review_id = query_params.get("review_id")
-                response = call_db_transactions("list_review_by_review_id", {"review_id": review_id})
+                response = call_db_transactions("list_review_by_review_id", {"review_id": review_id, "fields": query_params.get("fields")})
                 return {
                         "statusCode": 200,
                         "headers": {
@@ -108,6 +106,9 @@ def lambda_handler(event, context):
 
             if action == "create_review":
                 # Create a new review
+                headers = {key.lower(): value for key, value in (event.get("headers") or {}).items()}
+                if headers.get("idempotency-key"):
+                    data["idempotency_key"] = headers["idempotency-key"]
                 response = call_db_transactions("create_review", data)
                 return {
                         "statusCode": 200, 
@@ -117,6 +118,17 @@ def lambda_handler(event, context):
                         "body": json.dumps({"message": "Review created successfully", "data": response})
                         }
 
+            elif action == "bulk_import_reviews":
+                # Import many reviews at once (reviews: list of storage_id, user_id, rating, comment)
+                response = call_db_transactions("bulk_import_reviews", data)
+                return {
+                        "statusCode": 200,
+                        "headers": {
+                            "Access-Control-Allow-Origin": "*",
+                        },
+                        "body": json.dumps({"message": "Reviews imported successfully", "data": response})
+                        }
+
             elif action == "update_review":
                 # Update a review
                 response = call_db_transactions("update_review", data)
@@ -148,6 +160,16 @@ def lambda_handler(event, context):
                     "body": json.dumps({"error": "Method not allowed"})
                     }
 
+    except DBRequestError as e:
+        # Rejected by the DB action, e.g. 400 for an invalid rating or 409 for a reused Idempotency-Key
+        return {
+                "statusCode": e.status_code,
+                "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                },
+                "body": json.dumps(e.body)
+                }
+
     except Exception as e:
         return {
                 "statusCode": 500,
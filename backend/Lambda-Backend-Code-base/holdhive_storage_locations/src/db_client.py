@@ -1,20 +1,29 @@
-import boto3
 import json
 import os
 
-# Initialize the Lambda client
-lambda_client = boto3.client('lambda')
+# The Lambda client is created on first use; importing boto3 is most of the cold start
+_lambda_client = None
 
 # Name of the DB Lambda function
 DB_LAMBDA_NAME = os.environ['DB_LAMBDA_NAME']
 
+def get_lambda_client():
+    """
+    Returns the Lambda client, creating it on first use.
+    """
+    global _lambda_client
+    if _lambda_client is None:
+        import boto3
+        _lambda_client = boto3.client('lambda')
+    return _lambda_client
+
 def get_storage_locations():
     """
     Invokes the database Lambda to fetch storage locations.
     """
     try:
         # Invoke the database Lambda
-        response = lambda_client.invoke(
+        response = get_lambda_client().invoke(
             FunctionName=DB_LAMBDA_NAME,
             InvocationType='RequestResponse',  # Synchronous call
             Payload=json.dumps({
@@ -1,42 +1,23 @@
 import json
-import boto3
-import os
-from datetime import datetime
 
-# Initialize the AWS Lambda client
-lambda_client = boto3.client('lambda')
+from holdhive_data_access import DBRequestError, call_db_transactions, warm_up_transport
+from holdhive_data_access.metrics import instrumented, log_sampled
+from holdhive_data_access.response_cache import ResponseCache, conditional_response
+from holdhive_data_access.warmup import handles_warmup, on_warmup
 
-def call_db_transactions(action, data):
-    """
-    Calls the db_transactions Lambda for database operations.
-    """
-    response = lambda_client.invoke(
-        FunctionName=os.environ['DB_LAMBDA_NAME'],  # Use an environment variable for the DB Lambda name
-        InvocationType="RequestResponse",
-        Payload=json.dumps({"action": action, "data": data})
-    )
-
-    # Parse the response from db_transactions
-    payload = json.loads(response['Payload'].read())
-    if payload.get("statusCode") != 200:
-        raise Exception(f"DB Error: {payload.get('body', {}).get('error', 'Unknown Error')}")
-    return payload.get("body")
-
-def calculate_price(price_per_month, days):
-    """
-    Calculates the price based on the number of rental days.
-    If days < 30, use 30 days for calculation.
-    """
-    daily_price = price_per_month / 30
-    effective_days = max(days, 30)
-    return daily_price * effective_days
+on_warmup("db_transport", warm_up_transport)
+
+# Serialized bodies of the listing routes; cleared by the write actions below
+_listings = ResponseCache()
 
+@handles_warmup
+@instrumented("holdhive_storage_locations")
 def lambda_handler(event, context):
     """
     Main Lambda entry point for handling all the requests related to storage location space
     """
     try:
-        print(f"Event: {event}")
+        log_sampled(f"Event: {event}")
         # Determine HTTP method and route
         http_method = event.get("httpMethod")
         path = event.get("path")
@@ -46,31 +27,27 @@ def lambda_handler(event, context):
         if http_method == "GET":
             if path == "/storage-location/list-storage-location":
                 # List all storage locations
-                response = call_db_transactions("list_all_storage_locations", {})
-                return {
-                    "statusCode": 200,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                    },
-                    "body": json.dumps({"message": "Storage locations fetched successfully", "data": response})
-                }
+                # Optional sparse fieldset (fields=a,b,c)
+                fields = (event.get("queryStringParameters") or {}).get("fields")
+                version = call_db_transactions("get_storage_list_version", {})["version"]
+                return conditional_response(event, _listings, ("list", fields), lambda: {
+                    "message": "Storage locations fetched successfully",
+                    "data": call_db_transactions("list_all_storage_locations", {"fields": fields, "version": version})
+                }, version)
             elif path.startswith("/storage-location/list-storage-location-by-id"):
                 # Fetch storage by ID
                 query_params = event.get("queryStringParameters", {})
                 storage_id = query_params.get("storage_id")
-                response = call_db_transactions("fetch_storage_by_id", {"storage_id": storage_id})
-                return {
-                    "statusCode": 200,
-                    "headers": {
-                        "Access-Control-Allow-Origin": "*",
-                    },
-                    "body": json.dumps({"message": "Storage location fetched successfully", "data": response})
-                }
+                fields = query_params.get("fields")
+                return conditional_response(event, _listings, ("by_id", str(storage_id), fields), lambda: {
+                    "message": "Storage location fetched successfully",
+                    "data": call_db_transactions("fetch_storage_by_id", {"storage_id": storage_id, "fields": fields})
+                })
             elif path.startswith("/storage-location/list-storage-location-by-owner-id"):
                 # Fetch storage by ID
                 query_params = event.get("queryStringParameters", {})
                 owner_id = query_params.get("user_id")
-                response = call_db_transactions("fetch_storage_by_owner_id", {"owner_id": owner_id})
+                response = call_db_transactions("fetch_storage_by_owner_id", {"owner_id": owner_id, "fields": query_params.get("fields")})
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -91,7 +68,7 @@ def lambda_handler(event, context):
                         },
                         "body": json.dumps({"error": "start_date and end_date are required"})
                     }
-                response = call_db_transactions("check_available_storage", {"start_date": start_date,"end_date": end_date})
+                response = call_db_transactions("check_available_storage", {"start_date": start_date,"end_date": end_date, "fields": query_params.get("fields")})
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -113,8 +90,8 @@ def lambda_handler(event, context):
                         "body": json.dumps({"error": "storage_id, start_date, and end_date are required"})
                     }
 
-                # Check availability
-                response = call_db_transactions("check_storage_availability", {
+                # Availability and price in one DB call
+                response = call_db_transactions("quote_storage", {
                     "storage_id": storage_id,
                     "start_date": start_date,
                     "end_date": end_date
@@ -129,31 +106,81 @@ def lambda_handler(event, context):
                         "body": json.dumps({"message": "Storage location is not available"})
                     }
 
-                # Fetch storage price details
-                storage_details = call_db_transactions("get_storage_price", {"storage_id": storage_id})
-                price_per_month = storage_details.get("price_per_month")
-                if not price_per_month:
+                return {
+                    "statusCode": 200,
+                    "headers": {
+                            "Access-Control-Allow-Origin": "*",
+                    },
+                    "body": json.dumps({
+                        "message": "Storage location is available",
+                        "final_price": response.get("final_price"),
+                        "days": response.get("days")
+                    })
+                }
+
+            elif path.startswith("/storage-location/quote-storages"):
+                # Quotes for several storage locations over one date range (storage_ids=1,2,3)
+                query_params = event.get("queryStringParameters") or {}
+                storage_ids = query_params.get("storage_ids")
+                start_date = query_params.get("start_date")
+                end_date = query_params.get("end_date")
+                if not storage_ids or not start_date or not end_date:
                     return {
-                        "statusCode": 500,
+                        "statusCode": 400,
                         "headers": {
                             "Access-Control-Allow-Origin": "*",
                         },
-                        "body": json.dumps({"error": "Unable to fetch storage price details"})
+                        "body": json.dumps({"error": "storage_ids, start_date, and end_date are required"})
                     }
+                response = call_db_transactions("quote_storages", {
+                    "storage_ids": storage_ids,
+                    "start_date": start_date,
+                    "end_date": end_date
+                })
+                return {
+                    "statusCode": 200,
+                    "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                    },
+                    "body": json.dumps({"message": "Storage quotes fetched successfully", "data": response})
+                }
 
-                # Calculate the final price
-                days = (datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(start_date, "%Y-%m-%d")).days
-                final_price = calculate_price(price_per_month, days)
+            elif path.startswith("/storage-location/search"):
+                # Filtered, sorted and paginated search over available storage locations
+                query_params = event.get("queryStringParameters") or {}
+                response = call_db_transactions("search_storage_locations", query_params)
+                return {
+                    "statusCode": 200,
+                    "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                    },
+                    "body": json.dumps({
+                        "message": "Storage locations fetched successfully",
+                        "data": response.get("data", []),
+                        "next_cursor": response.get("next_cursor")
+                    })
+                }
 
+            elif path.startswith("/storage-location/list-storage-changes-since"):
+                # Storage rows changed and deleted since a cursor (or a since timestamp), for syncing the catalogue
+                query_params = event.get("queryStringParameters") or {}
+                response = call_db_transactions("list_storage_changes_since", {
+                    "since": query_params.get("since"),
+                    "cursor": query_params.get("cursor"),
+                    "page_size": query_params.get("page_size"),
+                    "fields": query_params.get("fields")
+                })
                 return {
                     "statusCode": 200,
                     "headers": {
-                            "Access-Control-Allow-Origin": "*",
+                        "Access-Control-Allow-Origin": "*",
                     },
                     "body": json.dumps({
-                        "message": "Storage location is available",
-                        "final_price": final_price,
-                        "days": days
+                        "message": "Storage changes fetched successfully",
+                        "data": response.get("data", []),
+                        "deleted": response.get("deleted", []),
+                        "next_cursor": response.get("next_cursor"),
+                        "has_more": response.get("has_more", False)
                     })
                 }
 
@@ -163,6 +190,7 @@ def lambda_handler(event, context):
             if action == "add_storage_location":
                 # Add new storage location
                 response = call_db_transactions("add_storage_location", data)
+                _listings.invalidate("list")
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -183,6 +211,8 @@ def lambda_handler(event, context):
                         "body": json.dumps({"error": "storage_id is required"})
                     }
                 response = call_db_transactions("delete_storage_location", {"storage_id": storage_id})
+                _listings.invalidate("list")
+                _listings.invalidate("by_id", str(storage_id))
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -191,6 +221,18 @@ def lambda_handler(event, context):
                     "body": json.dumps({"message": "Storage location deleted successfully", "data": response})
                 }
 
+            elif action == "bulk_add_storage_locations":
+                # Add many storage locations at once (storage_locations: list of add_storage_location fields)
+                response = call_db_transactions("bulk_add_storage_locations", data)
+                _listings.invalidate("list")
+                return {
+                    "statusCode": 200,
+                    "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                    },
+                    "body": json.dumps({"message": "Storage locations added successfully", "data": response})
+                }
+
             elif action == "update_storage_location":
                 # Update a storage location
                 storage_id = data.get("storage_id")
@@ -204,6 +246,8 @@ def lambda_handler(event, context):
                         "body": json.dumps({"error": "storage_id and update_data are required"})
                     }
                 response = call_db_transactions("update_storage_location", {"storage_id": storage_id, "update_data": update_data})
+                _listings.invalidate("list")
+                _listings.invalidate("by_id", str(storage_id))
                 return {
                     "statusCode": 200,
                     "headers": {
@@ -230,6 +274,16 @@ def lambda_handler(event, context):
                 "body": json.dumps({"error": "Method not allowed"})
             }
 
+    except DBRequestError as e:
+        # Rejected by the DB action, e.g. 400 for an invalid search or 404 for an unknown storage
+        return {
+                "statusCode": e.status_code,
+                "headers": {
+                        "Access-Control-Allow-Origin": "*",
+                },
+                "body": json.dumps(e.body)
+                }
+
     except Exception as e:
         return {
             "statusCode": 500,
@@ -408,3 +408,114 @@ INSERT INTO StorageSpaceFeatures (storage_id, feature_id) VALUES
 (10002, 10003) -- Small Basement in
 
 select * from StorageSpaceFeatures;
+
+
+--StorageReviewStats Table (per storage review summary, maintained by the review write actions)
+CREATE TABLE StorageReviewStats (
+    storage_id INT PRIMARY KEY, -- FK to StorageSpaces.storage_id
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    average_rating AS (CASE WHEN review_count > 0 THEN rating_sum / review_count ELSE 0 END), -- Same integer average as AVG(rating)
+    rating_1_count INT NOT NULL DEFAULT 0,
+    rating_2_count INT NOT NULL DEFAULT 0,
+    rating_3_count INT NOT NULL DEFAULT 0,
+    rating_4_count INT NOT NULL DEFAULT 0,
+    rating_5_count INT NOT NULL DEFAULT 0,
+    latest_review_ids VARCHAR(1100), -- Comma separated, newest first (up to 50 ids)
+    updated_at DATETIME DEFAULT GETDATE(),
+    FOREIGN KEY (storage_id) REFERENCES StorageSpaces(storage_id) ON DELETE CASCADE
+);
+
+-- Newest reviews of a storage (latest_review_ids refresh and the per storage review listing)
+CREATE INDEX IX_Reviews_storage_id_created_at ON Reviews (storage_id, created_at DESC, review_id DESC) INCLUDE (rating);
+
+-- Backfill StorageReviewStats from the existing reviews
+INSERT INTO StorageReviewStats (storage_id, review_count, rating_sum, rating_1_count, rating_2_count, rating_3_count, rating_4_count, rating_5_count, latest_review_ids, updated_at)
+SELECT
+    r.storage_id,
+    COUNT(*),
+    SUM(r.rating),
+    SUM(CASE WHEN r.rating = 1 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN r.rating = 2 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN r.rating = 3 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN r.rating = 4 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN r.rating = 5 THEN 1 ELSE 0 END),
+    (
+        SELECT STRING_AGG(CAST(latest.review_id AS VARCHAR(20)), ',')
+            WITHIN GROUP (ORDER BY latest.created_at DESC, latest.review_id DESC)
+        FROM (
+            SELECT TOP (50) review_id, created_at
+            FROM Reviews
+            WHERE storage_id = r.storage_id
+            ORDER BY created_at DESC, review_id DESC
+        ) latest
+    ),
+    GETDATE()
+FROM Reviews r
+GROUP BY r.storage_id;
+
+select * from StorageReviewStats;
+
+
+-- Indexes for search_storage_locations (keyset pagination per sort order, filters)
+CREATE INDEX IX_StorageSpaces_availability_price ON StorageSpaces (availability, price_per_month, storage_id) INCLUDE (size, storage_type, insurance_option, eircode);
+CREATE INDEX IX_StorageSpaces_availability_created_at ON StorageSpaces (availability, created_at DESC, storage_id DESC);
+CREATE INDEX IX_StorageSpaces_eircode ON StorageSpaces (eircode) INCLUDE (availability);
+CREATE INDEX IX_StorageReviewStats_average_rating ON StorageReviewStats (average_rating, storage_id);
+
+
+-- Per storage bitmap of booked days (bit i = horizon_start + i days, 731 days).
+-- Maintained by create_rental / delete_rental; populate with the rebuild_availability_index
+-- action once, then run it monthly to roll the horizon forward.
+CREATE TABLE StorageAvailability (
+    storage_id INT PRIMARY KEY,
+    horizon_start DATE NOT NULL,
+    booked_days VARBINARY(92) NOT NULL,
+    updated_at DATETIME DEFAULT GETDATE(),
+    FOREIGN KEY (storage_id) REFERENCES StorageSpaces(storage_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IX_Rentals_storage_id_end_date ON Rentals (storage_id, end_date) INCLUDE (start_date);
+
+
+-- Stored responses of create_rental / create_review per idempotency key (see idempotency.py).
+-- status_code is NULL while the first request is still running. Purge expired rows periodically:
+-- DELETE FROM IdempotencyKeys WHERE expires_at <= SYSUTCDATETIME();
+CREATE TABLE IdempotencyKeys (
+    action NVARCHAR(64) NOT NULL,
+    idempotency_key NVARCHAR(128) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status_code INT NULL,
+    response NVARCHAR(MAX) NULL,
+    created_at DATETIME2 DEFAULT SYSUTCDATETIME(),
+    expires_at DATETIME2 NOT NULL,
+    PRIMARY KEY (action, idempotency_key)
+);
+
+CREATE INDEX IX_IdempotencyKeys_expires_at ON IdempotencyKeys (expires_at);
+
+
+-- Keyset pagination of the owner listings (list_rentals_by_owner_id, list_reviews_by_owner_id):
+-- per storage of the owner, seek below the cursor id in id order
+CREATE INDEX IX_StorageSpaces_owner_id ON StorageSpaces (owner_id);
+CREATE INDEX IX_Rentals_storage_id_rental_id ON Rentals (storage_id, rental_id DESC);
+CREATE INDEX IX_Reviews_storage_id_review_id ON Reviews (storage_id, review_id DESC);
+
+
+-- Version tokens of the conditional GETs (get_storage_list_version): MAX(updated_at) reads one index row
+CREATE INDEX IX_StorageSpaces_updated_at ON StorageSpaces (updated_at);
+CREATE INDEX IX_StorageReviewStats_updated_at ON StorageReviewStats (updated_at);
+
+
+-- Tombstones of deleted storage locations for the change feed (list_storage_changes_since),
+-- written by delete_storage_location and remove_user in the deleting transaction. Changed
+-- rows are read through IX_StorageSpaces_updated_at. Keep tombstones longer than the longest
+-- gap between two syncs of a partner, e.g. purge monthly:
+-- DELETE FROM StorageDeletions WHERE deleted_at < DATEADD(day, -30, GETDATE());
+CREATE TABLE StorageDeletions (
+    deletion_id INT IDENTITY(1,1) PRIMARY KEY,
+    storage_id INT NOT NULL,
+    deleted_at DATETIME DEFAULT GETDATE()
+);
+
+CREATE INDEX IX_StorageDeletions_deleted_at ON StorageDeletions (deleted_at);